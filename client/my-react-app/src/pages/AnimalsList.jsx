@@ -147,8 +147,9 @@ export default function AnimalsList() {
             animals.map((animal) => (
               <div key={animal.id} className={styles.card} onClick={() => navigate(`/animals/${animal.id}`)}>
                 {/* Animal Photo */}
+                {/* Resized WebP variant, falls back to the original upload */}
                 <img
-                  src={`${BASE_URL}${animal.photo_url}`}
+                  src={`${BASE_URL}${animal.photo_variants?.medium ?? animal.photo_url}`}
                   alt={animal.name}
                   className={styles.photo}
                 />
@@ -1,11 +1,15 @@
 # References:
 # https://docs.sqlalchemy.org/en/20/core/engines.html#database-urls
 # https://fastapi.tiangolo.com/advanced/settings/
+# https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html
+# https://docs.sqlalchemy.org/en/20/core/pooling.html#setting-pool-recycle
 
 
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.db.table_version import VersionedAsyncSession
 
 
 # Read database URL from environment variable
@@ -15,12 +19,30 @@ DATABASE_URL = os.getenv(
     "sqlite:///./digital_animal_adoption.db"
 )
 
+
+# Same database through an asyncio driver: aiosqlite locally, asyncpg for PostgreSQL
+def to_async_database_url(url: str):
+    scheme, _, rest = url.partition("://")
+    driver = scheme.split("+", 1)[0]
+
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+
+    if driver in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_database_url(DATABASE_URL))
+
 # SQLite needs check_same_thread, PostgreSQL does not
 connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
 # Create engine
+# Used by migrations, scripts and other code that runs outside the event loop
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args
@@ -33,6 +55,30 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Pool size bounds how many requests can talk to PostgreSQL at once
+pool_options = {}
+if not ASYNC_DATABASE_URL.startswith("sqlite"):
+    pool_options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_pre_ping": True,
+    }
+
+# Create async engine used by the API endpoints
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **pool_options
+)
+
+# Create async session
+# Objects stay loaded after commit, since lazy refreshes cannot run implicitly under asyncio
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=VersionedAsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -42,4 +88,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Provides an async database session and ensures it is closed after the request
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Provides the async session factory, for work that outlives the request such as streamed responses
+def get_async_session_factory():
+    return AsyncSessionLocal
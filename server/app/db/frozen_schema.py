@@ -0,0 +1,176 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/core/metadata.html#sqlalchemy.schema.Table
+# https://docs.sqlalchemy.org/en/20/core/constraints.html#indexes
+# https://docs.sqlalchemy.org/en/20/core/type_basics.html#sqlalchemy.types.Enum
+
+
+# Schema exactly as each migration created it, independent of the live models,
+# so a migration builds the same tables in every release.
+# Never edit a released version here; change the schema with a new migration instead.
+
+
+from sqlalchemy import Boolean, Column, Date, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+
+def _common_columns():
+    return [
+        Column("id", Integer, primary_key=True, index=True),
+        Column("created_at", DateTime),
+        Column("created_by", String, nullable=False),
+        Column("updated_at", DateTime, nullable=True),
+        Column("updated_by", String, nullable=True),
+    ]
+
+
+# Version 1: the tables of the original application
+V1_METADATA = MetaData()
+
+Table(
+    "tbl_users",
+    V1_METADATA,
+    *_common_columns(),
+    Column("name", String(100), nullable=False),
+    Column("email", String(120), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("phone", String(50), nullable=True),
+    Column("address", String(255), nullable=True),
+    Column("is_deleted", Boolean, nullable=False),
+    Column("user_type", Enum("Admin", "Adopter", name="usertype"), nullable=False),
+)
+
+Table(
+    "tbl_animals",
+    V1_METADATA,
+    *_common_columns(),
+    Column("name", String(100), nullable=False),
+    Column("species", String(50), nullable=False),
+    Column("breed", String(100), nullable=False),
+    Column("age", Integer, nullable=True),
+    Column("gender", String(10), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("photo_url", String, nullable=False),
+    Column("adoption_status", Enum("Available", "Adopted", name="adoptionstatus"), nullable=False),
+    Column("is_deleted", Boolean, nullable=False),
+)
+
+Table(
+    "tbl_applications",
+    V1_METADATA,
+    *_common_columns(),
+    Column("animal_id", Integer, ForeignKey("tbl_animals.id"), nullable=False),
+    Column("adopter_id", Integer, ForeignKey("tbl_users.id"), nullable=False),
+    Column(
+        "application_status",
+        Enum("Submitted", "Approved", "Rejected", "Cancelled", name="applicationstatus"),
+        nullable=False,
+    ),
+    Column("reason", Text, nullable=True),
+    Column("is_deleted", Boolean, nullable=False),
+)
+
+
+# Version 4: hot path indexes, declared on column-name-only copies of the version 1 tables
+# so creating the version 1 tables never creates them too (is_deleted typed for the predicates)
+V4_METADATA = MetaData()
+
+_v4_animals = Table(
+    "tbl_animals", V4_METADATA,
+    *[Column(name) for name in ("id", "name", "species", "breed", "gender", "adoption_status")],
+    Column("is_deleted", Boolean),
+)
+_v4_applications = Table(
+    "tbl_applications", V4_METADATA,
+    *[Column(name) for name in ("id", "animal_id", "adopter_id", "application_status")],
+    Column("is_deleted", Boolean),
+)
+_v4_users = Table(
+    "tbl_users", V4_METADATA,
+    *[Column(name) for name in ("id", "user_type")],
+    Column("is_deleted", Boolean),
+)
+
+
+def _active(table):
+    # Partial index predicate: only rows that are not soft-deleted
+    return {
+        "sqlite_where": table.c.is_deleted.is_(False),
+        "postgresql_where": table.c.is_deleted.is_(False),
+    }
+
+
+V4_INDEXES = [
+    Index("ix_tbl_animals_active_gender", _v4_animals.c.gender, _v4_animals.c.id, **_active(_v4_animals)),
+    Index(
+        "ix_tbl_animals_active_identity",
+        _v4_animals.c.name, _v4_animals.c.breed, _v4_animals.c.species,
+        **_active(_v4_animals),
+    ),
+    Index("ix_tbl_animals_active_status", _v4_animals.c.adoption_status, _v4_animals.c.id, **_active(_v4_animals)),
+    Index(
+        "ix_tbl_applications_active_status",
+        _v4_applications.c.application_status, _v4_applications.c.id,
+        **_active(_v4_applications),
+    ),
+    Index(
+        "ix_tbl_applications_adopter_id",
+        _v4_applications.c.adopter_id, _v4_applications.c.is_deleted, _v4_applications.c.id,
+    ),
+    Index(
+        "ix_tbl_applications_animal_id_status",
+        _v4_applications.c.animal_id, _v4_applications.c.application_status, _v4_applications.c.is_deleted,
+    ),
+    Index("ix_tbl_users_active_type", _v4_users.c.user_type, _v4_users.c.id, **_active(_v4_users)),
+]
+
+
+# Version 5
+V5_DASHBOARD_COUNTERS = Table(
+    "tbl_dashboard_counters",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    *[
+        Column(name, Integer, nullable=False)
+        for name in (
+            "total_animals",
+            "total_pending_applications",
+            "total_approved_applications",
+            "total_rejected_applications",
+            "total_cancelled_applications",
+            "total_adopters",
+            "total_admins",
+        )
+    ],
+    Column("reconciled_at", DateTime, nullable=True),
+)
+
+
+# Version 6
+V6_ADOPTION_DAILY_STATS = Table(
+    "tbl_adoption_daily_stats",
+    MetaData(),
+    Column("day", Date, primary_key=True),
+    *[
+        Column(name, Integer, nullable=False)
+        for name in (
+            "applications_submitted",
+            "applications_approved",
+            "applications_rejected",
+            "applications_cancelled",
+            "animals_intake",
+            "animals_adopted",
+        )
+    ],
+)
+
+
+# Version 7
+V7_IMAGE_BLOBS = Table(
+    "tbl_image_blobs",
+    MetaData(),
+    Column("hash", String(64), primary_key=True),
+    Column("extension", String(10), nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("ref_count", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
@@ -1,14 +1,16 @@
-from app.db.database import SessionLocal, engine, Base
+from app.db.database import SessionLocal, engine
+from app.db.migration import run_migrations
 from app.models.user import User
 from app.models.enums import UserType
+from app.utils.counter_util import adjust_dashboard_counters_sync, user_type_deltas
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_first_admin():
 
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade the schema if needed
+    run_migrations(engine)
     
     db = SessionLocal()
     
@@ -32,6 +34,8 @@ def create_first_admin():
         )
         
         db.add(admin)
+        # Migrations already seeded the counters row, so count the admin in the same transaction
+        adjust_dashboard_counters_sync(db, user_type_deltas(UserType.Admin, 1))
         db.commit()
         db.refresh(admin)
         
@@ -0,0 +1,268 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/core/constraints.html#indexes
+# https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#indexes-with-concurrently
+# https://www.postgresql.org/docs/current/sql-createindex.html#SQL-CREATEINDEX-CONCURRENTLY
+# https://www.postgresql.org/docs/current/explicit-locking.html#ADVISORY-LOCKS
+# https://docs.python.org/3/library/fcntl.html#fcntl.flock
+
+
+import os
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, NamedTuple
+from sqlalchemy import exc, Column, DateTime, Integer, String, Table, PrimaryKeyConstraint, UniqueConstraint, inspect, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.sql import visitors
+from app.db.database import Base, engine
+from app.db.frozen_schema import V1_METADATA, V4_INDEXES, V5_DASHBOARD_COUNTERS, V6_ADOPTION_DAILY_STATS, V7_IMAGE_BLOBS
+from app.db.search_index import create_animal_search_index, create_user_search_index
+from app.models import Animal, Application, User
+from app.utils.counter_util import reconcile_dashboard_counters
+from app.utils.image_blob_util import backfill_image_blobs
+from app.utils.stats_util import backfill_daily_stats
+
+
+# One row per applied migration
+schema_migrations = Table(
+    "tbl_schema_migrations",
+    Base.metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Models whose __hot_filters__ are checked against their indexes
+INDEXED_MODELS = [Animal, Application, User]
+
+# Arbitrary key so only one process migrates a PostgreSQL database at a time
+_MIGRATION_LOCK_KEY = 72_310_405
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable
+    # Non-transactional migrations run in autocommit mode, needed for CREATE INDEX CONCURRENTLY
+    transactional: bool = True
+
+
+def _create_tables(connection):
+    # Frozen version 1 tables; databases from before migrations existed already have them
+    V1_METADATA.create_all(bind=connection)
+
+
+def _create_hot_path_indexes(connection):
+    # Build the version 4 indexes, also on tables that already existed before them
+    dialect = connection.dialect.name
+
+    for index in V4_INDEXES:
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+
+        if dialect == "postgresql":
+            # A failed concurrent build leaves an INVALID index behind, drop it and retry
+            invalid = connection.execute(
+                text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": index.name},
+            ).first()
+            if invalid:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+            # Build without blocking writes to the table
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+
+        connection.execute(text(ddl))
+
+
+def _create_dashboard_counters(connection):
+    V5_DASHBOARD_COUNTERS.create(connection, checkfirst=True)
+
+    # Seed the counters row from the existing data
+    db = Session(bind=connection)
+    reconcile_dashboard_counters(db)
+    db.close()
+
+
+def _create_adoption_daily_stats(connection):
+    V6_ADOPTION_DAILY_STATS.create(connection, checkfirst=True)
+
+    # Seed the rollups from the existing history
+    db = Session(bind=connection)
+    backfill_daily_stats(db)
+    db.close()
+
+
+def _create_image_blobs(connection):
+    V7_IMAGE_BLOBS.create(connection, checkfirst=True)
+
+    # Count references held by existing animals
+    db = Session(bind=connection)
+    backfill_image_blobs(db)
+    db.close()
+
+
+MIGRATIONS = [
+    Migration(1, "create_tables", _create_tables),
+    Migration(2, "animal_search_index", create_animal_search_index),
+    Migration(3, "user_search_index", create_user_search_index),
+    Migration(4, "hot_path_indexes", _create_hot_path_indexes, transactional=False),
+    Migration(5, "dashboard_counters", _create_dashboard_counters),
+    Migration(6, "adoption_daily_stats", _create_adoption_daily_stats),
+    Migration(7, "image_blobs", _create_image_blobs),
+]
+
+
+def _applied_versions(bind):
+    with bind.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+        return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _apply(bind, migration: Migration):
+    if migration.transactional:
+        with bind.begin() as connection:
+            migration.upgrade(connection)
+    else:
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            migration.upgrade(connection)
+
+    with bind.begin() as connection:
+        connection.execute(
+            schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+            )
+        )
+
+
+@contextmanager
+def _migration_lock(bind):
+    """
+    Hold a lock so only one process migrates the database at a time, e.g. when several
+    workers start together. PostgreSQL: an advisory lock. SQLite: an exclusive lock on a
+    file next to the database, since each migration step uses its own connection.
+    """
+
+    if bind.dialect.name == "postgresql":
+        lock_connection = bind.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock_connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            lock_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+            lock_connection.close()
+        return
+
+    database = bind.url.database if bind.dialect.name == "sqlite" else None
+    if not database or database == ":memory:":
+        yield
+        return
+
+    with open(f"{database}.migration-lock", "a+b") as lock_file:
+        if os.name == "nt":
+            # Retries for 10 seconds, then raises
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_migrations(bind=engine):
+    """
+    Apply every migration newer than the database's recorded version, in order.
+    Returns the list of migration names that were applied.
+    """
+
+    with _migration_lock(bind):
+        applied_versions = _applied_versions(bind)
+        applied = []
+
+        for migration in sorted(MIGRATIONS, key=lambda migration: migration.version):
+            if migration.version in applied_versions:
+                continue
+            _apply(bind, migration)
+            applied.append(migration.name)
+
+        return applied
+
+
+def _index_coverage(index):
+    # Columns the index can answer: its own columns plus those pinned by a partial index predicate
+    columns = [column.name for column in index.columns]
+    pinned = set()
+
+    for dialect in ("sqlite", "postgresql"):
+        where = index.dialect_options[dialect]["where"]
+        if where is not None:
+            pinned.update(
+                element.name for element in visitors.iterate(where) if isinstance(element, Column)
+            )
+
+    return columns, pinned
+
+
+def check_hot_filter_indexes(bind=None):
+    """
+    Fail if any model's __hot_filters__ has no index that can serve it.
+
+    A filter is covered when an index (or unique / primary key constraint) leads with
+    one of its columns and contains, or pins through its partial predicate, all the rest.
+    With a bind, also fail if a declared index is missing from the live database.
+    """
+
+    problems = []
+
+    for model in INDEXED_MODELS:
+        table = model.__table__
+
+        candidates = [_index_coverage(index) for index in table.indexes]
+        candidates += [
+            ([column.name for column in constraint.columns], set())
+            for constraint in table.constraints
+            if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+        ]
+
+        for hot_filter in getattr(model, "__hot_filters__", []):
+            wanted = set(hot_filter)
+            covered = any(
+                columns[0] in wanted and wanted <= set(columns) | pinned
+                for columns, pinned in candidates
+            )
+            if not covered:
+                problems.append(f"{table.name}: no index covers filter ({', '.join(hot_filter)})")
+
+        if bind is not None:
+            with warnings.catch_warnings():
+                # Expression indexes such as lower(email) are not reflected, and not declared on models either
+                warnings.simplefilter("ignore", exc.SAWarning)
+                existing = {index["name"] for index in inspect(bind).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    problems.append(f"{table.name}: index {index.name} is missing from the database")
+
+    if problems:
+        raise RuntimeError("Hot filter index check failed:\n" + "\n".join(problems))
+
+
+if __name__ == "__main__":
+    for name in run_migrations(engine):
+        print(f"Applied migration {name}")
+    check_hot_filter_indexes(engine)
+    print("Schema is up to date")
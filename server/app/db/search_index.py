@@ -0,0 +1,129 @@
+# References:
+# https://www.sqlite.org/fts5.html#external_content_tables
+# https://www.postgresql.org/docs/current/textsearch-tables.html
+# https://www.postgresql.org/docs/current/ddl-generated-columns.html
+
+
+from sqlalchemy import text
+
+
+ANIMAL_FTS_TABLE = "tbl_animals_fts"
+
+# Columns indexed for animal search, most relevant first
+ANIMAL_SEARCH_COLUMNS = ["name", "species", "breed", "description"]
+
+USER_TRIGRAM_TABLE = "tbl_users_trigram"
+
+# Columns searched by substring in the admin user and adopter screens
+USER_SEARCH_COLUMNS = ["name", "email", "address"]
+
+
+def _sqlite_fts_triggers(fts_table: str, content_table: str, columns):
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+
+    insert_new = f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    delete_old = (
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+
+    return {
+        f"{fts_table}_ai": f"AFTER INSERT ON {content_table} BEGIN {insert_new} END",
+        f"{fts_table}_ad": f"AFTER DELETE ON {content_table} BEGIN {delete_old} END",
+        f"{fts_table}_au": f"AFTER UPDATE OF {column_list} ON {content_table} BEGIN {delete_old} {insert_new} END",
+    }
+
+
+def _create_sqlite_fts_index(connection, fts_table: str, content_table: str, columns, tokenize: str):
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} "
+        f"USING fts5({', '.join(columns)}, "
+        f"content='{content_table}', content_rowid='id', tokenize='{tokenize}')"
+    ))
+
+    existing_triggers = set(connection.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table_name"),
+        {"table_name": content_table},
+    ).scalars())
+
+    triggers = _sqlite_fts_triggers(fts_table, content_table, columns)
+    missing = [name for name in triggers if name not in existing_triggers]
+
+    for name in missing:
+        connection.execute(text(f"CREATE TRIGGER {name} {triggers[name]}"))
+
+    # Triggers are missing on first run or after the content table was recreated, so re-index
+    if missing:
+        connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+
+def create_animal_search_index(connection):
+    """
+    Create the animal full-text index if it is missing. Safe to run on every startup.
+
+    SQLite: an external-content FTS5 table kept in sync by triggers.
+    PostgreSQL: a generated tsvector column with a GIN index.
+    """
+
+    dialect = connection.dialect.name
+
+    if dialect == "sqlite":
+        _create_sqlite_fts_index(
+            connection,
+            ANIMAL_FTS_TABLE,
+            "tbl_animals",
+            ANIMAL_SEARCH_COLUMNS,
+            "unicode61 remove_diacritics 2",
+        )
+
+    elif dialect == "postgresql":
+        connection.execute(text(
+            "ALTER TABLE tbl_animals ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(species, '') || ' ' || coalesce(breed, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+            ") STORED"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_tbl_animals_search_vector "
+            "ON tbl_animals USING GIN (search_vector)"
+        ))
+
+
+def create_user_search_index(connection):
+    """
+    Create the user substring-search indexes if they are missing. Safe to run on every startup.
+
+    SQLite: a trigram-tokenized FTS5 side table kept in sync by triggers.
+    PostgreSQL: pg_trgm GIN indexes, which serve ILIKE '%term%' directly.
+    Both get an index on lower(email) for the email prefix lookup.
+    """
+
+    dialect = connection.dialect.name
+
+    if dialect == "sqlite":
+        _create_sqlite_fts_index(
+            connection,
+            USER_TRIGRAM_TABLE,
+            "tbl_users",
+            USER_SEARCH_COLUMNS,
+            "trigram",
+        )
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_tbl_users_email_lower ON tbl_users (lower(email))"
+        ))
+
+    elif dialect == "postgresql":
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for column in USER_SEARCH_COLUMNS:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_tbl_users_{column}_trgm "
+                f"ON tbl_users USING GIN ({column} gin_trgm_ops)"
+            ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_tbl_users_email_lower "
+            "ON tbl_users (lower(email) text_pattern_ops)"
+        ))
@@ -0,0 +1,141 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/orm/session_events.html
+# https://docs.sqlalchemy.org/en/20/orm/session_events.html#execute-events
+# https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html#sqlalchemy.ext.asyncio.AsyncSession
+
+
+import logging
+import threading
+import uuid
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.utils.cache_backend_util import CacheUnavailable, configure_namespace, get_cache_backend, run_cache_io
+
+
+# Version token per table name, replaced with a fresh token whenever the table is written.
+# Kept on the cache backend so every worker process sees the same versions
+TABLE_VERSIONS_NAMESPACE = "table_versions"
+
+configure_namespace(TABLE_VERSIONS_NAMESPACE)
+
+logger = logging.getLogger(__name__)
+
+# Tables written while their new version could not be stored. Their versions count as unknown
+# in this process, so no 304 or cached page is served for them, until a retried bump succeeds
+_unbumped = set()
+_unbumped_lock = threading.Lock()
+
+
+def _retry_bumps():
+    if _unbumped:
+        bump_table_versions([])
+
+
+def _unknown_version():
+    # A token nobody has seen, so nothing cached is trusted
+    return uuid.uuid4().hex
+
+
+def get_table_version(table_name: str):
+    _retry_bumps()
+    if table_name in _unbumped:
+        return _unknown_version()
+
+    backend = get_cache_backend()
+    version = backend.get(TABLE_VERSIONS_NAMESPACE, table_name)
+    if version is None:
+        version = backend.add(TABLE_VERSIONS_NAMESPACE, table_name, uuid.uuid4().hex.encode())
+
+    # Backend unreachable
+    return version.decode() if version is not None else _unknown_version()
+
+
+def get_table_versions(table_names):
+    # Same as get_table_version for each name, in one backend round trip
+    table_names = list(table_names)
+    _retry_bumps()
+    versions = get_cache_backend().get_many(TABLE_VERSIONS_NAMESPACE, table_names)
+
+    return [
+        _unknown_version() if table_name in _unbumped
+        else version.decode() if version is not None
+        else get_table_version(table_name)
+        for table_name, version in zip(table_names, versions)
+    ]
+
+
+def bump_table_versions(table_names):
+    # Also retries earlier bumps that could not be stored; a failed one leaves the tables unknown
+    with _unbumped_lock:
+        table_names = set(table_names) | _unbumped
+    if not table_names:
+        return
+
+    try:
+        get_cache_backend().set_many(
+            TABLE_VERSIONS_NAMESPACE,
+            {table_name: uuid.uuid4().hex.encode() for table_name in table_names},
+            required=True,
+        )
+    except CacheUnavailable:
+        logger.warning("Versions of %s could not be bumped; treated as unknown until they are", sorted(table_names))
+        with _unbumped_lock:
+            _unbumped.update(table_names)
+        return
+
+    with _unbumped_lock:
+        _unbumped.difference_update(table_names)
+
+
+def _mark_written(session: Session, table_names):
+    session.info.setdefault("written_tables", set()).update(table_names)
+
+
+# Collect tables touched by ORM unit-of-work flushes (add, attribute changes, delete)
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        _mark_written(session, [table.name for table in inspect(obj).mapper.tables])
+
+
+# Collect tables touched by bulk INSERT / UPDATE / DELETE statements
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written(orm_execute_state.session, [orm_execute_state.statement.table.name])
+
+
+# Versions only move once the write is visible to other sessions. Sessions of a VersionedAsyncSession
+# leave the bump to its commit(), so the event loop never waits on the cache backend here
+@event.listens_for(Session, "after_commit")
+def _bump_written_tables(session):
+    table_names = session.info.pop("written_tables", None)
+    if not table_names:
+        return
+
+    if session.info.get("defer_version_bumps"):
+        session.info.setdefault("committed_tables", set()).update(table_names)
+    else:
+        bump_table_versions(table_names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("written_tables", None)
+
+
+class VersionedAsyncSession(AsyncSession):
+    # AsyncSession that bumps the versions of the tables a commit wrote once the commit returns,
+    # through run_cache_io instead of blocking inside after_commit
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sync_session.info["defer_version_bumps"] = True
+
+    async def commit(self):
+        await super().commit()
+
+        table_names = self.sync_session.info.pop("committed_tables", None)
+        if table_names:
+            await run_cache_io(bump_table_versions, table_names)
@@ -3,18 +3,24 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from app.utils.auth_util import SECRET_KEY, ALGORITHM
+from app.utils.token_cache_util import get_cached_claims, remember_claims
 from app.models.enums import UserType
 
 security = HTTPBearer()  # Use HTTPBearer() to read Bearer tokens from Authorization header
 
 
+# A plain def: FastAPI runs it in the threadpool, so the token cache reads never block the event loop
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
 
+    # Token verified by an earlier request
+    payload = get_cached_claims(token)
+    if payload is not None:
+        return payload
+
     try:
         #decode JWT token to get payloads
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload # payload={"sub":1, "username":"Admin", "role":"Admin"}
     except JWTError as e:
         print(e)
         raise HTTPException(
@@ -22,6 +28,15 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="Invalid or expired token"
         )
 
+    # Logged out or invalidated tokens are still correctly signed
+    if not remember_claims(token, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+
+    return payload # payload={"sub":1, "username":"Admin", "role":"Admin"}
+
 def has_permission(required_roles: str | List[str]):
     if isinstance(required_roles, str):
         required_roles = [required_roles]
@@ -3,6 +3,7 @@ from app.endpoints.user_management import router as user_router
 from app.endpoints.animal_management import router as animal_router
 from app.endpoints.application_management import router as application_router
 from app.endpoints.dashboard_management import router as dashboard_router
+from app.endpoints.image_management import router as image_router
 
 __all__ = [
     "auth_router",
@@ -10,4 +11,5 @@ __all__ = [
     "animal_router",
     "application_router",
     "dashboard_router",
+    "image_router",
 ]
\ No newline at end of file
@@ -2,118 +2,248 @@
 # https://www.w3schools.com/python/ref_module_pathlib.asp
 # https://stackoverflow.com/questions/76451315/difference-between-pathlib-path-resolve-and-pathlib-path-parent
 
-import os
 import json
-from pathlib import Path
-from dotenv import load_dotenv
+import zipfile
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
-from app.db.database import get_db
+from app.db.database import get_async_db, get_async_session_factory
 from app.models.animal import Animal
-from app.schemas.animal_schema import CreateAnimalRequest, UpdateAnimalRequest
-from app.schemas.general_schema import GeneralResponse
+from app.schemas.animal_schema import (
+    AnimalImportReport,
+    AnimalPage,
+    AnimalResponse,
+    CreateAnimalRequest,
+    UpdateAnimalRequest,
+)
+from app.schemas.general_schema import DataResponse, GeneralResponse
+from app.utils.animal_import_util import ImageArchive, import_animals, manifest_format, read_manifest
 from app.utils.common_util import paginate_query
+from app.utils.export_util import session_dialect, stream_export
+from app.utils.entity_cache_util import cache_entity, get_cached_entity, invalidate_entities, invalidate_entity
+from app.utils.http_cache_util import etag_matches, not_modified, set_etag_headers, versioned_etag, versions_etag
+from app.utils.image_util import ALLOWED_IMAGE_EXTENSIONS, save_upload_image
+from app.utils.image_blob_util import acquire_image_blob, release_image_blob
+from app.utils.image_variant_util import image_variant_urls
+from app.utils.fieldset_util import parse_fields, project_columns, sparse_page
+from app.utils.response_util import model_response
+from app.utils.listing_cache_util import cache_listing_page, get_cached_listing_page, listing_versions
+from app.utils.search_util import animal_search_key, apply_animal_search
+from app.utils.counter_util import adjust_dashboard_counters
+from app.utils.stats_util import record_daily_stats
 from app.dependencies.auth_dependency import has_permission
 from app.models.enums import AdoptionStatus
 
 
 router = APIRouter(prefix="/animal-management", tags=["Animal Management"])
 
-load_dotenv()
-IMAGE_DIR = os.getenv("IMAGE_DIR")
+# Fields the animal listing can be narrowed to with fields=; photo_variants is derived from photo_url
+ANIMAL_FIELDS = list(AnimalResponse.model_fields)
+ANIMAL_COLUMNS = {name: getattr(Animal, name) for name in ANIMAL_FIELDS if name != "photo_variants"}
 
+# Fields an export can contain; all of them unless narrowed with fields=
+ANIMAL_EXPORT_FIELDS = list(ANIMAL_COLUMNS)
 
-@router.get("/animals",response_model=GeneralResponse)
-def get_all_animals(
-    page: int = Query(1, ge=1, description="Page number must be greater than 0"),
-    limit: int = Query(10, ge=1, le=100, description="Limit must be between 1 and 100"),
-    search: str | None = Query(None, description="Search by name or species or breed"),
-    gender: str | None = Query(None, description="Filter by gender"),
-    adoption_status: str | None = Query(None, description="Filter by adoption status"),
-    db: Session = Depends(get_db),
-    _ = Depends(has_permission(["Admin", "Adopter"])),
-):
 
-    query = (
-        db.query(Animal)
-        .filter(Animal.is_deleted.is_(False))
-        .order_by(Animal.id.asc())
+def _project_animal(row: dict, field_names):
+    return {
+        name: image_variant_urls(row["photo_url"]) if name == "photo_variants" else row[name]
+        for name in field_names
+    }
+
+
+def _format_animal(animal: Animal):
+    return AnimalResponse(
+        id=animal.id,
+        name=animal.name,
+        species=animal.species,
+        breed=animal.breed,
+        age=animal.age,
+        gender=animal.gender,
+        description=animal.description,
+        photo_url=animal.photo_url,
+        photo_variants=image_variant_urls(animal.photo_url),
+        adoption_status=animal.adoption_status,
+        created_at=animal.created_at,
+        created_by=animal.created_by,
+        updated_at=animal.updated_at,
+        updated_by=animal.updated_by,
     )
 
-    #search by animal name, species, breed
+
+def _filter_animals(query, search, gender, adoption_status, dialect: str):
+    # Filters shared by the listing and the export; returns the query and its sort keys
+    query = query.where(Animal.is_deleted.is_(False))
+
+    sort_keys = [(Animal.id, False)]
+
+    #search by animal name, species, breed, description through the full-text index, best match first
     if search:
-        query = query.filter(
-            or_(
-                Animal.name.ilike(f"%{search}%"),
-                Animal.species.ilike(f"%{search}%"),
-                Animal.breed.ilike(f"%{search}%")
-            )
-        )
+        query, sort_keys = apply_animal_search(query, search, dialect)
 
     #filter by gender
     if gender:
-        query = query.filter(Animal.gender == gender)
-    
+        query = query.where(Animal.gender == gender)
+
     #filter by adoption
     if adoption_status:
-        query = query.filter(Animal.adoption_status == adoption_status)
-
-    # Apply pagination
-    paginated_info = paginate_query(query, page, limit)
-
-    # Format animal data
-    animals = [
-        {
-            "id": animal.id,
-            "name": animal.name,
-            "species": animal.species,
-            "breed": animal.breed,
-            "age": animal.age,
-            "gender": animal.gender,
-            "description": animal.description,
-            "photo_url": animal.photo_url,
-            "adoption_status": animal.adoption_status.value,
-            "created_at": animal.created_at,
-            "created_by": animal.created_by,
-            "updated_at": animal.updated_at,
-            "updated_by": animal.updated_by,
-        }
-        for animal in paginated_info["query_data"]
-    ]
-
-    # Wrap pagination result
-    data_to_return = {
-        "page": paginated_info["page"],
-        "limit": paginated_info["limit"],
-        "total": paginated_info["total"],
-        "total_pages": paginated_info["total_pages"],
-        "animals": animals
-    }
+        query = query.where(Animal.adoption_status == adoption_status)
 
-    return GeneralResponse(
-        message="Get all animals successfully",
-        data=data_to_return
+    return query, sort_keys
+
+
+@router.get("/animals", response_model=DataResponse[AnimalPage])
+async def get_all_animals(
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number must be greater than 0"),
+    limit: int = Query(10, ge=1, le=100, description="Limit must be between 1 and 100"),
+    search: str | None = Query(None, description="Search by name, species, breed or description"),
+    gender: str | None = Query(None, description="Filter by gender"),
+    adoption_status: str | None = Query(None, description="Filter by adoption status"),
+    cursor: str | None = Query(None, description="Opaque cursor from next_cursor; replaces page when given"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$", description="How to compute total: exact, estimate or none; cursor pages always use none"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to return for each animal (id is always included): {', '.join(ANIMAL_FIELDS)}"),
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(has_permission(["Admin", "Adopter"])),
+):
+    field_names = parse_fields(fields, ANIMAL_FIELDS)
+
+    # Unchanged since the client's last poll: answer 304 before touching the database.
+    # The same versions key the listing cache below
+    versions = await listing_versions([Animal.__tablename__])
+    etag = versions_etag(
+        versions,
+        "animals",
+        page, limit, search, gender, adoption_status, cursor, total_mode, field_names,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    # Offset pages running the same search predicate and filters are served from memory until an animal
+    # is written; cursor pages are the long tail and always queried
+    dialect = db.get_bind().dialect.name
+    cache_key = None
+    if not cursor:
+        cache_key = (page, limit, animal_search_key(search, dialect), gender, adoption_status, total_mode, field_names and tuple(field_names))
+        body = await get_cached_listing_page("animals", cache_key, versions)
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers=response.headers)
+
+    if field_names is None:
+        query = select(Animal)
+    else:
+        # Only the requested columns, returned as plain rows instead of ORM entities
+        columns = project_columns(field_names, ANIMAL_COLUMNS)
+        if "photo_variants" in field_names and "photo_url" not in field_names:
+            columns.append(Animal.photo_url.label("photo_url"))
+        query = select(*columns)
+
+    query, sort_keys = _filter_animals(query, search, gender, adoption_status, dialect)
+
+    # Apply pagination, ordered by the sort keys so the cursor can seek on them
+    paginated_info = await paginate_query(
+        db,
+        query,
+        page,
+        limit,
+        cursor,
+        sort_keys=sort_keys,
+        total_mode=total_mode,
+        # Without filters the maintained counter is the total
+        counter_columns=None if search or gender or adoption_status else ["total_animals"],
     )
 
+    if field_names is None:
+        # Format animal data
+        animals = [_format_animal(animal) for animal in paginated_info["query_data"]]
+
+        # Wrap pagination result
+        data_to_return = AnimalPage(
+            page=paginated_info["page"],
+            limit=paginated_info["limit"],
+            total=paginated_info["total"],
+            total_pages=paginated_info["total_pages"],
+            total_mode=paginated_info["total_mode"],
+            next_cursor=paginated_info["next_cursor"],
+            animals=animals,
+        )
+        content = DataResponse[AnimalPage](
+            message="Get all animals successfully",
+            data=data_to_return
+        )
+    else:
+        animals = [_project_animal(row, field_names) for row in paginated_info["query_data"]]
+        content = {
+            "message": "Get all animals successfully",
+            "data": sparse_page(paginated_info, "animals", animals),
+        }
+
+    # Serialized once, so a cached page is returned exactly as it was sent the first time
+    json_response = model_response(content, response)
+
+    if cache_key is not None:
+        await cache_listing_page("animals", cache_key, versions, json_response.body)
+
+    return json_response
+
+
+@router.get("/animals/export", response_class=StreamingResponse)
+async def export_animals(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    search: str | None = Query(None, description="Search by name, species, breed or description"),
+    gender: str | None = Query(None, description="Filter by gender"),
+    adoption_status: str | None = Query(None, description="Filter by adoption status"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to export (id is always included): {', '.join(ANIMAL_EXPORT_FIELDS)}"),
+    session_factory = Depends(get_async_session_factory),
+    _ = Depends(has_permission("Admin")),
+):
+    field_names = parse_fields(fields, ANIMAL_EXPORT_FIELDS) or ANIMAL_EXPORT_FIELDS
+
+    query = select(*project_columns(field_names, ANIMAL_COLUMNS))
+    query, sort_keys = _filter_animals(query, search, gender, adoption_status, session_dialect(session_factory))
+
+    return stream_export(session_factory, query, field_names, sort_keys, export_format, "animals")
 
-@router.get("/animals/{animal_id}", response_model=GeneralResponse)
-def get_animal_by_id(
+
+@router.get("/animals/{animal_id}", response_model=DataResponse[AnimalResponse])
+async def get_animal_by_id(
     animal_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission(["Admin", "Adopter"])),
 ):
+    # Unchanged since the client's last poll: answer 304 before touching the database
+    etag = await versioned_etag([Animal.__tablename__], "animal", animal_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    # Served from memory while nothing has written this animal
+    cached, generation = await get_cached_entity("animal", animal_id)
+    if cached is not None:
+        return model_response(
+            DataResponse[AnimalResponse](
+                message="Animal retrieved successfully",
+                data=AnimalResponse.model_validate(cached)
+            ),
+            response,
+        )
+
     # Get animal that is not soft-deleted
-    animal = (
-        db.query(Animal)
-        .filter(
+    animal = (await db.execute(
+        select(Animal)
+        .where(
             Animal.id == animal_id,
             Animal.is_deleted.is_(False)
         )
-        .first()
-    )
+    )).scalars().first()
 
     # If no matching animal found
     if not animal:
@@ -123,25 +253,16 @@ def get_animal_by_id(
         )
 
     # Format response data
-    animal_info = {
-        "id": animal.id,
-        "name": animal.name,
-        "species": animal.species,
-        "breed": animal.breed,
-        "age": animal.age,
-        "gender": animal.gender,
-        "description": animal.description,
-        "photo_url": animal.photo_url,
-        "adoption_status": animal.adoption_status.value,
-        "created_at": animal.created_at,
-        "created_by": animal.created_by,
-        "updated_at": animal.updated_at,
-        "updated_by": animal.updated_by,
-    }
+    animal_info = _format_animal(animal)
 
-    return GeneralResponse(
-        message="Animal retrieved successfully",
-        data=animal_info
+    await cache_entity("animal", animal_id, animal_info, generation)
+
+    return model_response(
+        DataResponse[AnimalResponse](
+            message="Animal retrieved successfully",
+            data=animal_info
+        ),
+        response,
     )
 
 
@@ -150,10 +271,10 @@ def get_animal_by_id(
     response_model=GeneralResponse,
     status_code=status.HTTP_201_CREATED
 )
-def create_animal(
+async def create_animal(
     request_data: str = Form(...),           #JSON string from form-data
     animal_image: UploadFile = File(...),    #Animal Image file
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin")),
 ):
     #Parse the JSON string into a dictionary
@@ -177,45 +298,22 @@ def create_animal(
     # Validate file extension
     ext = animal_image.filename.rsplit(".", 1)[-1].lower() #split once from the right at the last dot
 
-    if ext not in ["jpg", "jpeg", "png", "webp"]:
+    if ext not in ALLOWED_IMAGE_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid image format. Only .jpg, .jpeg, .png, .webp are allowed."
         )
 
-    # Resolve the absolute base directory of the app
-    BASE_DIR = Path(__file__).resolve().parent.parent
-
-    # Define the directory for storing animal images
-    IMAGE_DIR = BASE_DIR / "src" / "images"
-
-    # Create the images directory if it does not exist
-    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
-
-    # generate filename
-    filename = f"{int(datetime.utcnow().timestamp())}.{ext}"
-
-    # full filepath
-    file_path = IMAGE_DIR / filename
-
-    # Save the uploaded image file
-    with open(file_path, "wb") as f:
-        f.write(animal_image.file.read())
-
-    # Build the image URL to be stored in the database
-    photo_url = f"/images/{filename}"
-
     #Prevent duplicate animal records
-    existing_animal = (
-        db.query(Animal)
-        .filter(
+    existing_animal = (await db.execute(
+        select(Animal)
+        .where(
             Animal.name == request_data.name,
             Animal.breed == request_data.breed,
             Animal.species == request_data.species,
             Animal.is_deleted.is_(False),
         )
-        .first()
-    )
+    )).scalars().first()
 
     if existing_animal:
         raise HTTPException(
@@ -223,6 +321,12 @@ def create_animal(
             detail="Animal with similar information already exists"
         )
 
+    # Stream the uploaded image into content-addressed storage, checking size and content
+    stored_image = await save_upload_image(animal_image)
+
+    # Build the image URL to be stored in the database
+    photo_url = f"/images/{stored_image.name}"
+
     #Create new animal entity
     new_animal = Animal(
         name=request_data.name,
@@ -239,8 +343,11 @@ def create_animal(
     )
 
     db.add(new_animal)
-    db.commit()
-    db.refresh(new_animal)
+    await acquire_image_blob(db, stored_image)
+    await adjust_dashboard_counters(db, {"total_animals": 1})
+    await record_daily_stats(db, {"animals_intake": 1})
+    await db.commit()
+    await db.refresh(new_animal)
 
     return GeneralResponse(
         message="Animal created successfully",
@@ -254,15 +361,58 @@ def create_animal(
     )
 
 
+@router.post(
+    "/animals/import",
+    response_model=DataResponse[AnimalImportReport],
+)
+async def bulk_import_animals(
+    manifest: UploadFile = File(...),               # CSV or NDJSON, one animal per row, image column names a file in images
+    images: UploadFile | None = File(None),         # zip archive of the images
+    db: AsyncSession = Depends(get_async_db),
+    user_info = Depends(has_permission("Admin")),
+):
+    manifest_type = manifest_format(manifest.filename)
+    if manifest_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid manifest format. Only .csv, .ndjson and .jsonl are allowed."
+        )
+
+    archive = None
+    if images is not None:
+        try:
+            archive = await run_in_threadpool(ImageArchive, images.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="images must be a zip archive"
+            )
+
+    report = await import_animals(db, read_manifest(manifest.file, manifest_type), archive, user_info["username"])
+
+    statuses = [entry["status"] for entry in report]
+    return model_response(
+        DataResponse[AnimalImportReport](
+            message=f"{statuses.count('created')} of {len(report)} animals imported",
+            data=AnimalImportReport(
+                created=statuses.count("created"),
+                duplicates=statuses.count("duplicate"),
+                invalid=statuses.count("invalid"),
+                rows=report,
+            ),
+        )
+    )
+
+
 @router.put(
     "/animals/{animal_id}",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def update_animal_by_ID(
+async def update_animal_by_ID(
     animal_id: int,
     request_data: str | None = Form(None),
     animal_image: UploadFile | None = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin"))
 ):
     
@@ -278,14 +428,13 @@ def update_animal_by_ID(
             raise HTTPException(422, detail=e.errors())
 
     # Get existing animal
-    animal = (
-        db.query(Animal)
-        .filter(
+    animal = (await db.execute(
+        select(Animal)
+        .where(
             Animal.id == animal_id,
             Animal.is_deleted.is_(False)
         )
-        .first()
-    )
+    )).scalars().first()
 
     if not animal:
         raise HTTPException(
@@ -298,22 +447,19 @@ def update_animal_by_ID(
         # Validate extension
         filename = animal_image.filename
         ext = filename.split(".")[-1].lower()
-        if ext not in ["jpg", "jpeg", "png", "webp"]:
+        if ext not in ALLOWED_IMAGE_EXTENSIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Only .jpg, .jpeg, .png, .webp allowed"
             )
 
-        # Save new image file
-        os.makedirs(IMAGE_DIR, exist_ok=True)
-        new_filename = f"{int(datetime.utcnow().timestamp())}_{filename}"
-        new_file_path = os.path.join(IMAGE_DIR, new_filename)
-
-        with open(new_file_path, "wb") as f:
-            f.write(animal_image.file.read())
+        # Save new image file, moving the reference from the old image to the new one
+        stored_image = await save_upload_image(animal_image)
+        await acquire_image_blob(db, stored_image)
+        await release_image_blob(db, animal.photo_url)
 
         # Build new URL
-        animal.photo_url = f"/images/{new_filename}"
+        animal.photo_url = f"/images/{stored_image.name}"
 
     # Update animal fields
     if update_data:
@@ -342,8 +488,11 @@ def update_animal_by_ID(
     animal.updated_at = datetime.utcnow()
     animal.updated_by = user_info["username"]
 
-    db.commit()
-    db.refresh(animal)
+    await db.commit()
+
+    # Application details show the animal's name and photo
+    await invalidate_entity("animal", animal_id)
+    await invalidate_entities("application")
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -352,21 +501,20 @@ def update_animal_by_ID(
     "/animals/{animal_id}",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_animal_by_id(
+async def delete_animal_by_id(
     animal_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin"))
 ):
     
     # Find animal that is not already soft deleted
-    animal = (
-        db.query(Animal)
-        .filter(
+    animal = (await db.execute(
+        select(Animal)
+        .where(
             Animal.id == animal_id,
             Animal.is_deleted.is_(False)
         )
-        .first()
-    )
+    )).scalars().first()
 
     # If no matching animal found, return 404
     if not animal:
@@ -380,6 +528,9 @@ def delete_animal_by_id(
     animal.updated_at = datetime.utcnow()
     animal.updated_by = user_info["username"]
 
-    db.commit()
+    await adjust_dashboard_counters(db, {"total_animals": -1})
+    await db.commit()
+
+    await invalidate_entity("animal", animal_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,183 +1,315 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db, get_async_session_factory
 from app.models.application import Application
 from app.models import Animal, User
 from app.models.enums import AdoptionStatus, ApplicationStatus, UserType
-from app.schemas.general_schema import GeneralResponse
+from app.schemas.general_schema import DataResponse, GeneralResponse
 from app.dependencies.auth_dependency import has_permission
 from datetime import datetime
-from app.schemas.application_schema import CreateApplicationRequest, UpdateApplicationStatusRequest, AdopterUpdateApplication
+from app.schemas.application_schema import (
+    AdopterApplicationList,
+    AdopterUpdateApplication,
+    BulkStatusResponse,
+    BulkStatusResult,
+    BulkUpdateApplicationStatusRequest,
+    ApplicationDetailResponse,
+    ApplicationPage,
+    ApplicationResponse,
+    ApplicationSummary,
+    CreateApplicationRequest,
+    UpdateApplicationStatusRequest,
+)
+from app.utils.application_status_util import (
+    COMPLETED_STATUSES,
+    mark_animals_adopted,
+    reject_competing_applications,
+    transition_applications,
+)
 from app.utils.common_util import paginate_query
+from app.utils.export_util import stream_export
+from app.utils.entity_cache_util import cache_entity, get_cached_entity, invalidate_entity
+from app.utils.http_cache_util import etag_matches, not_modified, set_etag_headers, versioned_etag
+from app.utils.loader_util import join_eager
+from app.utils.fieldset_util import parse_fields, project_columns, sparse_page
+from app.utils.response_util import model_response
+from app.utils.counter_util import APPLICATION_STATUS_COUNTERS, adjust_dashboard_counters, application_status_deltas
+from app.utils.stats_util import record_daily_stats, application_status_stats
 
 router = APIRouter(prefix="/application-management", tags=["Application Management"])
 
+# Fields the application listing can be narrowed to with fields=
+APPLICATION_FIELDS = list(ApplicationResponse.model_fields)
+APPLICATION_COLUMNS = {
+    "id": Application.id,
+    "animal_id": Application.animal_id,
+    "animal_name": Animal.name,
+    "reason": Application.reason,
+    "status": Application.application_status,
+    "created_at": Application.created_at,
+    "created_by": Application.created_by,
+    "updated_at": Application.updated_at,
+    "updated_by": Application.updated_by,
+    "adopter_id": Application.adopter_id,
+    "adopter_name": User.name,
+}
+
+
+def _filter_applications(query, search_by_name, application_status):
+    # Filters shared by the listing and the export, on a query already joined to Animal and User
+    query = query.where(Application.is_deleted.is_(False))
+
+    if search_by_name:
+        query = query.where(
+            or_(
+                Animal.name.ilike(f"%{search_by_name}%"),
+                User.name.ilike(f"%{search_by_name}%"),
+            )
+        )
+
+    if application_status:
+        application_status_str_list = [status.strip() for status in application_status.split(",") if status.strip()]
+        application_status_list = [ApplicationStatus(status_) for status_ in application_status_str_list]
+
+        query = query.where(Application.application_status.in_(application_status_list))
+
+    return query
+
+
+def _status_counter_columns(search_by_name, application_status):
+    # Without a name search the total is the sum of the per-status counters
+    if search_by_name:
+        return None
+
+    statuses = list(APPLICATION_STATUS_COUNTERS)
+    if application_status:
+        statuses = [ApplicationStatus(status_.strip()) for status_ in application_status.split(",") if status_.strip()]
+    return list(dict.fromkeys(APPLICATION_STATUS_COUNTERS[status_] for status_ in statuses))
+
 
 @router.get(
     "/applications",
-    response_model=GeneralResponse,
+    response_model=DataResponse[ApplicationPage],
 )
-def get_all_applications(
+async def get_all_applications(
     page: int = Query(1, ge=1, description="Page number must be >= 1"),
     limit: int = Query(10, ge=1, le=100, description="Limit must be between 1 and 100"),
     search_by_name: str | None = Query(None, description="Search by animal or adopter name"),
     application_status: str | None = Query(None, description="Filter by application_status"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="Opaque cursor from next_cursor; replaces page when given"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$", description="How to compute total: exact, estimate or none; cursor pages always use none"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to return for each application (id is always included): {', '.join(APPLICATION_FIELDS)}"),
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission("Admin"))
 ):
-    # Query active applications
-    query = (
-        db.query(Application)
-        .filter(Application.is_deleted.is_(False))
-        .join(Application.animal)
-        .join(Application.adopter)
-        .order_by(Application.id.desc())
-    )
-
-    if search_by_name:
-        query = query.filter(
-            or_(
-                Animal.name.ilike(f"%{search_by_name}%"),
-                User.name.ilike(f"%{search_by_name}%"),
-            )
+    field_names = parse_fields(fields, APPLICATION_FIELDS)
+
+    # Query active applications with their animal and adopter in the same rows;
+    # with fields= only those columns, as plain rows
+    if field_names is None:
+        query = join_eager(select(Application), Application.animal, Application.adopter)
+    else:
+        query = (
+            select(*project_columns(field_names, APPLICATION_COLUMNS))
+            .select_from(Application)
+            .join(Application.animal)
+            .join(Application.adopter)
         )
 
-    if application_status:
-        application_status_str_list = [status.strip() for status in application_status.split(",") if status.strip()]
-        application_status_list = [ApplicationStatus(status_) for status_ in application_status_str_list]
-        
-        query = query.filter(Application.application_status.in_(application_status_list))
+    query = _filter_applications(query, search_by_name, application_status)
+
+    # Pagination, newest first
+    paginated = await paginate_query(
+        db,
+        query,
+        page,
+        limit,
+        cursor,
+        sort_keys=[(Application.id, True)],
+        total_mode=total_mode,
+        counter_columns=_status_counter_columns(search_by_name, application_status),
+    )
 
-    # Pagination
-    paginated = paginate_query(query, page, limit)
+    if field_names is not None:
+        return model_response({
+            "message": "Applications retrieved successfully",
+            "data": sparse_page(paginated, "applications", paginated["query_data"]),
+        })
 
     applications = []
     for app in paginated["query_data"]:
-        applications.append({
-            "id": app.id,
-            "animal_id": app.animal_id,
-            "animal_name": app.animal.name,   
-            "adopter_id": app.adopter_id,
-            "adopter_name": app.adopter.name,  
-            "reason": app.reason,
-            "status": app.application_status.value,
-            "created_at": app.created_at,
-            "created_by": app.created_by,
-            "updated_at": app.updated_at,
-            "updated_by": app.updated_by,
-        })
-
-    data_to_return = {
-        "page": paginated["page"],
-        "limit": paginated["limit"],
-        "total": paginated["total"],
-        "total_pages": paginated["total_pages"],
-        "applications": applications
-    }
+        applications.append(ApplicationResponse(
+            id=app.id,
+            animal_id=app.animal_id,
+            animal_name=app.animal.name,
+            adopter_id=app.adopter_id,
+            adopter_name=app.adopter.name,
+            reason=app.reason,
+            status=app.application_status,
+            created_at=app.created_at,
+            created_by=app.created_by,
+            updated_at=app.updated_at,
+            updated_by=app.updated_by,
+        ))
+
+    data_to_return = ApplicationPage(
+        page=paginated["page"],
+        limit=paginated["limit"],
+        total=paginated["total"],
+        total_pages=paginated["total_pages"],
+        total_mode=paginated["total_mode"],
+        next_cursor=paginated["next_cursor"],
+        applications=applications,
+    )
 
-    return GeneralResponse(
+    return model_response(DataResponse[ApplicationPage](
         message="Applications retrieved successfully",
         data=data_to_return
+    ))
+
+
+@router.get("/applications/export", response_class=StreamingResponse)
+async def export_applications(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    search_by_name: str | None = Query(None, description="Search by animal or adopter name"),
+    application_status: str | None = Query(None, description="Filter by application_status"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to export (id is always included): {', '.join(APPLICATION_FIELDS)}"),
+    session_factory = Depends(get_async_session_factory),
+    _ = Depends(has_permission("Admin"))
+):
+    field_names = parse_fields(fields, APPLICATION_FIELDS) or APPLICATION_FIELDS
+
+    query = (
+        select(*project_columns(field_names, APPLICATION_COLUMNS))
+        .select_from(Application)
+        .join(Application.animal)
+        .join(Application.adopter)
     )
+    query = _filter_applications(query, search_by_name, application_status)
+
+    # Newest first, like the listing
+    return stream_export(session_factory, query, field_names, [(Application.id, True)], export_format, "applications")
 
 
 @router.get(
     "/applications/current-adopter",
-    response_model=GeneralResponse,
+    response_model=DataResponse[AdopterApplicationList],
 )
-def get_applications_of_current_adopter(
-    db: Session = Depends(get_db),
+async def get_applications_of_current_adopter(
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Adopter"))
 ):
     adopter_id = int(user_info["sub"])
 
     # Get all active applications for current login adopter
-    applications = (
-        db.query(Application)
-        .filter(
+    applications = (await db.execute(
+        join_eager(select(Application), Application.animal)
+        .where(
             Application.adopter_id == adopter_id,
             Application.is_deleted.is_(False)
         )
         .order_by(Application.id.desc())
-        .all()
-    )
+    )).scalars().all()
 
     application_list = [
-        {
-            "id": app.id,
-            "animal_id": app.animal_id,
-            "animal_name": app.animal.name,
-            "status": app.application_status.value,
-            "reason": app.reason,
-            "created_at": app.created_at,
-            "created_by": app.created_by,
-            "updated_at": app.updated_at,
-            "updated_by": app.updated_by,
-        }
+        ApplicationSummary(
+            id=app.id,
+            animal_id=app.animal_id,
+            animal_name=app.animal.name,
+            status=app.application_status,
+            reason=app.reason,
+            created_at=app.created_at,
+            created_by=app.created_by,
+            updated_at=app.updated_at,
+            updated_by=app.updated_by,
+        )
         for app in applications
     ]
 
-    return GeneralResponse(
+    return model_response(DataResponse[AdopterApplicationList](
         message="Applications retrieved successfully",
-        data={"applications": application_list}
-    )
+        data=AdopterApplicationList(applications=application_list)
+    ))
 
 
 @router.get(
     "/applications/{application_id}",
-    response_model=GeneralResponse,
+    response_model=DataResponse[ApplicationDetailResponse],
 )
-def get_application_by_id(
+async def get_application_by_id(
     application_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission(["Admin", "Adopter"]))  #allow access for admin and adopter roles
 ):
-    # Get application
-    application = (
-        db.query(Application)
-        .filter(
-            Application.id == application_id,
-            Application.is_deleted.is_(False)
-        )
-        .first()
+    # The response also shows animal and adopter fields, and whether the caller may see it,
+    # so the ETag covers all three tables and the caller
+    etag = await versioned_etag(
+        [Application.__tablename__, Animal.__tablename__, User.__tablename__],
+        "application", application_id, user_info["sub"],
     )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    # Served from memory while nothing has written this application, its animal or adopter
+    cached, generation = await get_cached_entity("application", application_id)
+
+    if cached is not None:
+        app_info = ApplicationDetailResponse.model_validate(cached)
+    else:
+        # Get application
+        application = (await db.execute(
+            join_eager(select(Application), Application.animal, Application.adopter)
+            .where(
+                Application.id == application_id,
+                Application.is_deleted.is_(False)
+            )
+        )).scalars().first()
 
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
+        if not application:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
+
+        # response data
+        app_info = ApplicationDetailResponse(
+            id=application.id,
+            animal_id=application.animal_id,
+            animal_name=application.animal.name,
+            photo_url=application.animal.photo_url,
+            adopter_id=application.adopter_id,
+            adopter_name=application.adopter.name,
+            reason=application.reason,
+            status=application.application_status,
+            created_at=application.created_at,
+            created_by=application.created_by,
+            updated_at=application.updated_at,
+            updated_by=application.updated_by,
         )
 
+        await cache_entity("application", application_id, app_info, generation)
+
     # If adopter, only allow viewing their own application
     role = user_info["role"]
     current_user_id = int(user_info["sub"])
 
-    if role == UserType.Adopter.value and application.adopter_id != current_user_id:
+    if role == UserType.Adopter.value and app_info.adopter_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not allowed to view this application"
         )
 
-    # response data
-    app_info = {
-        "id": application.id,
-        "animal_id": application.animal_id,
-        "animal_name": application.animal.name,
-        "photo_url": application.animal.photo_url,
-        "adopter_id": application.adopter_id,
-        "adopter_name": application.adopter.name,
-        "reason": application.reason,
-        "status": application.application_status.value,
-        "created_at": application.created_at,
-        "created_by": application.created_by,
-        "updated_at": application.updated_at,
-        "updated_by": application.updated_by,
-    }
-
-    return GeneralResponse(
-        message="Application retrieved successfully",
-        data=app_info
+    return model_response(
+        DataResponse[ApplicationDetailResponse](
+            message="Application retrieved successfully",
+            data=app_info
+        ),
+        response,
     )
 
 
@@ -186,21 +318,21 @@ def get_application_by_id(
     response_model=GeneralResponse,
     status_code=status.HTTP_201_CREATED
 )
-def create_application(
+async def create_application(
     request_data: CreateApplicationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Adopter"))
 ):
     adopter_id = int(user_info["sub"])
 
     # Check animal exists and is not deleted
-    animal = (
-        db.query(Animal)
-        .filter(
+    animal = (await db.execute(
+        select(Animal)
+        .where(
             Animal.id == request_data.animal_id,
             Animal.is_deleted.is_(False)
-        ).first()
-    )
+        )
+    )).scalars().first()
     if not animal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -215,14 +347,14 @@ def create_application(
         )
 
     # Prevent duplicate active applications
-    existing = (
-        db.query(Application)
-        .filter(
+    existing = (await db.execute(
+        select(Application)
+        .where(
             Application.animal_id == request_data.animal_id,
             Application.adopter_id == adopter_id,
             Application.is_deleted.is_(False)
-        ).first()
-    )
+        )
+    )).scalars().first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -239,8 +371,10 @@ def create_application(
     )
 
     db.add(new_app)
-    db.commit()
-    db.refresh(new_app)
+    await adjust_dashboard_counters(db, application_status_deltas(None, ApplicationStatus.Submitted))
+    await record_daily_stats(db, application_status_stats(ApplicationStatus.Submitted))
+    await db.commit()
+    await db.refresh(new_app)
 
     data_to_return = {
         "id": new_app.id,
@@ -255,25 +389,108 @@ def create_application(
 
 
 #Using PATCH because only one field(application_status) is being updated
+@router.patch(
+    "/applications/status",
+    response_model=DataResponse[BulkStatusResponse]
+)
+async def bulk_update_application_status(
+    request_data: BulkUpdateApplicationStatusRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_info = Depends(has_permission("Admin"))  # only admin can change status
+):
+    target_status = request_data.application_status
+    application_ids = list(dict.fromkeys(request_data.application_ids))
+
+    # Current status and animal of every requested application in one query, locked until commit
+    rows = (await db.execute(
+        select(Application.id, Application.application_status, Application.animal_id, Animal.adoption_status)
+        .join(Application.animal)
+        .where(
+            Application.id.in_(application_ids),
+            Application.is_deleted.is_(False)
+        )
+        .with_for_update(of=Application)
+    )).all()
+    found = {row.id: row for row in rows}
+
+    # Same checks as the single status change; an animal is adopted through one application per batch
+    outcomes = {}
+    old_statuses = {}
+    approved_animals = set()
+    for application_id in application_ids:
+        row = found.get(application_id)
+        if row is None:
+            outcomes[application_id] = "not_found"
+        elif row.application_status in COMPLETED_STATUSES:
+            outcomes[application_id] = "completed"
+        elif row.application_status == target_status:
+            outcomes[application_id] = "unchanged"
+        elif target_status == ApplicationStatus.Approved and (
+            row.adoption_status == AdoptionStatus.Adopted or row.animal_id in approved_animals
+        ):
+            outcomes[application_id] = "animal_adopted"
+        else:
+            old_statuses[application_id] = row.application_status
+            if target_status == ApplicationStatus.Approved:
+                approved_animals.add(row.animal_id)
+
+    updated_ids = await transition_applications(db, old_statuses, target_status, user_info["username"])
+    for application_id in old_statuses:
+        # Completed by another request between the read and the update
+        outcomes[application_id] = "updated" if application_id in updated_ids else "completed"
+
+    adopted_animal_ids = set()
+    rejected_ids = []
+    if target_status == ApplicationStatus.Approved:
+        adopted_animal_ids = {found[application_id].animal_id for application_id in updated_ids}
+        await mark_animals_adopted(db, adopted_animal_ids, user_info["username"])
+        rejected_ids = await reject_competing_applications(db, adopted_animal_ids, updated_ids, user_info["username"])
+        for application_id in rejected_ids:
+            if application_id in outcomes:
+                outcomes[application_id] = "auto_rejected"
+
+    await db.commit()
+
+    for application_id in [*updated_ids, *rejected_ids]:
+        await invalidate_entity("application", application_id)
+    for animal_id in adopted_animal_ids:
+        await invalidate_entity("animal", animal_id)
+
+    return model_response(
+        DataResponse[BulkStatusResponse](
+            message=f"{len(updated_ids)} of {len(application_ids)} applications updated",
+            data=BulkStatusResponse(
+                application_status=target_status,
+                updated=len(updated_ids),
+                auto_rejected=len(rejected_ids),
+                results=[
+                    BulkStatusResult(id=application_id, outcome=outcomes[application_id])
+                    for application_id in application_ids
+                ],
+            ),
+        ),
+        headers={"X-Auto-Rejected-Count": str(len(rejected_ids))},
+    )
+
+
 @router.patch(
     "/applications/{application_id}/status",
     status_code=status.HTTP_204_NO_CONTENT
 )
-def update_application_status(
+async def update_application_status(
     application_id: int,
     request_data: UpdateApplicationStatusRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin"))  # only admin can change status
 ):
     # Fetch application
-    application = (
-        db.query(Application)
-        .filter(
+    application = (await db.execute(
+        join_eager(select(Application), Application.animal)
+        .where(
             Application.id == application_id,
             Application.is_deleted.is_(False)
         )
-        .first()
-    )
+    )).scalars().first()
 
     if not application:
         raise HTTPException(
@@ -296,21 +513,39 @@ def update_application_status(
         )
 
     # Update application status
+    await adjust_dashboard_counters(
+        db,
+        application_status_deltas(application.application_status, request_data.application_status)
+    )
+    if request_data.application_status != application.application_status:
+        await record_daily_stats(db, application_status_stats(request_data.application_status))
     application.application_status = request_data.application_status
     application.updated_at = datetime.utcnow()
     application.updated_by = user_info["username"]
 
     # If application is approved, update adoption_status of animal to Adopted
+    # and reject every other open application for it
+    rejected_ids = []
     if request_data.application_status == ApplicationStatus.Approved.value:
         animal = application.animal
         animal.adoption_status = AdoptionStatus.Adopted
         animal.updated_at = datetime.utcnow()
         animal.updated_by = user_info["username"]
+        rejected_ids = await reject_competing_applications(
+            db, [application.animal_id], [application_id], user_info["username"]
+        )
 
-    db.commit()
-    db.refresh(application)
+    await db.commit()
 
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    for changed_id in [application_id, *rejected_ids]:
+        await invalidate_entity("application", changed_id)
+    if request_data.application_status == ApplicationStatus.Approved.value:
+        await invalidate_entity("animal", application.animal_id)
+
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"X-Auto-Rejected-Count": str(len(rejected_ids))},
+    )
 
 
 @router.put(
@@ -320,16 +555,18 @@ def update_application_status(
 async def update_application_by_adopter(
     application_id: int,
     request_data: AdopterUpdateApplication,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission(["Adopter"])),
 ):
     current_user_id = int(user_info["sub"])
 
     # Fetch application
-    application = db.query(Application).filter(
-        Application.id == application_id,
-        Application.is_deleted.is_(False)
-    ).first()
+    application = (await db.execute(
+        select(Application).where(
+            Application.id == application_id,
+            Application.is_deleted.is_(False)
+        )
+    )).scalars().first()
 
     if not application:
         raise HTTPException(
@@ -359,13 +596,20 @@ async def update_application_by_adopter(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Only cancellation is allowed."
             )
+        await adjust_dashboard_counters(
+            db,
+            application_status_deltas(application.application_status, request_data.application_status)
+        )
+        if request_data.application_status != application.application_status:
+            await record_daily_stats(db, application_status_stats(request_data.application_status))
         application.application_status = request_data.application_status
 
     application.updated_at = datetime.utcnow()
     application.updated_by = user_info["username"]
 
-    db.commit()
-    db.refresh(application)
+    await db.commit()
+
+    await invalidate_entity("application", application_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -376,15 +620,17 @@ async def update_application_by_adopter(
 )
 async def delete_application_by_ID(
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission(["Admin"])),
 ):
 
     # Fetch application
-    application = db.query(Application).filter(
-        Application.id == application_id,
-        Application.is_deleted.is_(False)
-    ).first()
+    application = (await db.execute(
+        select(Application).where(
+            Application.id == application_id,
+            Application.is_deleted.is_(False)
+        )
+    )).scalars().first()
 
     if not application:
         raise HTTPException(
@@ -393,11 +639,13 @@ async def delete_application_by_ID(
         )
 
     # Soft delete
+    await adjust_dashboard_counters(db, application_status_deltas(application.application_status, None))
     application.is_deleted = True
     application.updated_at = datetime.utcnow()
     application.updated_by = user_info["username"]
 
-    db.commit()
-    db.refresh(application)
+    await db.commit()
+
+    await invalidate_entity("application", application_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from fastapi import APIRouter, HTTPException, Response, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models.user import User
 from app.models.enums import UserType
 from app.schemas.login_schema import AdminLoginRequest, AdopterLoginRequest
 from app.schemas.general_schema import GeneralResponse
+from app.dependencies.auth_dependency import get_current_user, security
 from app.utils.auth_util import create_access_token, verify_password
+from app.utils.token_cache_util import revoke_token
+from app.utils.worker_pool import run_in_worker_pool
 
 
 router = APIRouter(prefix="/auth", tags=["Auth Management"])
@@ -19,17 +24,19 @@ router = APIRouter(prefix="/auth", tags=["Auth Management"])
     "/login/admin",
     response_model=GeneralResponse
 )
-def admin_login(
+async def admin_login(
     login_request_data: AdminLoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
 
     try:
         #find admin if exists or not
-        user = db.query(User).filter(
-            User.email == login_request_data.email,
-            User.is_deleted.is_(False)
-        ).first()
+        user = (await db.execute(
+            select(User).where(
+                User.email == login_request_data.email,
+                User.is_deleted.is_(False)
+            )
+        )).scalars().first()
 
         if not user:
             raise HTTPException(status_code=400, detail="Invalid email")
@@ -39,7 +46,8 @@ def admin_login(
             raise HTTPException(status_code=403, detail="Admin access only")
 
         # Check password
-        if not verify_password(login_request_data.password, user.password):
+        # bcrypt is CPU-bound, run it in the process pool
+        if not await run_in_worker_pool(verify_password, login_request_data.password, user.password):
             raise HTTPException(status_code=400, detail="Incorrect password")
 
         # Create JWT token
@@ -57,7 +65,7 @@ def admin_login(
         )
 
     finally:
-        db.close()
+        await db.close()
 
 
 #===========================
@@ -68,17 +76,19 @@ def admin_login(
     "/login/adopter",
     response_model=GeneralResponse
 )
-def adopter_login(
+async def adopter_login(
     login_request_data: AdopterLoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     try:
         # Find adopter if exists or not
-        adopter = db.query(User).filter(
-            User.email == login_request_data.email,
-            User.is_deleted.is_(False)
-        ).first()
+        adopter = (await db.execute(
+            select(User).where(
+                User.email == login_request_data.email,
+                User.is_deleted.is_(False)
+            )
+        )).scalars().first()
 
         if not adopter:
             raise HTTPException(status_code=400, detail="Invalid email")
@@ -88,7 +98,8 @@ def adopter_login(
             raise HTTPException(status_code=403, detail="Adopter access only")
 
         # Check password
-        if not verify_password(login_request_data.password, adopter.password):
+        # bcrypt is CPU-bound, run it in the process pool
+        if not await run_in_worker_pool(verify_password, login_request_data.password, adopter.password):
             raise HTTPException(status_code=400, detail="Incorrect password")
 
         # Create JWT token
@@ -106,4 +117,23 @@ def adopter_login(
         )
 
     finally:
-        db.close()
+        await db.close()
+
+
+#===========================
+#      Logout Endpoint
+#===========================
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_info = Depends(get_current_user),
+):
+
+    # Reject this token from now on, even though its signature stays valid (503 when that cannot be recorded)
+    await revoke_token(credentials.credentials, user_info)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,67 +1,160 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models import Animal, User, Application
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.models import DashboardCounter
 from app.schemas.general_schema import GeneralResponse
 from app.dependencies.auth_dependency import has_permission
-from app.models.enums import ApplicationStatus, UserType
+from app.utils.cache_backend_util import get_cache_backend
+from app.utils.counter_util import DASHBOARD_COUNTER_ID, reconcile_dashboard_counters
+from app.utils.stats_util import backfill_daily_stats, get_daily_stats_series
+from app.utils.entity_cache_util import get_entity_cache_stats
+from app.utils.image_variant_util import get_variant_cache_stats
+from app.utils.listing_cache_util import get_listing_cache_stats
+from app.utils.token_cache_util import get_token_cache_stats
+from app.utils.worker_pool import get_image_pool_stats, get_worker_pool_stats
 
 router = APIRouter(prefix="/dashboard-management", tags=["Dashboard Management"])
 
+# Longest range a statistics request may cover
+MAX_STATISTICS_DAYS = 731
+
+
+def _format_counters(counter: DashboardCounter):
+    return {
+        "total_animals": counter.total_animals,
+        "total_pending_applications": counter.total_pending_applications,
+        "total_approved_applications": counter.total_approved_applications,
+        "total_rejected_applications": counter.total_rejected_applications,
+        "total_cancelled_applications": counter.total_cancelled_applications,
+        "total_adopters": counter.total_adopters,
+        "total_admins": counter.total_admins,
+    }
+
+
 @router.get(
     "/dashboard/summary",
     response_model=GeneralResponse
 )
-def get_dashboard_summary(
-    db: Session = Depends(get_db),
+async def get_dashboard_summary(
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission(["Admin"])),
 ):
 
-    # Count animals
-    total_animals = db.query(Animal).filter(
-        Animal.is_deleted.is_(False)
-    ).count()
-
-    # Pending applications
-    pending_applications = db.query(Application).filter(
-        Application.is_deleted.is_(False),
-        Application.application_status == ApplicationStatus.Submitted
-    ).count()
-
-    # Approved applications
-    approved_applications = db.query(Application).filter(
-        Application.is_deleted.is_(False),
-        Application.application_status == ApplicationStatus.Approved
-    ).count()
-
-    # Rejected applications
-    rejected_applications = db.query(Application).filter(
-        Application.is_deleted.is_(False),
-        Application.application_status == ApplicationStatus.Rejected
-    ).count()
-
-    # Count adopters
-    total_adopters = db.query(User).filter(
-        User.is_deleted.is_(False),
-        User.user_type == UserType.Adopter
-    ).count()
-
-    # Count admins
-    total_admins = db.query(User).filter(
-        User.is_deleted.is_(False),
-        User.user_type == UserType.Admin
-    ).count()
-
-    data = {
-        "total_animals": total_animals,
-        "total_pending_applications": pending_applications,
-        "total_approved_applications": approved_applications,
-        "total_rejected_applications": rejected_applications,
-        "total_adopters": total_adopters,
-        "total_admins": total_admins,
-    }
+    # Counters are maintained by the write paths, so this is a single primary-key read
+    counter = await db.get(DashboardCounter, DASHBOARD_COUNTER_ID)
+
+    # Counters row has not been seeded yet
+    if not counter:
+        counter = await db.run_sync(reconcile_dashboard_counters)
+        await db.commit()
 
     return GeneralResponse(
         message="Dashboard summary retrieved successfully",
-        data=data
+        data=_format_counters(counter)
+    )
+
+
+@router.post(
+    "/dashboard/reconcile",
+    response_model=GeneralResponse
+)
+async def reconcile_dashboard_summary(
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(has_permission(["Admin"])),
+):
+
+    # Recompute the counters from the source tables, repairing any drift
+    counter = await db.run_sync(reconcile_dashboard_counters)
+    await db.commit()
+
+    return GeneralResponse(
+        message="Dashboard counters reconciled successfully",
+        data=_format_counters(counter)
+    )
+
+
+@router.get(
+    "/dashboard/statistics",
+    response_model=GeneralResponse
+)
+async def get_adoption_statistics(
+    start_date: date | None = Query(None, description="First day (UTC), defaults to 30 days before end_date"),
+    end_date: date | None = Query(None, description="Last day (UTC), defaults to today"),
+    granularity: str = Query("day", pattern="^(day|week)$", description="Bucket size: day or week"),
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(has_permission(["Admin"])),
+):
+
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=29)
+
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+
+    if (end_date - start_date).days >= MAX_STATISTICS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_STATISTICS_DAYS} days"
+        )
+
+    # Read from the daily rollups, at most one row per day in the range
+    series = await get_daily_stats_series(db, start_date, end_date, granularity)
+
+    return GeneralResponse(
+        message="Adoption statistics retrieved successfully",
+        data={
+            "start_date": start_date,
+            "end_date": end_date,
+            "granularity": granularity,
+            "series": series,
+        }
+    )
+
+
+@router.post(
+    "/dashboard/statistics/backfill",
+    response_model=GeneralResponse
+)
+async def backfill_adoption_statistics(
+    start_date: date | None = Query(None, description="First day to rebuild, defaults to the earliest record"),
+    end_date: date | None = Query(None, description="Last day to rebuild, defaults to today"),
+    db: AsyncSession = Depends(get_async_db),
+    _ = Depends(has_permission(["Admin"])),
+):
+
+    # Rebuild the rollups from the source tables
+    days_written = await db.run_sync(backfill_daily_stats, start_date, end_date)
+    await db.commit()
+
+    return GeneralResponse(
+        message="Adoption statistics backfilled successfully",
+        data={"days_written": days_written}
+    )
+
+
+@router.get(
+    "/dashboard/metrics",
+    response_model=GeneralResponse
+)
+async def get_runtime_metrics(
+    _ = Depends(has_permission(["Admin"])),
+):
+
+    # In-process runtime metrics of this server instance
+    return GeneralResponse(
+        message="Runtime metrics retrieved successfully",
+        data={
+            "worker_pool": get_worker_pool_stats(),
+            "image_pool": get_image_pool_stats(),
+            "token_cache": get_token_cache_stats(),
+            "image_variant_cache": await run_in_threadpool(get_variant_cache_stats),
+            "entity_cache": get_entity_cache_stats(),
+            "listing_cache": get_listing_cache_stats(),
+            "cache_backend": get_cache_backend().stats(),
+        }
     )
@@ -0,0 +1,112 @@
+# References:
+# https://fastapi.tiangolo.com/advanced/custom-response/#fileresponse
+# https://fastapi.tiangolo.com/tutorial/path-params/#path-convertor
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Caching
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from PIL import UnidentifiedImageError
+from app.utils.http_cache_util import IMMUTABLE_CACHE_CONTROL, PathSendFileResponse, etag_matches, not_modified
+from app.utils.image_blob_util import blob_hash_of
+from app.utils.image_util import IMAGES_DIR
+from app.utils.image_variant_util import (
+    IMAGE_VARIANT_FORMATS,
+    IMAGE_VARIANT_WIDTHS,
+    add_cached_variant,
+    render_image_variant,
+    touch_cached_variant,
+    variant_path,
+)
+from app.utils.worker_pool import run_in_image_pool
+
+
+router = APIRouter(prefix="/images", tags=["Images"])
+
+# Flat-named uploads from before content addressing could in principle be replaced in place
+LEGACY_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _resolve_original(name: str):
+    # Only files inside the images directory, never temp files or paths escaping it
+    path = (IMAGES_DIR / name).resolve()
+
+    if (
+        not path.is_relative_to(IMAGES_DIR.resolve())
+        or path.name.startswith(".")
+        or not path.is_file()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    return path
+
+
+def _file_response(request: Request, path, etag: str, cache_control: str, media_type: str | None = None):
+    # 304 when the client's copy is current, otherwise the file (Range requests included)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    return PathSendFileResponse(
+        path,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def _original_etag(original, digest: str | None):
+    # Content hash when the name carries one, otherwise file identity
+    if digest:
+        return f'"{digest}"'
+
+    stat = original.stat()
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+@router.get("/{name:path}")
+@router.head("/{name:path}", include_in_schema=False)
+async def get_image(
+    request: Request,
+    name: str,
+    w: int | None = Query(None, description=f"Width in pixels, one of {IMAGE_VARIANT_WIDTHS}"),
+    fmt: str | None = Query(None, pattern="^(webp|jpeg|png)$", description="Output format: webp, jpeg or png"),
+):
+    original = _resolve_original(name)
+
+    # Content-addressed files never change under the same URL, so browsers and proxies keep them
+    digest = blob_hash_of(f"/images/{name}")
+    cache_control = IMMUTABLE_CACHE_CONTROL if digest else LEGACY_CACHE_CONTROL
+
+    # Original file as uploaded
+    if w is None and fmt is None:
+        return _file_response(request, original, _original_etag(original, digest), cache_control)
+
+    if w is not None and w not in IMAGE_VARIANT_WIDTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Width must be one of {IMAGE_VARIANT_WIDTHS}"
+        )
+
+    fmt = fmt or "webp"
+    media_type = IMAGE_VARIANT_FORMATS[fmt][1]
+    variant = variant_path(original, w, fmt)
+
+    # The variant name is derived from the original and the parameters, so it works as the ETag
+    # and a revalidation never has to generate the variant
+    variant_etag = f'"{variant.stem}"'
+    if etag_matches(request, variant_etag):
+        return not_modified(variant_etag, cache_control)
+
+    # Generate the variant once, then serve it from the disk cache
+    # The cache index scans and evicts files, so it is kept off the event loop
+    if not await run_in_threadpool(touch_cached_variant, variant):
+        try:
+            size = await run_in_image_pool(render_image_variant, str(original), str(variant), w, fmt)
+        except (UnidentifiedImageError, OSError):
+            # Cannot be decoded, the original is still better than nothing
+            return _file_response(request, original, _original_etag(original, digest), LEGACY_CACHE_CONTROL)
+
+        await run_in_threadpool(add_cached_variant, variant, size)
+
+    return _file_response(request, variant, variant_etag, cache_control, media_type)
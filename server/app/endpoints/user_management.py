@@ -1,67 +1,104 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
-from app.db.database import get_db
+from app.db.database import get_async_db, get_async_session_factory
 from app.utils.auth_util import hash_password
+from app.utils.worker_pool import run_in_worker_pool
 from app.dependencies.auth_dependency import has_permission
 from app.models.enums import UserType
 from app.models.user import User
 from datetime import datetime
 from app.utils.common_util import paginate_query
-from app.schemas.general_schema import GeneralResponse
+from app.utils.export_util import session_dialect, stream_export
+from app.utils.search_util import apply_user_search
+from app.utils.counter_util import USER_TYPE_COUNTERS, adjust_dashboard_counters, user_type_deltas
+from app.utils.token_cache_util import invalidate_user_tokens
+from app.utils.entity_cache_util import cache_entity, get_cached_entity, invalidate_entities, invalidate_entity
+from app.schemas.general_schema import DataResponse, GeneralResponse
 from app.schemas.user_schema import (
     CreateAdminRequest,
     UpdateAdminRequest,
     CreateAdopterRequest,
     UpdateAdopterRequest,
+    CurrentUserResponse,
+    UserPage,
+    UserResponse,
 )
+from app.utils.fieldset_util import parse_fields, project_columns, sparse_page
+from app.utils.response_util import model_response
 
 
 router = APIRouter(prefix="/user-management", tags=["User Management"])
 
+# Fields the user listings can be narrowed to with fields=
+USER_FIELDS = list(UserResponse.model_fields)
+USER_COLUMNS = {name: getattr(User, name) for name in USER_FIELDS}
+
 
 #===========================
 #      Admin Endpoints
 #===========================
 
 
-@router.get("/users", response_model=GeneralResponse)
-def get_all_admin_users(
+@router.get("/users", response_model=DataResponse[UserPage])
+async def get_all_admin_users(
     page: int = Query(1, ge=1, description="Page number must be greater than 0)"),
     limit: int = Query(10, ge=1, le=100, description="Limit must be greater than 0"),
     search: str | None = Query(None, description="Search by name or email or address"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="Opaque cursor from next_cursor; replaces page when given"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$", description="How to compute total: exact, estimate or none; cursor pages always use none"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to return for each user (id is always included): {', '.join(USER_FIELDS)}"),
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission("Admin")),
 ):
 
-    data_to_return = _get_all_users_by_role(
+    data_to_return = await _get_all_users_by_role(
         page, 
         limit,
         search,
+        cursor,
+        total_mode,
+        fields,
         UserType.Admin.value, 
         db
     )
 
-    return GeneralResponse(
+    # fields= pages hold plain rows, not a UserPage
+    if isinstance(data_to_return, dict):
+        return model_response({"message": "Get all users successfully", "data": data_to_return})
+
+    return model_response(DataResponse[UserPage](
         message="Get all users successfully",
         data=data_to_return
-    )
+    ))
+
 
+@router.get("/users/export", response_class=StreamingResponse)
+async def export_admin_users(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    search: str | None = Query(None, description="Search by name or email or address"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to export (id is always included): {', '.join(USER_FIELDS)}"),
+    session_factory = Depends(get_async_session_factory),
+    _ = Depends(has_permission("Admin")),
+):
+    return _export_users(session_factory, export_format, search, fields, UserType.Admin.value, "admins")
 
-@router.get("/users/{user_id}", response_model=GeneralResponse)
-def get_admin_user_by_id(
+
+@router.get("/users/{user_id}", response_model=DataResponse[UserResponse])
+async def get_admin_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission("Admin"))
 ):
     
-    data_to_return = _get_user_by_ID(user_id, UserType.Admin.value, db)
+    data_to_return = await _get_user_by_ID(user_id, UserType.Admin.value, db)
 
-    return GeneralResponse(
+    return model_response(DataResponse[UserResponse](
         message="Get user by ID successfully",
         data=data_to_return
-    )
+    ))
 
 
 @router.post(
@@ -69,12 +106,12 @@ def get_admin_user_by_id(
     response_model=GeneralResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_user_admin(
+async def create_user_admin(
     request_data: CreateAdminRequest, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin"))
 ):
-    new_user_id = _create_new_account(request_data, UserType.Admin, db)
+    new_user_id = await _create_new_account(request_data, UserType.Admin, db)
 
     return GeneralResponse(
         message="Admin account created successfully",
@@ -83,29 +120,31 @@ def create_user_admin(
 
 
 @router.put("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def update_user_admin(
+async def update_user_admin(
     user_id: int,
     request_data: UpdateAdminRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin")),
 ):
 
-    _ = _update_user_by_ID(user_id, request_data, UserType.Admin.value, db, user_info)
+    _ = await _update_user_by_ID(user_id, request_data, UserType.Admin.value, db, user_info)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_admin(
+async def delete_user_admin(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Admin"))
 ):
     # Check if user exists
-    existing_user = db.query(User).filter(
-        User.id == user_id,
-        User.is_deleted.is_(False)
-    ).first()
+    existing_user = (await db.execute(
+        select(User).where(
+            User.id == user_id,
+            User.is_deleted.is_(False)
+        )
+    )).scalars().first()
 
     if not existing_user:
         raise HTTPException(
@@ -126,7 +165,14 @@ def delete_user_admin(
     existing_user.updated_at = datetime.utcnow()
     existing_user.updated_by = user_info["username"]
 
-    db.commit()
+    # Tokens of the deleted account stop working immediately; revoked before committing,
+    # so the account is left as it was when the revocation cannot be recorded (503)
+    await invalidate_user_tokens(existing_user.id)
+
+    await adjust_dashboard_counters(db, user_type_deltas(existing_user.user_type, -1))
+    await db.commit()
+
+    await invalidate_entity("user", existing_user.id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -136,42 +182,63 @@ def delete_user_admin(
 #===========================
 
 
-@router.get("/adopters", response_model=GeneralResponse)
-def get_all_adopters(
+@router.get("/adopters", response_model=DataResponse[UserPage])
+async def get_all_adopters(
     page: int = Query(1, ge=1, description="Page number must be greater than 0)"),
     limit: int = Query(10, ge=1, le=100, description="Limit must be greater than 0"),
     search: str | None = Query(None, description="Search by name or email or address"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="Opaque cursor from next_cursor; replaces page when given"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$", description="How to compute total: exact, estimate or none; cursor pages always use none"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to return for each user (id is always included): {', '.join(USER_FIELDS)}"),
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission("Admin")),
 ):
 
-    data_to_return = _get_all_users_by_role(
+    data_to_return = await _get_all_users_by_role(
         page, 
         limit,
         search,
+        cursor,
+        total_mode,
+        fields,
         UserType.Adopter.value, 
         db
     )
 
-    return GeneralResponse(
+    # fields= pages hold plain rows, not a UserPage
+    if isinstance(data_to_return, dict):
+        return model_response({"message": "Get all adopters successfully", "data": data_to_return})
+
+    return model_response(DataResponse[UserPage](
         message="Get all adopters successfully",
         data=data_to_return
-    )
+    ))
+
+
+@router.get("/adopters/export", response_class=StreamingResponse)
+async def export_adopters(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    search: str | None = Query(None, description="Search by name or email or address"),
+    fields: str | None = Query(None, description=f"Comma-separated fields to export (id is always included): {', '.join(USER_FIELDS)}"),
+    session_factory = Depends(get_async_session_factory),
+    _ = Depends(has_permission("Admin")),
+):
+    return _export_users(session_factory, export_format, search, fields, UserType.Adopter.value, "adopters")
 
 
-@router.get("/adopters/{adopter_id}", response_model=GeneralResponse)
-def get_adopter_by_id(
+@router.get("/adopters/{adopter_id}", response_model=DataResponse[UserResponse])
+async def get_adopter_by_id(
     adopter_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _ = Depends(has_permission(["Admin", "Adopter"]))
 ):
     
-    data_to_return = _get_user_by_ID(adopter_id, UserType.Adopter.value, db)
+    data_to_return = await _get_user_by_ID(adopter_id, UserType.Adopter.value, db)
 
-    return GeneralResponse(
+    return model_response(DataResponse[UserResponse](
         message="Get adopter by ID successfully",
         data=data_to_return
-    )
+    ))
 
 
 @router.post(
@@ -179,11 +246,11 @@ def get_adopter_by_id(
     response_model=GeneralResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_adopter(
+async def create_adopter(
     request_data: CreateAdopterRequest, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    new_user_id = _create_new_account(request_data, UserType.Adopter, db)
+    new_user_id = await _create_new_account(request_data, UserType.Adopter, db)
 
     return GeneralResponse(
         message="Adopter account created successfully",
@@ -192,22 +259,22 @@ def create_adopter(
 
 
 @router.put("/adopters/{adopter_id}", status_code=status.HTTP_204_NO_CONTENT)
-def update_adopter(
+async def update_adopter(
     adopter_id: int,
     request_data: UpdateAdopterRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission("Adopter")),
 ):
 
-    _ = _update_user_by_ID(adopter_id, request_data, UserType.Adopter.value, db, user_info)
+    _ = await _update_user_by_ID(adopter_id, request_data, UserType.Adopter.value, db, user_info)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.delete("/adopters/{adopter_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_adopter(
+async def delete_adopter(
     adopter_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info = Depends(has_permission(["Admin", "Adopter"])), # permit deletion for both admin and adopter roles
 ):
     
@@ -215,11 +282,13 @@ def delete_adopter(
     current_user_role = user_info["role"]
 
     # Check if user exists
-    existing_user = db.query(User).filter(
-        User.id == adopter_id,
-        User.is_deleted.is_(False),
-        User.user_type == UserType.Adopter.value,
-    ).first()
+    existing_user = (await db.execute(
+        select(User).where(
+            User.id == adopter_id,
+            User.is_deleted.is_(False),
+            User.user_type == UserType.Adopter.value,
+        )
+    )).scalars().first()
 
     if not existing_user:
         raise HTTPException(
@@ -239,7 +308,14 @@ def delete_adopter(
     existing_user.updated_at = datetime.utcnow()
     existing_user.updated_by = user_info["username"]
 
-    db.commit()
+    # Tokens of the deleted account stop working immediately; revoked before committing,
+    # so the account is left as it was when the revocation cannot be recorded (503)
+    await invalidate_user_tokens(existing_user.id)
+
+    await adjust_dashboard_counters(db, user_type_deltas(existing_user.user_type, -1))
+    await db.commit()
+
+    await invalidate_entity("user", existing_user.id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -251,23 +327,16 @@ def delete_adopter(
 
 @router.get(
     "/current-user",
-    response_model=GeneralResponse
+    response_model=DataResponse[CurrentUserResponse]
 )
-def get_current_user_info(
+async def get_current_user_info(
     user_info = Depends(has_permission(["Admin", "Adopter"])),  # allow both roles
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     current_user_id = int(user_info["sub"])
 
-    # fetch current user from DB
-    user = (
-        db.query(User)
-        .filter(
-            User.id == current_user_id,
-            User.is_deleted.is_(False)
-        )
-        .first()
-    )
+    # fetch current user from the entity cache or DB
+    user = await _get_active_user(current_user_id, db)
 
     if not user:
         raise HTTPException(
@@ -275,23 +344,15 @@ def get_current_user_info(
             detail="User not found"
         )
 
-    user_data = {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "phone": user.phone,
-        "address": user.address,
-        "role": user.user_type.value,
-        "created_at": user.created_at,
-        "created_by": user.created_by,
-        "updated_at": user.updated_at,
-        "updated_by": user.updated_by,
-    }
+    user_data = CurrentUserResponse(
+        role=user.user_type,
+        **user.model_dump(exclude={"user_type"}),
+    )
 
-    return GeneralResponse(
+    return model_response(DataResponse[CurrentUserResponse](
         message="User information retrieved successfully",
         data=user_data
-    )
+    ))
 
 
 #===========================
@@ -299,20 +360,20 @@ def get_current_user_info(
 #===========================
 
 
-def _create_new_account(
+async def _create_new_account(
     request_data: dict, 
     user_type: str, 
-    db: Session
+    db: AsyncSession
 ):
     # Check duplicate email
-    existing_user = db.query(User).filter(User.email == request_data.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == request_data.email))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    hashed_pw = hash_password(request_data.password)
+    hashed_pw = await run_in_worker_pool(hash_password, request_data.password)
 
     new_user = User(
         name=request_data.name,
@@ -326,112 +387,157 @@ def _create_new_account(
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await adjust_dashboard_counters(db, user_type_deltas(user_type, 1))
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user.id
 
 
-def _get_all_users_by_role(
+def _format_user(user: User):
+    return UserResponse(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        phone=user.phone,
+        address=user.address,
+        user_type=user.user_type,
+        created_at=user.created_at,
+        created_by=user.created_by,
+        updated_at=user.updated_at,
+        updated_by=user.updated_by,
+    )
+
+
+def _filter_users(query, user_type: str, search, dialect: str):
+    # Filters shared by the listings and the exports
+    query = (
+        query
+        .where(
+            User.user_type==user_type,
+            User.is_deleted.is_(False),
+        )
+    )
+
+    #search by username or email or address through the trigram index
+    if search:
+        query = apply_user_search(query, search, dialect)
+
+    return query
+
+
+def _export_users(session_factory, export_format: str, search, fields, user_type: str, filename: str):
+    field_names = parse_fields(fields, USER_FIELDS) or USER_FIELDS
+
+    query = select(*project_columns(field_names, USER_COLUMNS))
+    query = _filter_users(query, user_type, search, session_dialect(session_factory))
+
+    return stream_export(session_factory, query, field_names, [(User.id, False)], export_format, filename)
+
+
+async def _get_all_users_by_role(
     page: int,
     limit: int,
     search: str | None,
+    cursor: str | None,
+    total_mode: str,
+    fields: str | None,
     user_type: str,
-    db: Session,
+    db: AsyncSession,
 ):
-    query = (
-        db.query(User)
-        .filter(
-            User.user_type==user_type,
-            User.is_deleted.is_(False),
-        ).order_by(User.id.asc())
+    field_names = parse_fields(fields, USER_FIELDS)
+
+    # With fields= only those columns, as plain rows
+    query = select(User) if field_names is None else select(*project_columns(field_names, USER_COLUMNS))
+    query = _filter_users(query, user_type, search, db.get_bind().dialect.name)
+
+    paginated_info = await paginate_query(
+        db,
+        query,
+        page,
+        limit,
+        cursor,
+        sort_keys=[(User.id, False)],
+        total_mode=total_mode,
+        # Without a search the maintained counter is the total
+        counter_columns=None if search else [USER_TYPE_COUNTERS[UserType(user_type)]],
     )
 
-    #search by username or email or address
-    if search:
-        query = query.filter(
-            or_(
-                User.name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
-                User.address.ilike(f"%{search}%")
-            )
-        )
+    if field_names is not None:
+        return sparse_page(paginated_info, "users", paginated_info["query_data"])
+
+    users = [_format_user(user) for user in paginated_info["query_data"]]
 
-    paginated_info = paginate_query(query, page, limit)
-
-    users = [
-        {
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "phone": user.phone,
-            "address": user.address,
-            "user_type": user.user_type.value,
-            "created_at": user.created_at,
-            "created_by": user.created_by,
-            "updated_at": user.updated_at,
-            "updated_by": user.updated_by,
-        }
-        for user in paginated_info["query_data"]
-    ]
-
-    data_to_return = {
-        "page": paginated_info["page"],
-        "limit": paginated_info["limit"],
-        "total": paginated_info["total"],
-        "total_pages": paginated_info["total_pages"],
-        "users": users
-    }
+    data_to_return = UserPage(
+        page=paginated_info["page"],
+        limit=paginated_info["limit"],
+        total=paginated_info["total"],
+        total_pages=paginated_info["total_pages"],
+        total_mode=paginated_info["total_mode"],
+        next_cursor=paginated_info["next_cursor"],
+        users=users,
+    )
 
     return data_to_return
 
 
-def _get_user_by_ID(
+async def _get_active_user(
     user_id: int,
-    user_type: str,
-    db: Session,
+    db: AsyncSession,
 ):
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.user_type == user_type,
-        User.is_deleted.is_(False),
-    ).first()
+    # Formatted user that is not soft-deleted, served from memory while nothing has written it
+    cached, generation = await get_cached_entity("user", user_id)
+    if cached is not None:
+        return UserResponse.model_validate(cached)
+
+    user = (await db.execute(
+        select(User).where(
+            User.id == user_id,
+            User.is_deleted.is_(False),
+        )
+    )).scalars().first()
 
     if not user:
+        return None
+
+    data = _format_user(user)
+
+    await cache_entity("user", user_id, data, generation)
+
+    return data
+
+
+async def _get_user_by_ID(
+    user_id: int,
+    user_type: str,
+    db: AsyncSession,
+):
+    data_to_return = await _get_active_user(user_id, db)
+
+    if not data_to_return or data_to_return.user_type != user_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    data_to_return = {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "phone": user.phone,
-        "address": user.address,
-        "user_type": user.user_type.value,
-        "created_at": user.created_at,
-        "created_by": user.created_by,
-        "updated_at": user.updated_at,
-        "updated_by": user.updated_by,
-    }
 
     return data_to_return
 
 
-def _update_user_by_ID(
+async def _update_user_by_ID(
     user_id: int,
     request_data: dict, 
     user_type: str, 
-    db: Session,
+    db: AsyncSession,
     user_info: Dict[str, Any],
 ):
     
-    existing_user = db.query(User).filter(
-        User.id == user_id,
-        User.user_type == user_type,
-        User.is_deleted.is_(False)
-    ).first()
+    existing_user = (await db.execute(
+        select(User).where(
+            User.id == user_id,
+            User.user_type == user_type,
+            User.is_deleted.is_(False)
+        )
+    )).scalars().first()
 
     if not existing_user:
         raise HTTPException(
@@ -449,10 +555,10 @@ def _update_user_by_ID(
         existing_user.address = request_data.address
 
     if request_data.password:
-        existing_user.password = hash_password(request_data.password)
+        existing_user.password = await run_in_worker_pool(hash_password, request_data.password)
 
     if request_data.email and request_data.email != existing_user.email:
-        email_exists = db.query(User).filter(User.email == request_data.email).first()
+        email_exists = (await db.execute(select(User).where(User.email == request_data.email))).scalars().first()
         if email_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -463,4 +569,8 @@ def _update_user_by_ID(
     existing_user.updated_by = user_info["username"]
     existing_user.updated_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
+
+    # Application details show the adopter's name
+    await invalidate_entity("user", user_id)
+    await invalidate_entities("application")
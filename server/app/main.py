@@ -1,26 +1,41 @@
 # References:
-# https://fastapi.tiangolo.com/tutorial/static-files/
 # https://docs.python.org/3/library/pathlib.html
+# https://fastapi.tiangolo.com/advanced/events/#lifespan
 
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
-from app.db.database import Base, engine
+from app.db.database import engine
+from app.db.migration import run_migrations
+from app.utils.animal_import_util import MAX_IMPORT_UPLOAD_BYTES
+from app.utils.body_limit_util import BodySizeLimitMiddleware
+from app.utils.image_util import IMAGES_DIR
+from app.utils.response_util import ORJSONResponse
+from app.utils.worker_pool import shutdown_worker_pools, start_worker_pools
 from app.endpoints import (
     auth_router,
     user_router,
     animal_router,
     application_router,
     dashboard_router,
+    image_router,
 )
 
 
-app = FastAPI()
+# Start the password hashing and image rendering pools with the server and stop their processes on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_worker_pools()
+    yield
+    shutdown_worker_pools()
 
-# Create all tables on startup
-Base.metadata.create_all(bind=engine)
+
+# orjson for every JSON response; list and detail endpoints also skip response_model re-validation
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Create or upgrade the schema (tables, search and hot-path indexes) on startup
+run_migrations(engine)
 
 # Get frontend URL from environment variable
 FRONTEND_URL = os.getenv(
@@ -28,6 +43,13 @@ FRONTEND_URL = os.getenv(
     "http://localhost:5173"  # default for local development
 )
 
+# Oversized uploads are refused before the multipart parser buffers them; added before CORS
+# so the 413 still carries CORS headers
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    path_limits={"/animal-management/animals/import": MAX_IMPORT_UPLOAD_BYTES},
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -38,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Auto-Rejected-Count"],
 )
 
 # Routers
@@ -46,24 +69,13 @@ app.include_router(user_router)
 app.include_router(animal_router)
 app.include_router(application_router)
 app.include_router(dashboard_router)
+app.include_router(image_router)
 
 
-# Resolve the absolute path of the current file
-BASE_DIR = Path(__file__).resolve().parent
-
-# Define the directory where animal images are stored (server/app/src/images)
-IMAGES_DIR = BASE_DIR / "src" / "images"
-
-# Creates the directory if it does not exist
+# Creates the images directory (server/app/src/images) if it does not exist
+# Files are served, with resized variants, by image_router
 IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
-# Mount the images directory
-app.mount(
-    "/images",
-    StaticFiles(directory=str(IMAGES_DIR)),
-    name="images",
-)
-
 @app.get("/")
 def read_root():
     return {
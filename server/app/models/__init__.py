@@ -1,9 +1,15 @@
 from app.models.user import User
 from app.models.animal import Animal
 from app.models.application import Application
+from app.models.dashboard_counter import DashboardCounter
+from app.models.adoption_daily_stat import AdoptionDailyStat
+from app.models.image_blob import ImageBlob
 
 __all__ = [
     "User", 
     "Animal", 
     "Application",
+    "DashboardCounter",
+    "AdoptionDailyStat",
+    "ImageBlob",
 ]
\ No newline at end of file
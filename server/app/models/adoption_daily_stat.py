@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Date
+from app.db.database import Base
+
+
+class AdoptionDailyStat(Base):
+    __tablename__ = "tbl_adoption_daily_stats"
+
+    # One row per UTC day, maintained incrementally by the write paths
+    day = Column(Date, primary_key=True)
+    applications_submitted = Column(Integer, nullable=False, default=0)
+    applications_approved = Column(Integer, nullable=False, default=0)
+    applications_rejected = Column(Integer, nullable=False, default=0)
+    applications_cancelled = Column(Integer, nullable=False, default=0)
+    animals_intake = Column(Integer, nullable=False, default=0)
+    animals_adopted = Column(Integer, nullable=False, default=0)
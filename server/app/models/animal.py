@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.models.base_model import CommonBase
 from app.models.enums import AdoptionStatus
@@ -19,3 +19,36 @@ class Animal(CommonBase):
 
     # Relationship
     applications = relationship("Application", back_populates="animal")
+
+    # Column sets that list and lookup queries filter on, each must be served by an index below
+    __hot_filters__ = [
+        ("is_deleted", "adoption_status"),
+        ("is_deleted", "gender"),
+        ("is_deleted", "name", "breed", "species"),
+    ]
+
+    # Partial indexes only hold active rows, matching the is_deleted IS false filter of every query
+    __table_args__ = (
+        Index(
+            "ix_tbl_animals_active_status",
+            "adoption_status",
+            "id",
+            sqlite_where=is_deleted.is_(False),
+            postgresql_where=is_deleted.is_(False),
+        ),
+        Index(
+            "ix_tbl_animals_active_gender",
+            "gender",
+            "id",
+            sqlite_where=is_deleted.is_(False),
+            postgresql_where=is_deleted.is_(False),
+        ),
+        Index(
+            "ix_tbl_animals_active_identity",
+            "name",
+            "breed",
+            "species",
+            sqlite_where=is_deleted.is_(False),
+            postgresql_where=is_deleted.is_(False),
+        ),
+    )
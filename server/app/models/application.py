@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, Text, Enum, Boolean
+from sqlalchemy import Column, ForeignKey, Integer, Text, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.models.base_model import CommonBase
 from app.models.enums import ApplicationStatus
@@ -17,3 +17,34 @@ class Application(CommonBase):
     # Relationships
     animal = relationship("Animal", back_populates="applications")
     adopter = relationship("User", back_populates="applications")
+
+    # Column sets that list and lookup queries filter on, each must be served by an index below
+    __hot_filters__ = [
+        ("is_deleted", "application_status"),
+        ("is_deleted", "animal_id"),
+        ("is_deleted", "adopter_id"),
+        ("animal_id", "application_status"),
+    ]
+
+    # Foreign key indexes cover every row, the status index only active ones
+    __table_args__ = (
+        Index(
+            "ix_tbl_applications_active_status",
+            "application_status",
+            "id",
+            sqlite_where=is_deleted.is_(False),
+            postgresql_where=is_deleted.is_(False),
+        ),
+        Index(
+            "ix_tbl_applications_animal_id_status",
+            "animal_id",
+            "application_status",
+            "is_deleted",
+        ),
+        Index(
+            "ix_tbl_applications_adopter_id",
+            "adopter_id",
+            "is_deleted",
+            "id",
+        ),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime
+from app.db.database import Base
+
+
+class DashboardCounter(Base):
+    __tablename__ = "tbl_dashboard_counters"
+
+    # Single row (id = 1), updated in the same transaction as every counted write
+    id = Column(Integer, primary_key=True)
+    total_animals = Column(Integer, nullable=False, default=0)
+    total_pending_applications = Column(Integer, nullable=False, default=0)
+    total_approved_applications = Column(Integer, nullable=False, default=0)
+    total_rejected_applications = Column(Integer, nullable=False, default=0)
+    total_cancelled_applications = Column(Integer, nullable=False, default=0)
+    total_adopters = Column(Integer, nullable=False, default=0)
+    total_admins = Column(Integer, nullable=False, default=0)
+    reconciled_at = Column(DateTime, nullable=True)
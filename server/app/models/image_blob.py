@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.db.database import Base
+
+
+class ImageBlob(Base):
+    __tablename__ = "tbl_image_blobs"
+
+    # One row per stored image content, named by its sha256
+    hash = Column(String(64), primary_key=True)
+    extension = Column(String(10), nullable=False)
+    size = Column(Integer, nullable=False)
+    # Animals whose photo_url points at this blob, soft-deleted ones included
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum, Boolean
+from sqlalchemy import Column, String, Enum, Boolean, Index
 from app.models.base_model import CommonBase
 from sqlalchemy.orm import relationship
 from app.models.enums import UserType
@@ -18,3 +18,21 @@ class User(CommonBase):
 
     # Relationship
     applications = relationship("Application", back_populates="adopter")
+
+    # Column sets that list and lookup queries filter on, each must be served by an index below
+    __hot_filters__ = [
+        ("is_deleted", "user_type"),
+        ("email",),
+    ]
+
+    # Partial index only holds active users, matching the is_deleted IS false filter of every query
+    __table_args__ = (
+        Index(
+            "ix_tbl_users_active_type",
+            "user_type",
+            "id",
+            sqlite_where=is_deleted.is_(False),
+            postgresql_where=is_deleted.is_(False),
+        ),
+    )
+
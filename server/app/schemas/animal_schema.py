@@ -1,5 +1,7 @@
+from datetime import datetime
 from pydantic import BaseModel
 from app.models.enums import AdoptionStatus
+from app.schemas.general_schema import PageData
 
 
 class CreateAnimalRequest(BaseModel):
@@ -17,4 +19,40 @@ class UpdateAnimalRequest(CreateAnimalRequest):
     species: str | None = None
     breed: str | None = None
     gender: str | None = None
-    adoption_status: AdoptionStatus | None = None
\ No newline at end of file
+    adoption_status: AdoptionStatus | None = None
+
+
+class AnimalResponse(BaseModel):
+    id: int
+    name: str
+    species: str
+    breed: str
+    age: int | None = None
+    gender: str
+    description: str | None = None
+    photo_url: str | None = None
+    photo_variants: dict[str, str] | None = None
+    adoption_status: AdoptionStatus
+    created_at: datetime | None = None
+    created_by: str | None = None
+    updated_at: datetime | None = None
+    updated_by: str | None = None
+
+
+class AnimalPage(PageData):
+    animals: list[AnimalResponse]
+
+
+# Outcome of one manifest row in a bulk import
+class AnimalImportRow(BaseModel):
+    row: int
+    status: str
+    id: int | None = None
+    detail: str | None = None
+
+
+class AnimalImportReport(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    rows: list[AnimalImportRow]
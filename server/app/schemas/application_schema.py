@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field
 from typing import Optional
 from app.models.enums import ApplicationStatus
+from app.schemas.general_schema import PageData
 
 class CreateApplicationRequest(BaseModel):
     animal_id: int
@@ -10,6 +12,54 @@ class UpdateApplicationStatusRequest(BaseModel):
     application_status: ApplicationStatus
 
 
+class BulkUpdateApplicationStatusRequest(BaseModel):
+    application_ids: list[int] = Field(min_length=1, max_length=1000)
+    application_status: ApplicationStatus
+
+
 class AdopterUpdateApplication(BaseModel):
     reason: str | None = None
     application_status: ApplicationStatus | None = None
+
+
+# Fields shown in every application listing
+class ApplicationSummary(BaseModel):
+    id: int
+    animal_id: int
+    animal_name: str
+    reason: str | None = None
+    status: ApplicationStatus
+    created_at: datetime | None = None
+    created_by: str | None = None
+    updated_at: datetime | None = None
+    updated_by: str | None = None
+
+
+class ApplicationResponse(ApplicationSummary):
+    adopter_id: int
+    adopter_name: str
+
+
+class ApplicationDetailResponse(ApplicationResponse):
+    photo_url: str | None = None
+
+
+class ApplicationPage(PageData):
+    applications: list[ApplicationResponse]
+
+
+class AdopterApplicationList(BaseModel):
+    applications: list[ApplicationSummary]
+
+
+# Outcome of one id in a bulk status change
+class BulkStatusResult(BaseModel):
+    id: int
+    outcome: str
+
+
+class BulkStatusResponse(BaseModel):
+    application_status: ApplicationStatus
+    updated: int
+    auto_rejected: int = 0
+    results: list[BulkStatusResult]
@@ -1,7 +1,26 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Generic, TypeVar
 
 
 class GeneralResponse(BaseModel):
     message: str
     data: Optional[Dict[str, Any]] = None
+
+
+DataT = TypeVar("DataT")
+
+
+# Same envelope as GeneralResponse, with typed data
+class DataResponse(BaseModel, Generic[DataT]):
+    message: str
+    data: DataT
+
+
+# Fields every paginated list returns next to its items
+class PageData(BaseModel):
+    page: int | None = None     # None for cursor pages, which have no page number
+    limit: int
+    total: int | None = None
+    total_pages: int | None = None
+    total_mode: str
+    next_cursor: str | None = None
@@ -1,4 +1,7 @@
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
+from app.models.enums import UserType
+from app.schemas.general_schema import PageData
 
 
 class CreateAdminRequest(BaseModel):
@@ -21,4 +24,35 @@ class CreateAdopterRequest(CreateAdminRequest):
 
 
 class UpdateAdopterRequest(UpdateAdminRequest):
-    pass
\ No newline at end of file
+    pass
+
+
+# Plain str for email: stored addresses were validated when they were written
+class UserResponse(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: str | None = None
+    address: str | None = None
+    user_type: UserType
+    created_at: datetime | None = None
+    created_by: str | None = None
+    updated_at: datetime | None = None
+    updated_by: str | None = None
+
+
+class CurrentUserResponse(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: str | None = None
+    address: str | None = None
+    role: UserType
+    created_at: datetime | None = None
+    created_by: str | None = None
+    updated_at: datetime | None = None
+    updated_by: str | None = None
+
+
+class UserPage(PageData):
+    users: list[UserResponse]
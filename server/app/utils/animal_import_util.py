@@ -0,0 +1,258 @@
+# References:
+# https://docs.python.org/3/library/csv.html#csv.DictReader
+# https://jsonlines.org/
+# https://docs.python.org/3/library/zipfile.html#zipfile-objects
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/dml.html#orm-bulk-insert-statements
+# https://docs.sqlalchemy.org/en/20/core/sqlelement.html#sqlalchemy.sql.expression.tuple_
+
+
+import csv
+import io
+import json
+import os
+import posixpath
+import zipfile
+from datetime import datetime
+from itertools import islice
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.animal import Animal
+from app.schemas.animal_schema import CreateAnimalRequest
+from app.utils.counter_util import adjust_dashboard_counters
+from app.utils.image_blob_util import acquire_image_blobs
+from app.utils.image_util import ALLOWED_IMAGE_EXTENSIONS, save_upload_image
+from app.utils.stats_util import record_daily_stats
+
+
+# Manifest rows validated, deduplicated, inserted and committed together
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", 500))
+
+# Largest import request (manifest and image archive together)
+MAX_IMPORT_UPLOAD_BYTES = int(os.getenv("MAX_IMPORT_UPLOAD_BYTES", 512 * 1024 * 1024))
+
+# Manifest format for each accepted file extension
+MANIFEST_FORMATS = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}
+
+
+def manifest_format(filename: str | None):
+    # None when the extension is not a supported manifest format
+    return MANIFEST_FORMATS.get((filename or "").rsplit(".", 1)[-1].lower())
+
+
+def read_manifest(file, manifest_type: str):
+    """
+    Yield (row number, record, error) for each row of a binary manifest file, reading one line
+    at a time. CSV cells left empty are omitted; an NDJSON line that is not an object has an error.
+    """
+
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    if manifest_type == "csv":
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            record = {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if isinstance(key, str) and isinstance(value, str) and value.strip()
+            }
+            yield number, record, None
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, record, None
+
+
+class ImageArchive:
+    # Images of a zip archive by entry name (or bare file name), each stored once however many rows use it
+
+    def __init__(self, file):
+        self.archive = zipfile.ZipFile(file)
+        self.entries = {}
+        for info in self.archive.infolist():
+            if not info.is_dir():
+                self.entries.setdefault(posixpath.basename(info.filename), info.filename)
+        for info in self.archive.infolist():
+            if not info.is_dir():
+                self.entries[info.filename] = info.filename
+        self.stored = {}
+
+    async def store(self, name: str):
+        # StoredImage of the entry; raises ValueError with the reason when it cannot be used
+        entry = self.entries.get(name)
+        if entry is None:
+            raise ValueError(f"Image {name} is not in the archive")
+
+        if entry not in self.stored:
+            try:
+                if entry.rsplit(".", 1)[-1].lower() not in ALLOWED_IMAGE_EXTENSIONS:
+                    raise ValueError("Invalid image format. Only .jpg, .jpeg, .png, .webp are allowed.")
+                with self.archive.open(entry) as image_file:
+                    self.stored[entry] = await save_upload_image(UploadFile(image_file, filename=entry))
+            except HTTPException as e:
+                self.stored[entry] = ValueError(e.detail)
+            except ValueError as e:
+                self.stored[entry] = e
+
+        if isinstance(self.stored[entry], ValueError):
+            raise self.stored[entry]
+        return self.stored[entry]
+
+
+def _validation_detail(error: ValidationError):
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+
+async def import_animals(
+    db: AsyncSession,
+    records,
+    images: ImageArchive | None,
+    username: str,
+    chunk_rows: int = IMPORT_CHUNK_ROWS,
+):
+    """
+    Import animals from manifest records (see read_manifest), one chunk at a time: validate with
+    CreateAnimalRequest, look up existing (name, breed, species) for the whole chunk in one query,
+    store the referenced images, then insert the new rows with one executemany and commit.
+    Rows repeated within the import count as duplicates too. Returns a report entry per row.
+    """
+
+    report = []
+    seen = set()
+
+    while chunk := await run_in_threadpool(list, islice(records, chunk_rows)):
+        outcomes = {}
+        candidates = []
+
+        for number, record, error in chunk:
+            if error:
+                outcomes[number] = {"status": "invalid", "detail": error}
+                continue
+
+            image_name = record.pop("image", None)
+            try:
+                request_data = CreateAnimalRequest(**record)
+            except ValidationError as e:
+                outcomes[number] = {"status": "invalid", "detail": _validation_detail(e)}
+                continue
+
+            if not image_name:
+                outcomes[number] = {"status": "invalid", "detail": "image: Field required"}
+                continue
+            candidates.append((number, request_data, image_name))
+
+        # Existing active animals among the chunk's identities, in one query
+        identities = {(data.name, data.breed, data.species) for _, data, _ in candidates}
+        existing = set()
+        if identities:
+            existing = set((await db.execute(
+                select(Animal.name, Animal.breed, Animal.species)
+                .where(
+                    tuple_(Animal.name, Animal.breed, Animal.species).in_(identities),
+                    Animal.is_deleted.is_(False),
+                )
+            )).tuples())
+
+        now = datetime.utcnow()
+        new_rows = []
+        new_numbers = []
+        references = {}
+        for number, request_data, image_name in candidates:
+            identity = (request_data.name, request_data.breed, request_data.species)
+            if identity in existing or identity in seen:
+                outcomes[number] = {"status": "duplicate", "detail": "Animal with similar information already exists"}
+                continue
+
+            if images is None:
+                outcomes[number] = {"status": "invalid", "detail": "No image archive was given"}
+                continue
+            try:
+                stored_image = await images.store(image_name)
+            except ValueError as e:
+                outcomes[number] = {"status": "invalid", "detail": str(e)}
+                continue
+
+            seen.add(identity)
+            references[stored_image] = references.get(stored_image, 0) + 1
+            new_numbers.append(number)
+            new_rows.append({
+                **request_data.model_dump(),
+                "photo_url": f"/images/{stored_image.name}",
+                "is_deleted": False,
+                "created_at": now,
+                "created_by": username,
+            })
+
+        if new_rows:
+            # Ids come back in row order where the database can return them from an executemany
+            statement = insert(Animal)
+            if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+                new_ids = (await db.execute(
+                    statement.returning(Animal.id, sort_by_parameter_order=True), new_rows
+                )).scalars().all()
+            else:
+                await db.execute(statement, new_rows)
+                new_ids = [None] * len(new_rows)
+
+            for number, animal_id in zip(new_numbers, new_ids):
+                outcomes[number] = {"status": "created", "id": animal_id}
+
+            await acquire_image_blobs(db, references)
+            await adjust_dashboard_counters(db, {"total_animals": len(new_rows)})
+            await record_daily_stats(db, {"animals_intake": len(new_rows)})
+            await db.commit()
+
+        report.extend({"row": number, **outcomes[number]} for number, _, _ in chunk)
+
+    return report
+
+
+async def import_animal_files(manifest_path: str, images_path: str | None, username: str = "System"):
+    # Command line import, in the same transactions and chunks as the endpoint
+    from app.db.database import AsyncSessionLocal
+
+    manifest_type = manifest_format(manifest_path)
+    if manifest_type is None:
+        raise SystemExit(f"Unsupported manifest {manifest_path}, expected .csv, .ndjson or .jsonl")
+
+    with open(manifest_path, "rb") as manifest_file:
+        images_file = open(images_path, "rb") if images_path else None
+        try:
+            images = ImageArchive(images_file) if images_file else None
+            async with AsyncSessionLocal() as db:
+                return await import_animals(db, read_manifest(manifest_file, manifest_type), images, username)
+        finally:
+            if images_file:
+                images_file.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description="Import animals from a CSV/NDJSON manifest and a zip of images")
+    parser.add_argument("manifest")
+    parser.add_argument("images", nargs="?")
+    parser.add_argument("--username", default="System")
+    args = parser.parse_args()
+
+    report = asyncio.run(import_animal_files(args.manifest, args.images, args.username))
+    for entry in report:
+        if entry["status"] != "created":
+            print(f"Row {entry['row']}: {entry['status']} - {entry['detail']}")
+    counts = Counter(entry["status"] for entry in report)
+    print(f"Created {counts['created']}, duplicates {counts['duplicate']}, invalid {counts['invalid']}")
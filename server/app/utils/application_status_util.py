@@ -0,0 +1,124 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/dml.html#orm-update-and-delete-with-custom-where-criteria
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/dml.html#using-returning-with-update-delete-and-custom-where-criteria
+# https://www.sqlite.org/lang_returning.html
+
+
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Animal, Application
+from app.models.enums import AdoptionStatus, ApplicationStatus
+from app.utils.counter_util import adjust_dashboard_counters, application_status_deltas
+from app.utils.stats_util import application_status_stats, record_daily_stats
+
+
+# An application in one of these can no longer change status
+COMPLETED_STATUSES = (ApplicationStatus.Approved, ApplicationStatus.Rejected)
+
+
+async def transition_applications(db: AsyncSession, old_statuses: dict, new_status, username: str):
+    """
+    Move the applications in old_statuses (id -> status they were read with) to new_status with a
+    single UPDATE that skips any completed in the meantime, then add the matching dashboard counter
+    and daily stats deltas. Returns the ids actually updated. The caller commits.
+    """
+
+    if not old_statuses:
+        return []
+
+    new_status = ApplicationStatus(new_status)
+    statement = (
+        update(Application)
+        .where(
+            Application.id.in_(list(old_statuses)),
+            Application.is_deleted.is_(False),
+            Application.application_status.not_in(COMPLETED_STATUSES),
+        )
+        .values(
+            application_status=new_status,
+            updated_at=datetime.utcnow(),
+            updated_by=username,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    # RETURNING tells which rows the guard let through; without it the read statuses are trusted
+    if db.get_bind().dialect.update_returning:
+        result = await db.execute(statement.returning(Application.id))
+        updated_ids = sorted(result.scalars().all())
+    else:
+        await db.execute(statement)
+        updated_ids = sorted(old_statuses)
+
+    await _record_transitions(db, [old_statuses[application_id] for application_id in updated_ids], new_status)
+    return updated_ids
+
+
+async def reject_competing_applications(db: AsyncSession, animal_ids, approved_ids, username: str):
+    """
+    Reject, with one UPDATE, every Submitted application for the given (now adopted) animals
+    other than the approved ones, and count them on the dashboard and daily stats.
+    Returns the ids rejected. The caller commits.
+    """
+
+    if not animal_ids:
+        return []
+
+    criteria = (
+        Application.animal_id.in_(list(animal_ids)),
+        Application.application_status == ApplicationStatus.Submitted,
+        Application.id.not_in(list(approved_ids)),
+        Application.is_deleted.is_(False),
+    )
+    statement = (
+        update(Application)
+        .where(*criteria)
+        .values(
+            application_status=ApplicationStatus.Rejected,
+            updated_at=datetime.utcnow(),
+            updated_by=username,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.get_bind().dialect.update_returning:
+        rejected_ids = sorted((await db.execute(statement.returning(Application.id))).scalars().all())
+    else:
+        rejected_ids = sorted((await db.execute(select(Application.id).where(*criteria).with_for_update())).scalars().all())
+        await db.execute(statement.where(Application.id.in_(rejected_ids)))
+
+    await _record_transitions(db, [ApplicationStatus.Submitted] * len(rejected_ids), ApplicationStatus.Rejected)
+    return rejected_ids
+
+
+async def _record_transitions(db: AsyncSession, old_statuses: list, new_status):
+    # Dashboard counter and daily stats deltas of every listed status moving to new_status, one statement each
+    counter_deltas = {}
+    for old_status in old_statuses:
+        for column, delta in application_status_deltas(old_status, new_status).items():
+            counter_deltas[column] = counter_deltas.get(column, 0) + delta
+    await adjust_dashboard_counters(db, counter_deltas)
+
+    entered = sum(ApplicationStatus(old_status) != new_status for old_status in old_statuses)
+    await record_daily_stats(
+        db,
+        {column: delta * entered for column, delta in application_status_stats(new_status).items()}
+    )
+
+
+async def mark_animals_adopted(db: AsyncSession, animal_ids, username: str):
+    # One UPDATE for every animal whose application was approved. The caller commits.
+    if not animal_ids:
+        return
+
+    await db.execute(
+        update(Animal)
+        .where(Animal.id.in_(list(animal_ids)))
+        .values(
+            adoption_status=AdoptionStatus.Adopted,
+            updated_at=datetime.utcnow(),
+            updated_by=username,
+        )
+        .execution_options(synchronize_session=False)
+    )
@@ -1,4 +1,5 @@
 import os
+import uuid
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
@@ -25,6 +26,11 @@ def hash_password(password: str):
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    issued_at = datetime.utcnow()
+    expire = issued_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({
+        "exp": expire,
+        "iat": issued_at,  # lets all tokens of a user be invalidated
+        "jti": uuid.uuid4().hex,  # two logins in the same second still get different tokens
+    })
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
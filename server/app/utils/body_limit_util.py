@@ -0,0 +1,69 @@
+# References:
+# https://www.starlette.io/middleware/#pure-asgi-middleware
+# https://asgi.readthedocs.io/en/latest/specs/www.html#request-receive-event
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/413
+
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from app.utils.image_util import MAX_IMAGE_UPLOAD_BYTES
+from app.utils.response_util import ORJSONResponse
+
+
+# Room for the form fields sent with an image
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Largest request body by default: one image upload and its form fields
+MAX_REQUEST_BODY_BYTES = MAX_IMAGE_UPLOAD_BYTES + FORM_OVERHEAD_BYTES
+
+
+def _too_large(limit: int):
+    return f"Request body is larger than {limit // (1024 * 1024)} MB"
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies past a size limit before they are buffered or spooled to disk.
+    A declared Content-Length over the limit is answered with 413 without reading the body;
+    otherwise the body is counted as it is received and reading fails with 413 past the limit,
+    which also covers chunked uploads. path_limits overrides the limit for exact paths.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BODY_BYTES, path_limits: dict | None = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_bytes)
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            response = ORJSONResponse(
+                {"detail": _too_large(limit)},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the route's body parsing, so the app answers it like any HTTPException
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=_too_large(limit),
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
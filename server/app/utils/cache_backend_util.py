@@ -0,0 +1,536 @@
+# References:
+# https://redis.io/docs/latest/develop/reference/protocol-spec/
+# https://redis.io/docs/latest/develop/use/pipelining/
+# https://redis.io/docs/latest/commands/set/
+# https://docs.python.org/3/library/socket.html
+# https://fastapi.tiangolo.com/async/#very-technical-details
+
+
+import logging
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from urllib.parse import urlparse
+from fastapi.concurrency import run_in_threadpool
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "animal-adoption")
+
+
+class NamespaceConfig:
+    """
+    Limits of one namespace. ttl applies when set() is called without one;
+    max_entries and max_bytes bound the memory backend (Redis uses its own maxmemory policy).
+    Namespaces holding revocations must be created without limits so nothing is evicted early.
+    """
+
+    def __init__(self, ttl: float | None = None, max_entries: int | None = None, max_bytes: int | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+
+_namespaces = {}
+
+
+def configure_namespace(name: str, ttl: float | None = None, max_entries: int | None = None, max_bytes: int | None = None):
+    _namespaces[name] = NamespaceConfig(ttl, max_entries, max_bytes)
+
+
+def _namespace_config(name: str):
+    return _namespaces.get(name) or NamespaceConfig()
+
+
+class CacheUnavailable(Exception):
+    # The store could not be reached by a call made with required=True
+    pass
+
+
+class CacheBackend(ABC):
+    """
+    Byte-valued key/value store split into namespaces, plus integer counters. Every call is
+    synchronous and fails open: when the store cannot be reached, reads miss and writes are dropped.
+    Calls made with required=True (revocations, version bumps, invalidations) raise CacheUnavailable
+    instead, so a failure is never mistaken for "not there" or silently dropped.
+
+    clear_namespace() drops every value of a namespace at once (counters are kept), so it costs
+    one write however many keys there are.
+
+    Code on the event loop calls the backend through run_cache_io, since a blocking backend
+    would otherwise stall every request in flight.
+
+    Subclasses implement every abstract method; a backend missing one fails when it is created.
+    """
+
+    # True when calls wait on the network
+    blocking = False
+
+    def get(self, namespace: str, key: str, required: bool = False):
+        return self.get_many(namespace, [key], required)[0]
+
+    @abstractmethod
+    def get_many(self, namespace: str, keys, required: bool = False):
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: float | None = None, required: bool = False):
+        self.set_many(namespace, {key: value}, ttl, required)
+
+    @abstractmethod
+    def set_many(self, namespace: str, items: dict, ttl: float | None = None, required: bool = False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, namespace: str, key: str, value: bytes, ttl: float | None = None):
+        # Store value unless the key exists; returns whichever value is stored afterwards
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str, required: bool = False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def incr(self, namespace: str, key: str, ttl: float | None = None, required: bool = False):
+        # Atomic counter, created at 1; ttl is refreshed on every increment
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_counters(self, namespace: str, keys):
+        # Counter values, 0 for counters never incremented (or expired)
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_namespace(self, namespace: str, required: bool = False):
+        raise NotImplementedError
+
+    def read_many(self, values: dict, counters: dict | None = None, required: bool = False):
+        """
+        Values (namespace -> keys) and counters (namespace -> keys) of several namespaces
+        together, in one round trip where the backend supports it. Returns two dicts of
+        namespace -> list, in the order of the keys.
+        """
+
+        return (
+            {namespace: self.get_many(namespace, keys, required) for namespace, keys in values.items()},
+            {namespace: self.get_counters(namespace, keys) for namespace, keys in (counters or {}).items()},
+        )
+
+    def stats(self):
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    # Per-process store with one LRU per namespace
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stores = {}         # namespace -> OrderedDict(key -> (expires_at, value))
+        self._bytes = {}          # namespace -> bytes held
+        self._evictions = {}      # namespace -> entries evicted by the limits
+        self._counters = {}       # (namespace, key) -> (expires_at, count)
+        self._increments = 0
+
+    def _store(self, namespace: str):
+        if namespace not in self._stores:
+            self._stores[namespace] = OrderedDict()
+            self._bytes[namespace] = 0
+            self._evictions[namespace] = 0
+        return self._stores[namespace]
+
+    def _drop(self, namespace: str, key: str):
+        _, value = self._stores[namespace].pop(key)
+        self._bytes[namespace] -= len(value)
+
+    def _live(self, namespace: str, key: str, now: float):
+        store = self._store(namespace)
+        entry = store.get(key)
+        if entry is None:
+            return None
+
+        if entry[0] is not None and entry[0] <= now:
+            self._drop(namespace, key)
+            return None
+
+        store.move_to_end(key)
+        return entry[1]
+
+    def _put(self, namespace: str, key: str, value: bytes, ttl: float | None, now: float):
+        config = _namespace_config(namespace)
+        ttl = ttl if ttl is not None else config.ttl
+        store = self._store(namespace)
+
+        if key in store:
+            self._drop(namespace, key)
+        store[key] = (now + ttl if ttl is not None else None, value)
+        self._bytes[namespace] += len(value)
+
+        while store and (
+            (config.max_entries is not None and len(store) > config.max_entries)
+            or (config.max_bytes is not None and self._bytes[namespace] > config.max_bytes)
+        ):
+            self._drop(namespace, next(iter(store)))
+            self._evictions[namespace] += 1
+
+    def get_many(self, namespace: str, keys, required: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            return [self._live(namespace, key, now) for key in keys]
+
+    def set_many(self, namespace: str, items: dict, ttl: float | None = None, required: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items.items():
+                self._put(namespace, key, value, ttl, now)
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: float | None = None):
+        now = time.monotonic()
+        with self._lock:
+            current = self._live(namespace, key, now)
+            if current is not None:
+                return current
+            self._put(namespace, key, value, ttl, now)
+            return value
+
+    def delete(self, namespace: str, key: str, required: bool = False):
+        with self._lock:
+            if key in self._store(namespace):
+                self._drop(namespace, key)
+
+    def _count(self, namespace: str, key: str, now: float):
+        expires_at, count = self._counters.get((namespace, key), (None, 0))
+        return count if expires_at is None or expires_at > now else 0
+
+    def incr(self, namespace: str, key: str, ttl: float | None = None, required: bool = False):
+        now = time.monotonic()
+        ttl = ttl if ttl is not None else _namespace_config(namespace).ttl
+        with self._lock:
+            count = self._count(namespace, key, now) + 1
+            self._counters[(namespace, key)] = (now + ttl if ttl is not None else None, count)
+
+            # Expired counters are only dropped here, every so many increments, so they cannot pile up
+            self._increments += 1
+            if self._increments % 1024 == 0:
+                for expired in [k for k, (expires_at, _) in self._counters.items() if expires_at is not None and expires_at <= now]:
+                    del self._counters[expired]
+            return count
+
+    def get_counters(self, namespace: str, keys):
+        now = time.monotonic()
+        with self._lock:
+            return [self._count(namespace, key, now) for key in keys]
+
+    def clear_namespace(self, namespace: str, required: bool = False):
+        with self._lock:
+            self._store(namespace).clear()
+            self._bytes[namespace] = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                namespace: {
+                    "entries": len(store),
+                    "bytes": self._bytes[namespace],
+                    "evictions": self._evictions[namespace],
+                }
+                for namespace, store in self._stores.items()
+            }
+
+
+class RespError(Exception):
+    pass
+
+
+class _RespConnection:
+    # One socket speaking RESP2; requests are pipelined, replies read in order
+
+    def __init__(self, host: str, port: int, db: int, password: str | None, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+
+        if password:
+            self.execute([("AUTH", password)])
+        if db:
+            self.execute([("SELECT", db)])
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _encode(command):
+        parts = [part if isinstance(part, bytes) else str(part).encode() for part in command]
+        return b"*%d\r\n" % len(parts) + b"".join(b"$%d\r\n%s\r\n" % (len(part), part) for part in parts)
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Cache server closed the connection")
+
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            return RespError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return self.reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+
+        raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+    def execute(self, commands):
+        self.sock.sendall(b"".join(self._encode(command) for command in commands))
+        replies = [self._read_reply() for _ in commands]
+
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Store on a Redis-protocol server shared by every worker process.
+
+    Values are saved as <generation>|<value> under <prefix>:<namespace>:<key>, and a value
+    written before the namespace's current generation counts as missing. Reads are a single
+    MGET together with the generation; writes read the generation first.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str, key_prefix: str = CACHE_KEY_PREFIX, timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+        self._lock = threading.Lock()
+        self._idle = []     # pooled connections
+        self._errors = 0
+
+    def _execute(self, commands, required: bool = False):
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+
+        try:
+            if connection is None:
+                connection = _RespConnection(self.host, self.port, self.db, self.password, self.timeout)
+            replies = connection.execute(commands)
+        except (OSError, ConnectionError, RespError) as exc:
+            if connection is not None:
+                connection.close()
+            with self._lock:
+                self._errors += 1
+            logger.warning("Cache server unavailable: %s", exc)
+            if required:
+                raise CacheUnavailable(str(exc)) from exc
+            return None
+
+        with self._lock:
+            self._idle.append(connection)
+        return replies
+
+    def _key(self, namespace: str, key: str):
+        return f"{self.key_prefix}:{namespace}:{key}"
+
+    def _generation_key(self, namespace: str):
+        return f"{self.key_prefix}:{namespace}:#generation"
+
+    def _counter_key(self, namespace: str, key: str):
+        return f"{self.key_prefix}:{namespace}:#counter:{key}"
+
+    def _generation(self, namespace: str, required: bool = False):
+        replies = self._execute([("GET", self._generation_key(namespace))], required)
+        return int(replies[0] or 0) if replies is not None else None
+
+    @staticmethod
+    def _unwrap(raw, generation: int):
+        if raw is None:
+            return None
+
+        tag, _, value = raw.partition(b"|")
+        return value if tag == str(generation).encode() else None
+
+    @staticmethod
+    def _ttl_args(namespace: str, ttl: float | None):
+        ttl = ttl if ttl is not None else _namespace_config(namespace).ttl
+        return ("PX", max(int(ttl * 1000), 1)) if ttl is not None else ()
+
+    def get_many(self, namespace: str, keys, required: bool = False):
+        keys = list(keys)
+        replies = self._execute([
+            ("MGET", self._generation_key(namespace), *(self._key(namespace, key) for key in keys)),
+        ], required)
+        if replies is None:
+            return [None] * len(keys)
+
+        generation, *values = replies[0]
+        generation = int(generation or 0)
+        return [self._unwrap(value, generation) for value in values]
+
+    def set_many(self, namespace: str, items: dict, ttl: float | None = None, required: bool = False):
+        if not items:
+            return
+        generation = self._generation(namespace, required)
+        if generation is None:
+            return
+
+        tag = b"%d|" % generation
+        ttl_args = self._ttl_args(namespace, ttl)
+        self._execute([
+            ("SET", self._key(namespace, key), tag + value, *ttl_args)
+            for key, value in items.items()
+        ], required)
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: float | None = None):
+        generation = self._generation(namespace)
+        if generation is None:
+            return None
+
+        full_key = self._key(namespace, key)
+        tagged = b"%d|" % generation + value
+        ttl_args = self._ttl_args(namespace, ttl)
+        replies = self._execute([
+            ("SET", full_key, tagged, "NX", *ttl_args),
+            ("GET", full_key),
+        ])
+        if replies is None:
+            return None
+
+        current = self._unwrap(replies[1], generation)
+        if current is None:
+            # Only a value from before the last clear_namespace was there
+            self._execute([("SET", full_key, tagged, *ttl_args)])
+            return value
+        return current
+
+    def delete(self, namespace: str, key: str, required: bool = False):
+        self._execute([("DEL", self._key(namespace, key))], required)
+
+    def incr(self, namespace: str, key: str, ttl: float | None = None, required: bool = False):
+        full_key = self._counter_key(namespace, key)
+        commands = [("INCR", full_key)]
+        ttl_args = self._ttl_args(namespace, ttl)
+        if ttl_args:
+            commands.append(("PEXPIRE", full_key, ttl_args[1]))
+
+        replies = self._execute(commands, required)
+        return replies[0] if replies is not None else None
+
+    def get_counters(self, namespace: str, keys):
+        keys = list(keys)
+        replies = self._execute([("MGET", *(self._counter_key(namespace, key) for key in keys))])
+        if replies is None:
+            return [0] * len(keys)
+        return [int(value or 0) for value in replies[0]]
+
+    def read_many(self, values: dict, counters: dict | None = None, required: bool = False):
+        # One pipeline: an MGET per value namespace (with its generation), then per counter namespace
+        values = {namespace: list(keys) for namespace, keys in values.items()}
+        counters = {namespace: list(keys) for namespace, keys in (counters or {}).items()}
+
+        commands = [
+            ("MGET", self._generation_key(namespace), *(self._key(namespace, key) for key in keys))
+            for namespace, keys in values.items()
+        ]
+        commands += [
+            ("MGET", *(self._counter_key(namespace, key) for key in keys))
+            for namespace, keys in counters.items()
+        ]
+        replies = self._execute(commands, required)
+        if replies is None:
+            return (
+                {namespace: [None] * len(keys) for namespace, keys in values.items()},
+                {namespace: [0] * len(keys) for namespace, keys in counters.items()},
+            )
+
+        found = {}
+        for (namespace, _), (generation, *raw_values) in zip(values.items(), replies):
+            found[namespace] = [self._unwrap(raw, int(generation or 0)) for raw in raw_values]
+
+        counts = {
+            namespace: [int(count or 0) for count in reply]
+            for namespace, reply in zip(counters, replies[len(values):])
+        }
+        return found, counts
+
+    def clear_namespace(self, namespace: str, required: bool = False):
+        # Old values are left to expire or to the server's eviction policy
+        self._execute([("INCR", self._generation_key(namespace))], required)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "server": f"{self.host}:{self.port}/{self.db}",
+                "idle_connections": len(self._idle),
+                "errors": self._errors,
+            }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_cache_backend(url: str | None = None):
+    # memory:// keeps the caches inside each process; redis://[:password@]host:port/db shares them
+    # between uvicorn workers (any server speaking the Redis protocol)
+    url = url or os.getenv("CACHE_URL", "memory://")
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryCacheBackend()
+    if scheme == "redis":
+        return RedisCacheBackend(url)
+
+    raise ValueError(f"Unsupported CACHE_URL scheme: {scheme}")
+
+
+def get_cache_backend():
+    global _backend
+
+    backend = _backend
+    if backend is not None:
+        return backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_cache_backend()
+        return _backend
+
+
+async def run_cache_io(func, *args, **kwargs):
+    """
+    Call func (a backend method, or a function making backend calls) from the event loop:
+    in the threadpool when the backend waits on the network, inline otherwise.
+    """
+
+    if get_cache_backend().blocking:
+        return await run_in_threadpool(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def set_cache_backend(backend: CacheBackend):
+    # Swap the backend at runtime, e.g. in tests; returns the previous one
+    global _backend
+
+    with _backend_lock:
+        previous, _backend = _backend, backend
+        return previous
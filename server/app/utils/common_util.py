@@ -1,24 +1,123 @@
+import base64
+import binascii
+import json
 from math import ceil
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from app.utils.count_util import count_total
 
-def paginate_query(query, page: int, limit: int):
+
+def encode_cursor(values: list):
+    # Opaque, url-safe token holding the sort key values of the last row on a page
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, expected_length: int):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != expected_length:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    return values
+
+
+def _keyset_condition(sort_keys, values):
+    # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... honouring each key's direction
+    conditions = []
+    for i, (column, descending) in enumerate(sort_keys):
+        equal_prefix = [key == value for (key, _), value in zip(sort_keys[:i], values[:i])]
+        seek = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*equal_prefix, seek))
+
+    return or_(*conditions)
+
+
+async def paginate_query(
+    db,
+    query,
+    page: int,
+    limit: int,
+    cursor: str | None = None,
+    sort_keys=None,
+    total_mode: str = "exact",
+    counter_columns=None,
+):
+    """
+    Paginate a select() by page/limit (OFFSET) or, when a cursor is given, by keyset.
+    query_data holds the entities of a select() of one entity, or a dict per row
+    (column label -> value) of a select() of plain columns.
+
+    sort_keys is a list of (column, descending) pairs the result is ordered by;
+    the last key must be unique (usually the primary key) so the order is total.
+    total_mode picks how "total" is computed: exact, estimate or none;
+    counter_columns is passed to count_total for estimates of unfiltered listings.
+    Cursor pages skip the total (mode none) and report no page number: counting would cost
+    a scan per page however deep the cursor is, and page means nothing after a seek.
+    """
 
     if page < 1:
         raise ValueError("page must be >= 1")
-    
+
     if limit < 1:
         raise ValueError("limit must be >= 1")
 
-    total = query.count()
-    offset = (page - 1) * limit
+    sort_keys = sort_keys or []
+
+    if cursor:
+        page = None
+        total_mode = "none"
+
+    total = await count_total(db, query, total_mode, counter_columns)
+
+    # Row width before the sort key columns are appended
+    selected = query.column_descriptions
+    single_entity = len(selected) == 1 and selected[0]["expr"] is selected[0]["entity"]
+
+    if sort_keys:
+        query = query.order_by(None).order_by(
+            *[column.desc() if descending else column.asc() for column, descending in sort_keys]
+        )
+        # Fetch the sort key values alongside each row to build the next cursor
+        query = query.add_columns(
+            *[column.label(f"_sort_key_{i}") for i, (column, _) in enumerate(sort_keys)]
+        )
+
+    if cursor:
+        if not sort_keys:
+            raise ValueError("cursor pagination requires sort_keys")
+        values = decode_cursor(cursor, len(sort_keys))
+        query = query.where(_keyset_condition(sort_keys, values))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    query_data = query.offset(offset).limit(limit).all()
+    next_cursor = None
+    if sort_keys and has_more:
+        next_cursor = encode_cursor(list(rows[-1][-len(sort_keys):]))
 
     data_to_return = {
         "page": page,
         "limit": limit,
         "total": total,
-        "total_pages": ceil(total / limit),
-        "query_data": query_data
+        "total_pages": ceil(total / limit) if total is not None else None,
+        "total_mode": total_mode,
+        "next_cursor": next_cursor,
+        "query_data": [
+            row[0] if single_entity else dict(zip(row._fields[:len(selected)], row[:len(selected)]))
+            for row in rows
+        ]
     }
 
-    return data_to_return
\ No newline at end of file
+    return data_to_return
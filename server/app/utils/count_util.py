@@ -0,0 +1,142 @@
+# References:
+# https://www.postgresql.org/docs/current/using-explain.html
+# https://wiki.postgresql.org/wiki/Count_estimate
+# https://docs.python.org/3/library/collections.html#collections.OrderedDict
+
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import func, select
+from sqlalchemy.sql.util import find_tables
+from app.db.table_version import get_table_versions
+from app.utils.cache_backend_util import run_cache_io
+from app.models import DashboardCounter
+from app.utils.counter_util import DASHBOARD_COUNTER_ID
+
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+# Exact counts per filter signature, tagged with the table versions they were computed at.
+# Versions are per process with the memory:// cache backend, so the TTL bounds how long
+# another worker's writes can go unseen
+_COUNT_CACHE_SIZE = 1024
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", 30))
+_count_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _count_signature(db, query):
+    statement = query.order_by(None)
+    compiled = statement.compile(dialect=db.get_bind().dialect)
+    table_names = sorted({
+        table.name
+        for table in find_tables(statement, check_columns=True)
+        if getattr(table, "name", None)
+    })
+
+    return (
+        str(compiled),
+        json.dumps(compiled.params, sort_keys=True, default=str),
+        tuple(table_names),
+    )
+
+
+def _cache_get(signature):
+    with _lock:
+        entry = _count_cache.get(signature)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            del _count_cache[signature]
+            return None
+        _count_cache.move_to_end(signature)
+        return entry
+
+
+def _cache_set(signature, versions, total):
+    with _lock:
+        _count_cache[signature] = (versions, total, time.monotonic() + COUNT_CACHE_TTL_SECONDS)
+        _count_cache.move_to_end(signature)
+        while len(_count_cache) > _COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+
+
+async def _exact_count(db, query, signature):
+    versions = tuple(await run_cache_io(get_table_versions, signature[2]))
+
+    entry = _cache_get(signature)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+
+    total = await db.scalar(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    _cache_set(signature, versions, total)
+
+    return total
+
+
+async def _counter_total(db, counter_columns):
+    # Sum of maintained dashboard_counters columns, one primary key read
+    row = (await db.execute(
+        select(*[getattr(DashboardCounter, column) for column in counter_columns])
+        .where(DashboardCounter.id == DASHBOARD_COUNTER_ID)
+    )).first()
+    return sum(row) if row is not None else None
+
+
+async def _estimated_count(db, query, signature):
+    dialect = db.get_bind().dialect
+
+    # PostgreSQL: ask the planner how many rows the filtered query returns
+    if dialect.name == "postgresql":
+        compiled = query.order_by(None).compile(dialect=dialect)
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+
+        connection = await db.connection()
+        plan = (await connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), params)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # Elsewhere there is no cheap estimate that respects the filters, so count exactly
+    return await _exact_count(db, query, signature)
+
+
+async def count_total(db, query, total_mode: str = "exact", counter_columns=None):
+    """
+    Return the total row count of a select() according to total_mode:
+    exact (cached until one of its tables is written), estimate, or none.
+
+    counter_columns names the dashboard_counters columns whose sum is the query's total,
+    given only when the query has no filter those counters do not already account for.
+    estimate then reads the counters; other queries get the planner's estimate on
+    PostgreSQL and an exact count elsewhere.
+    """
+
+    if total_mode not in TOTAL_MODES:
+        raise ValueError(f"total_mode must be one of {', '.join(TOTAL_MODES)}")
+
+    if total_mode == "none":
+        return None
+
+    # Count rows, not columns: full and column-projected listings share one cached count
+    entity = query.column_descriptions[0]["entity"]
+    if entity is not None:
+        query = query.with_only_columns(entity.id, maintain_column_froms=True)
+
+    signature = _count_signature(db, query)
+
+    if total_mode == "estimate":
+        if counter_columns:
+            total = await _counter_total(db, counter_columns)
+            if total is not None:
+                return total
+        return await _estimated_count(db, query, signature)
+
+    return await _exact_count(db, query, signature)
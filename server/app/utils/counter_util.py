@@ -0,0 +1,135 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/dml.html#orm-update-and-delete-with-custom-where-criteria
+# https://docs.sqlalchemy.org/en/20/tutorial/data_select.html#aggregate-functions-with-group-by-having
+
+
+from datetime import datetime
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import Animal, Application, DashboardCounter, User
+from app.models.enums import ApplicationStatus, UserType
+
+
+DASHBOARD_COUNTER_ID = 1
+
+# Counter column for each application status
+APPLICATION_STATUS_COUNTERS = {
+    ApplicationStatus.Submitted: "total_pending_applications",
+    ApplicationStatus.Approved: "total_approved_applications",
+    ApplicationStatus.Rejected: "total_rejected_applications",
+    ApplicationStatus.Cancelled: "total_cancelled_applications",
+}
+
+# Counter column for each user type
+USER_TYPE_COUNTERS = {
+    UserType.Admin: "total_admins",
+    UserType.Adopter: "total_adopters",
+}
+
+
+def application_status_deltas(old_status, new_status):
+    # Counter changes for an application moving from old_status to new_status (None = not counted)
+    deltas = {}
+
+    if old_status is not None:
+        column = APPLICATION_STATUS_COUNTERS[ApplicationStatus(old_status)]
+        deltas[column] = deltas.get(column, 0) - 1
+
+    if new_status is not None:
+        column = APPLICATION_STATUS_COUNTERS[ApplicationStatus(new_status)]
+        deltas[column] = deltas.get(column, 0) + 1
+
+    return deltas
+
+
+def user_type_deltas(user_type, delta: int):
+    return {USER_TYPE_COUNTERS[UserType(user_type)]: delta}
+
+
+async def adjust_dashboard_counters(db: AsyncSession, deltas: dict):
+    """
+    Apply counter deltas in the caller's transaction with a single atomic UPDATE,
+    so concurrent writers never lose increments. The caller commits.
+    """
+
+    statement = _counter_update(deltas)
+    if statement is not None:
+        await db.execute(statement)
+
+
+def adjust_dashboard_counters_sync(db: Session, deltas: dict):
+    # Same as adjust_dashboard_counters, for scripts using a sync Session. The caller commits.
+    statement = _counter_update(deltas)
+    if statement is not None:
+        db.execute(statement)
+
+
+def _counter_update(deltas: dict):
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return None
+
+    return (
+        update(DashboardCounter)
+        .where(DashboardCounter.id == DASHBOARD_COUNTER_ID)
+        .values({
+            column: getattr(DashboardCounter, column) + delta
+            for column, delta in deltas.items()
+        })
+    )
+
+
+def reconcile_dashboard_counters(db: Session):
+    """
+    Recompute every counter from the source tables, one aggregate pass per table,
+    and overwrite the counters row. The caller commits.
+    Takes a sync Session; from async code use AsyncSession.run_sync.
+    """
+
+    counts = {column: 0 for column in [*APPLICATION_STATUS_COUNTERS.values(), *USER_TYPE_COUNTERS.values()]}
+
+    counts["total_animals"] = db.execute(
+        select(func.count()).select_from(Animal).where(Animal.is_deleted.is_(False))
+    ).scalar()
+
+    application_rows = db.execute(
+        select(Application.application_status, func.count())
+        .where(Application.is_deleted.is_(False))
+        .group_by(Application.application_status)
+    ).all()
+    for application_status, count in application_rows:
+        counts[APPLICATION_STATUS_COUNTERS[application_status]] = count
+
+    user_rows = db.execute(
+        select(User.user_type, func.count())
+        .where(User.is_deleted.is_(False))
+        .group_by(User.user_type)
+    ).all()
+    for user_type, count in user_rows:
+        counts[USER_TYPE_COUNTERS[user_type]] = count
+
+    counter = db.get(DashboardCounter, DASHBOARD_COUNTER_ID)
+    if counter is None:
+        counter = DashboardCounter(id=DASHBOARD_COUNTER_ID)
+        db.add(counter)
+
+    for column, count in counts.items():
+        setattr(counter, column, count)
+    counter.reconciled_at = datetime.utcnow()
+
+    db.flush()
+
+    return counter
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        reconcile_dashboard_counters(db)
+        db.commit()
+        print("Dashboard counters reconciled")
+    finally:
+        db.close()
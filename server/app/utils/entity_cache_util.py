@@ -0,0 +1,184 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/encoder/
+# https://en.wikipedia.org/wiki/Cache_replacement_policies#Least_recently_used_(LRU)
+
+
+import json
+import logging
+import os
+import threading
+from fastapi.encoders import jsonable_encoder
+from app.utils.cache_backend_util import CacheUnavailable, configure_namespace, get_cache_backend, run_cache_io
+
+
+# Formatted detail data (never ORM objects) of single animals, applications and users
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", 10000))
+ENTITY_CACHE_TTL_SECONDS = int(os.getenv("ENTITY_CACHE_TTL_SECONDS", 60))
+
+ENTITY_KINDS = ("animal", "application", "user")
+
+# <kind> and <kind>:<id> -> bumped by every invalidation. Per-entity counters only have to
+# outlive a request, kind counters are never dropped
+GENERATIONS_NAMESPACE = "entity_generations"
+GENERATION_TTL_SECONDS = 3600
+
+for _kind in ENTITY_KINDS:
+    configure_namespace(f"entity:{_kind}", ttl=ENTITY_CACHE_TTL_SECONDS, max_entries=ENTITY_CACHE_SIZE)
+configure_namespace(GENERATIONS_NAMESPACE)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {}               # kind -> hits, misses, invalidations
+
+# (kind, id) and (kind, None) for a whole kind, whose invalidation could not be written.
+# They are neither read from nor stored in the cache until a retried invalidation succeeds
+_unconfirmed = set()
+
+
+def _count(kind: str, name: str):
+    with _lock:
+        stats = _stats.setdefault(kind, {"hits": 0, "misses": 0, "invalidations": 0})
+        stats[name] += 1
+
+
+def _generation_keys(kind: str, entity_id):
+    return [kind, f"{kind}:{entity_id}"]
+
+
+def _bypassed(kind: str, entity_id):
+    # Retries pending invalidations first; True while this entity's is still not written
+    if not _unconfirmed:
+        return False
+
+    with _lock:
+        pending = list(_unconfirmed)
+
+    for pending_kind, pending_id in pending:
+        try:
+            if pending_id is None:
+                _write_kind_invalidation(pending_kind)
+            else:
+                _write_invalidation(pending_kind, pending_id)
+        except CacheUnavailable:
+            break
+        with _lock:
+            _unconfirmed.discard((pending_kind, pending_id))
+
+    return (kind, None) in _unconfirmed or (kind, str(entity_id)) in _unconfirmed
+
+
+def _entity_generation(kind: str, entity_id):
+    return tuple(get_cache_backend().get_counters(GENERATIONS_NAMESPACE, _generation_keys(kind, entity_id)))
+
+
+async def entity_generation(kind: str, entity_id):
+    """
+    Token to take before reading an entity from the database and pass to cache_entity.
+    An invalidation in between changes it, so data read before a write is never cached after it.
+    """
+
+    return await run_cache_io(_entity_generation, kind, entity_id)
+
+
+def _lookup_entity(kind: str, entity_id):
+    values, counters = get_cache_backend().read_many(
+        {f"entity:{kind}": [str(entity_id)]},
+        {GENERATIONS_NAMESPACE: _generation_keys(kind, entity_id)},
+    )
+    generation = tuple(counters[GENERATIONS_NAMESPACE])
+
+    if _bypassed(kind, entity_id):
+        return None, generation
+    return values[f"entity:{kind}"][0], generation
+
+
+async def get_cached_entity(kind: str, entity_id):
+    """
+    Cached data, or None when it has to be read from the database, together with the
+    entity_generation token for cache_entity, both in one round trip.
+    Dates come back as ISO strings, exactly as they are sent in responses.
+    """
+
+    raw, generation = await run_cache_io(_lookup_entity, kind, entity_id)
+
+    if raw is None:
+        _count(kind, "misses")
+        return None, generation
+
+    _count(kind, "hits")
+    return json.loads(raw), generation
+
+
+def _store_entity(kind: str, entity_id, data: dict, generation):
+    # Invalidated while the caller was reading it
+    if generation != _entity_generation(kind, entity_id) or _bypassed(kind, entity_id):
+        return
+
+    get_cache_backend().set(f"entity:{kind}", str(entity_id), json.dumps(jsonable_encoder(data)).encode())
+
+
+async def cache_entity(kind: str, entity_id, data: dict, generation):
+    await run_cache_io(_store_entity, kind, entity_id, data, generation)
+
+
+def _write_invalidation(kind: str, entity_id):
+    backend = get_cache_backend()
+    backend.delete(f"entity:{kind}", str(entity_id), required=True)
+    backend.incr(GENERATIONS_NAMESPACE, f"{kind}:{entity_id}", ttl=GENERATION_TTL_SECONDS, required=True)
+
+
+def _invalidate_entity(kind: str, entity_id):
+    try:
+        _write_invalidation(kind, entity_id)
+    except CacheUnavailable:
+        logger.warning("Invalidation of %s %s could not be written; bypassing its cache until it is", kind, entity_id)
+        with _lock:
+            _unconfirmed.add((kind, str(entity_id)))
+
+
+async def invalidate_entity(kind: str, entity_id):
+    # Call after the write is committed
+    await run_cache_io(_invalidate_entity, kind, entity_id)
+    _count(kind, "invalidations")
+
+
+def _write_kind_invalidation(kind: str):
+    backend = get_cache_backend()
+    backend.clear_namespace(f"entity:{kind}", required=True)
+    backend.incr(GENERATIONS_NAMESPACE, kind, required=True)
+
+
+def _invalidate_entities(kind: str):
+    try:
+        _write_kind_invalidation(kind)
+    except CacheUnavailable:
+        logger.warning("Invalidation of every %s could not be written; bypassing their cache until it is", kind)
+        with _lock:
+            _unconfirmed.add((kind, None))
+
+
+async def invalidate_entities(kind: str):
+    # Drop every cached entity of a kind, e.g. when data they embed has changed
+    await run_cache_io(_invalidate_entities, kind)
+    _count(kind, "invalidations")
+
+
+def get_entity_cache_stats():
+    with _lock:
+        kinds = {}
+        for kind, stats in _stats.items():
+            lookups = stats["hits"] + stats["misses"]
+            kinds[kind] = {
+                **stats,
+                "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+        hits = sum(stats["hits"] for stats in _stats.values())
+        lookups = hits + sum(stats["misses"] for stats in _stats.values())
+        return {
+            "max_size": ENTITY_CACHE_SIZE,
+            "ttl_seconds": ENTITY_CACHE_TTL_SECONDS,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "kinds": kinds,
+        }
@@ -0,0 +1,38 @@
+# References:
+# https://jsonapi.org/format/#fetching-sparse-fieldsets
+# https://docs.sqlalchemy.org/en/20/core/selectable.html#sqlalchemy.sql.expression.select
+
+
+from fastapi import HTTPException, status
+
+
+def parse_fields(fields: str | None, allowed):
+    """
+    Field names requested by a comma-separated fields= value, in the order of allowed,
+    with id always included (pagination and cursors need it). None when fields= is not given.
+    """
+
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+
+    return [name for name in allowed if name == "id" or name in requested]
+
+
+def project_columns(field_names, columns: dict):
+    # Labelled columns for the requested fields that map to a column; derived fields are skipped
+    return [columns[name].label(name) for name in field_names if name in columns]
+
+
+def sparse_page(paginated_info: dict, items_key: str, items: list):
+    # Same page fields as the typed page models, with items holding only the requested fields
+    page_data = {key: value for key, value in paginated_info.items() if key != "query_data"}
+    page_data[items_key] = items
+    return page_data
@@ -0,0 +1,96 @@
+# References:
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/ETag
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/If-None-Match
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Cache-Control#immutable
+# https://asgi.readthedocs.io/en/latest/extensions.html#path-send
+
+
+import hashlib
+import os
+import anyio
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse
+from app.db.table_version import get_table_versions
+from app.utils.cache_backend_util import run_cache_io
+
+
+# Content whose URL changes whenever the content does can be cached forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# API data: the browser may keep it but has to revalidate with the ETag every time
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(request: Request, etag: str):
+    # True when the client already holds this representation (If-None-Match).
+    # "*" is never matched: callers check before loading the resource, so nothing is known to exist
+    # yet, and a 304 there would hide a 404 or 403
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    # Weak comparison, as required for If-None-Match
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+def versions_etag(versions, *parts):
+    # Weak ETag from (table name, version) pairs already read, e.g. by listing_versions
+    key = "|".join([*(f"{name}={version}" for name, version in versions), *map(str, parts)])
+    return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+async def versioned_etag(table_names, *parts):
+    """
+    Weak ETag for a response built only from table_names, identified by parts
+    (path parameters, query string, caller). Any committed write to one of the
+    tables changes it, and it is computed without touching the database.
+    """
+
+    table_names = list(table_names)
+    versions = await run_cache_io(get_table_versions, table_names)
+    return versions_etag(zip(table_names, versions), *parts)
+
+
+def set_etag_headers(response: Response, etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str | None = None):
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+class PathSendFileResponse(FileResponse):
+    """
+    FileResponse that lets the server send the file itself (sendfile) when it supports
+    the ASGI pathsend extension, instead of copying it through Python in chunks.
+    Range and HEAD requests keep the regular FileResponse behaviour.
+    """
+
+    async def __call__(self, scope, receive, send):
+        pathsend = "http.response.pathsend" in scope.get("extensions", {})
+        plain_get = scope["method"].upper() == "GET" and not any(
+            name == b"range" for name, _ in scope.get("headers", [])
+        )
+
+        if not (pathsend and plain_get):
+            await super().__call__(scope, receive, send)
+            return
+
+        if self.stat_result is None:
+            self.set_stat_headers(await anyio.to_thread.run_sync(os.stat, self.path))
+
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,208 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#insert-on-conflict-upsert
+# https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#insert-on-conflict-upsert
+# https://en.wikipedia.org/wiki/Reference_counting
+
+
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import Animal, ImageBlob
+from app.utils.image_util import IMAGES_DIR, StoredImage, blob_name
+
+
+# photo_url of a content-addressed image; older uploads use flat names and are not counted
+BLOB_URL_PATTERN = re.compile(r"^/images/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.(\w+)$")
+
+# Unreferenced blobs are kept this long, so an upload still committing is never collected
+BLOB_GRACE_PERIOD = timedelta(hours=1)
+
+
+def blob_hash_of(photo_url: str | None):
+    match = BLOB_URL_PATTERN.match(photo_url or "")
+    return match.group(1) if match else None
+
+
+async def acquire_image_blob(db: AsyncSession, stored: StoredImage):
+    """
+    Add one reference to a stored image in the caller's transaction, creating its row if needed.
+    The caller commits.
+    """
+
+    await acquire_image_blobs(db, {stored: 1})
+
+
+async def acquire_image_blobs(db: AsyncSession, references: dict):
+    """
+    Add references (StoredImage -> count) to stored images in the caller's transaction,
+    creating rows as needed, with one executemany upsert. The caller commits.
+    """
+
+    if not references:
+        return
+
+    now = datetime.utcnow()
+    table = ImageBlob.__table__
+    dialect = db.get_bind().dialect.name
+
+    # Single-statement upsert where the database supports it
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.hash],
+            set_={"ref_count": table.c.ref_count + statement.excluded.ref_count, "updated_at": now},
+        )
+        await db.execute(statement, [
+            {
+                "hash": stored.hash,
+                "extension": stored.extension,
+                "size": stored.size,
+                "ref_count": count,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for stored, count in references.items()
+        ])
+        return
+
+    for stored, count in references.items():
+        blob = await db.get(ImageBlob, stored.hash)
+        if blob is None:
+            blob = ImageBlob(
+                hash=stored.hash,
+                extension=stored.extension,
+                size=stored.size,
+                ref_count=0,
+                created_at=now,
+            )
+            db.add(blob)
+        blob.ref_count += count
+        blob.updated_at = now
+    await db.flush()
+
+
+async def release_image_blob(db: AsyncSession, photo_url: str | None):
+    """
+    Drop one reference to the image behind photo_url in the caller's transaction.
+    The file itself is removed later by collect_image_blobs. The caller commits.
+    """
+
+    digest = blob_hash_of(photo_url)
+    if digest is None:
+        return
+
+    await db.execute(
+        update(ImageBlob)
+        .where(ImageBlob.hash == digest, ImageBlob.ref_count > 0)
+        .values(ref_count=ImageBlob.ref_count - 1, updated_at=datetime.utcnow())
+    )
+
+
+def backfill_image_blobs(db: Session):
+    """
+    Recount references from the animals table and rewrite the blob rows.
+    Takes a sync Session; the caller commits. Returns the number of blobs counted.
+    """
+
+    rows = db.execute(
+        select(Animal.photo_url, func.count())
+        .where(Animal.photo_url.is_not(None))
+        .group_by(Animal.photo_url)
+    ).all()
+
+    now = datetime.utcnow()
+    counts = {}
+    for photo_url, count in rows:
+        match = BLOB_URL_PATTERN.match(photo_url)
+        if match:
+            counts[match.groups()] = counts.get(match.groups(), 0) + count
+
+    db.execute(delete(ImageBlob))
+    for (digest, extension), count in counts.items():
+        path = IMAGES_DIR / blob_name(digest, extension)
+        db.add(ImageBlob(
+            hash=digest,
+            extension=extension,
+            size=path.stat().st_size if path.exists() else 0,
+            ref_count=count,
+            created_at=now,
+            updated_at=now,
+        ))
+    db.flush()
+
+    return len(counts)
+
+
+def _unlink_unless_restamped(path: Path, cutoff: datetime):
+    """
+    Remove a blob file unless an upload re-stamped it since cutoff. The file is moved aside
+    first, so an upload deduplicating onto it either re-stamped it before the move (it is put
+    back) or finds it gone and writes its own copy. Returns True when the file was removed.
+    """
+
+    tombstone = path.with_name(f".collect-{path.name}")
+    try:
+        os.rename(path, tombstone)
+    except FileNotFoundError:
+        return False
+
+    if datetime.utcfromtimestamp(tombstone.stat().st_mtime) >= cutoff:
+        os.replace(tombstone, path)
+        return False
+
+    os.unlink(tombstone)
+    return True
+
+
+def collect_image_blobs(db: Session, grace_period: timedelta = BLOB_GRACE_PERIOD):
+    """
+    Delete blobs nobody references any more, plus files left by uploads whose
+    transaction never committed, once they are older than grace_period.
+    Only rows still unreferenced are deleted, and a file an upload deduplicated onto
+    within grace_period is kept (see _unlink_unless_restamped).
+    Takes a sync Session; the caller commits. Returns the number of files removed.
+    """
+
+    cutoff = datetime.utcnow() - grace_period
+
+    unreferenced = db.execute(
+        delete(ImageBlob)
+        .where(ImageBlob.ref_count <= 0, ImageBlob.updated_at < cutoff)
+        .returning(ImageBlob.hash, ImageBlob.extension)
+    ).all()
+    paths = [IMAGES_DIR / blob_name(digest, extension) for digest, extension in unreferenced]
+
+    # Files in the blob directories without a row at all
+    known = set(db.execute(select(ImageBlob.hash)).scalars())
+    for directory, _, filenames in os.walk(IMAGES_DIR):
+        if os.path.relpath(directory, IMAGES_DIR).count(os.sep) != 1:
+            continue
+        for filename in filenames:
+            path = Path(directory) / filename
+            digest = filename.split(".", 1)[0]
+            if (
+                not filename.startswith(".")
+                and digest not in known
+                and datetime.utcfromtimestamp(path.stat().st_mtime) < cutoff
+            ):
+                paths.append(path)
+
+    return sum(_unlink_unless_restamped(path, cutoff) for path in paths)
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        removed = collect_image_blobs(db)
+        db.commit()
+        print(f"Removed {removed} unreferenced images")
+    finally:
+        db.close()
@@ -0,0 +1,135 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/request-files/#uploadfile
+# https://docs.python.org/3/library/tempfile.html#tempfile.mkstemp
+# https://docs.python.org/3/library/os.html#os.replace
+# https://en.wikipedia.org/wiki/List_of_file_signatures
+# https://en.wikipedia.org/wiki/Content-addressable_storage
+
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+
+# Directory where animal images are stored and served from (server/app/src/images)
+IMAGES_DIR = Path(__file__).resolve().parent.parent / "src" / "images"
+
+ALLOWED_IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "webp"]
+
+# Largest accepted upload, checked while streaming
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", 10 * 1024 * 1024))
+
+# Bytes read and written per step, so memory per upload stays constant
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Bytes needed to recognise every supported format
+SNIFF_BYTES = 12
+
+
+class StoredImage(NamedTuple):
+    name: str         # path relative to IMAGES_DIR, e.g. ab/cd/abcd...ef.jpg
+    hash: str         # sha256 of the content
+    extension: str
+    size: int
+
+
+def blob_name(digest: str, extension: str):
+    # Two levels of hash-prefix directories keep each directory small
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+def sniff_image_type(header: bytes):
+    # Detect the real image type from its leading bytes, None if unsupported
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+
+    return None
+
+
+def _restamp(path: Path):
+    # True when the file exists; its mtime is refreshed so collect_image_blobs keeps it
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _discard(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload_image(upload: UploadFile):
+    """
+    Stream an uploaded image into IMAGES_DIR under its content hash and return a StoredImage.
+
+    The upload is copied chunk by chunk into a temp file in the same directory,
+    failing with 413 past MAX_IMAGE_UPLOAD_BYTES and with 400 when the content
+    is not a JPEG, PNG or WebP image. The finished file is renamed into place
+    atomically, so a partial upload is never visible under its final name.
+    Content that is already stored is not written again, only re-stamped.
+    Reference counting is left to the caller (see image_blob_util).
+    """
+
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=IMAGES_DIR, prefix=".upload-")
+    size = 0
+    header = b""
+    image_type = None
+    digest = hashlib.sha256()
+
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_IMAGE_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Image is larger than {MAX_IMAGE_UPLOAD_BYTES // (1024 * 1024)} MB"
+                    )
+
+                # Trust the content, not the file name; reject as soon as the header is in
+                if image_type is None:
+                    header += chunk[:SNIFF_BYTES - len(header)]
+                    image_type = sniff_image_type(header)
+                    if image_type is None and len(header) >= SNIFF_BYTES:
+                        break
+
+                digest.update(chunk)
+                await run_in_threadpool(temp_file.write, chunk)
+
+        if image_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid image content. Only JPEG, PNG and WebP images are allowed."
+            )
+
+        stored = StoredImage(blob_name(digest.hexdigest(), image_type), digest.hexdigest(), image_type, size)
+        target = IMAGES_DIR / stored.name
+
+        if await run_in_threadpool(_restamp, target):
+            # Identical content is already stored
+            await run_in_threadpool(_discard, temp_path)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            await run_in_threadpool(os.replace, temp_path, target)
+
+    except BaseException:
+        await run_in_threadpool(_discard, temp_path)
+        raise
+
+    return stored
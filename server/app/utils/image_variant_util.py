@@ -0,0 +1,156 @@
+# References:
+# https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.Image.thumbnail
+# https://pillow.readthedocs.io/en/stable/reference/ImageOps.html#PIL.ImageOps.exif_transpose
+# https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html#webp
+# https://developer.mozilla.org/en-US/docs/Web/HTML/Responsive_images
+
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from PIL import Image, ImageOps
+from app.utils.image_util import IMAGES_DIR
+
+
+# Generated variants live next to, not inside, the originals directory
+VARIANTS_DIR = IMAGES_DIR.parent / "image_variants"
+
+# Only these widths are generated, so the cache cannot be filled with arbitrary sizes
+IMAGE_VARIANT_WIDTHS = [160, 320, 640, 960, 1280]
+
+# Output format -> (Pillow format, media type)
+IMAGE_VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+# Variant URLs returned with each animal
+IMAGE_VARIANT_PRESETS = {
+    "small": 320,
+    "medium": 640,
+    "large": 1280,
+}
+
+# Disk budget of the variant cache; least recently used variants are removed past it
+IMAGE_VARIANT_CACHE_BYTES = int(os.getenv("IMAGE_VARIANT_CACHE_BYTES", 256 * 1024 * 1024))
+
+_lock = threading.Lock()
+_index = None   # variant filename -> size, least recently used first
+_index_bytes = 0
+
+
+def image_variant_urls(photo_url: str | None):
+    # WebP variant URL for each preset, None when the animal has no photo
+    if not photo_url:
+        return None
+
+    return {
+        preset: f"{photo_url}?w={width}&fmt=webp"
+        for preset, width in IMAGE_VARIANT_PRESETS.items()
+    }
+
+
+def variant_path(original: Path, width: int | None, fmt: str):
+    # Name changes whenever the original is replaced, so stale variants are never served
+    stat = original.stat()
+    key = f"{original.relative_to(IMAGES_DIR)}|{stat.st_mtime_ns}|{stat.st_size}|{width}|{fmt}"
+    return VARIANTS_DIR / f"{hashlib.sha256(key.encode()).hexdigest()}.{fmt}"
+
+
+def render_image_variant(source: str, target: str, width: int | None, fmt: str):
+    """
+    Resize source to at most width pixels wide (never upscaling) and save it as fmt at target.
+    Runs in the image pool, so it takes and returns only plain values. Returns the file size.
+    """
+
+    pil_format, _ = IMAGE_VARIANT_FORMATS[fmt]
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+
+        if width and image.width > width:
+            image.thumbnail((width, round(image.height * width / image.width)), Image.LANCZOS)
+
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        save_options = {"quality": 80, "method": 4} if pil_format == "WEBP" else {"quality": 80, "optimize": True}
+
+        # Write under a temp name and rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".variant-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                image.save(temp_file, pil_format, **save_options)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    return os.path.getsize(target)
+
+
+def _load_index():
+    # Rebuild the LRU order from file modification times after a restart
+    global _index, _index_bytes
+
+    if _index is not None:
+        return
+
+    VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+    entries = sorted(
+        (entry.stat().st_mtime, entry.name, entry.stat().st_size)
+        for entry in os.scandir(VARIANTS_DIR)
+        if entry.is_file() and not entry.name.startswith(".")
+    )
+    _index = OrderedDict((name, size) for _, name, size in entries)
+    _index_bytes = sum(_index.values())
+
+
+def touch_cached_variant(path: Path):
+    # True when the variant is cached; marks it as most recently used (blocking, call from a thread)
+    with _lock:
+        _load_index()
+        if path.name not in _index or not path.exists():
+            return False
+
+        _index.move_to_end(path.name)
+
+    os.utime(path)
+    return True
+
+
+def add_cached_variant(path: Path, size: int):
+    # Record a generated variant and evict the least recently used ones past the budget (blocking, call from a thread)
+    global _index_bytes
+
+    evicted = []
+    with _lock:
+        _load_index()
+        _index_bytes += size - _index.pop(path.name, 0)
+        _index[path.name] = size
+
+        while _index_bytes > IMAGE_VARIANT_CACHE_BYTES and len(_index) > 1:
+            name, evicted_size = _index.popitem(last=False)
+            _index_bytes -= evicted_size
+            evicted.append(name)
+
+    for name in evicted:
+        try:
+            os.unlink(VARIANTS_DIR / name)
+        except FileNotFoundError:
+            pass
+
+
+def get_variant_cache_stats():
+    with _lock:
+        _load_index()
+        return {
+            "files": len(_index),
+            "bytes": _index_bytes,
+            "max_bytes": IMAGE_VARIANT_CACHE_BYTES,
+        }
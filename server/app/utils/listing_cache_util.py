@@ -0,0 +1,75 @@
+# References:
+# https://fastapi.tiangolo.com/advanced/response-directly/
+# https://docs.python.org/3/library/hashlib.html
+# https://en.wikipedia.org/wiki/Cache_replacement_policies#Least_recently_used_(LRU)
+
+
+import hashlib
+import os
+import threading
+from app.db.table_version import get_table_versions
+from app.utils.cache_backend_util import configure_namespace, get_cache_backend, run_cache_io
+
+
+# Memory budget for serialized listing pages; least recently used pages are dropped past it
+LISTING_CACHE_BYTES = int(os.getenv("LISTING_CACHE_BYTES", 8 * 1024 * 1024))
+
+# Pages of old table versions are never read again; this only bounds how long they linger
+LISTING_PAGES_NAMESPACE = "listing_pages"
+LISTING_PAGE_TTL_SECONDS = 600
+
+configure_namespace(LISTING_PAGES_NAMESPACE, ttl=LISTING_PAGE_TTL_SECONDS, max_bytes=LISTING_CACHE_BYTES)
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _listing_versions(table_names):
+    table_names = list(table_names)
+    return tuple(zip(table_names, get_table_versions(table_names)))
+
+
+async def listing_versions(table_names):
+    # Take once before querying; used for the lookup (and the ETag, see versions_etag)
+    # and passed to cache_listing_page
+    return await run_cache_io(_listing_versions, table_names)
+
+
+def _page_key(namespace: str, key: tuple, versions: tuple):
+    # Written tables change the key, so a stale page is simply never looked up again
+    return hashlib.sha256(repr((namespace, key, versions)).encode()).hexdigest()
+
+
+async def get_cached_listing_page(namespace: str, key: tuple, versions: tuple):
+    # Serialized response body of a listing page, or None when it has to be queried
+    body = await run_cache_io(get_cache_backend().get, LISTING_PAGES_NAMESPACE, _page_key(namespace, key, versions))
+
+    with _lock:
+        _stats["hits" if body is not None else "misses"] += 1
+    return body
+
+
+def _store_page(namespace: str, key: tuple, versions: tuple, body: bytes):
+    # Written while the caller was querying: the page may already be stale
+    if versions != _listing_versions(name for name, _ in versions):
+        return
+
+    get_cache_backend().set(LISTING_PAGES_NAMESPACE, _page_key(namespace, key, versions), body)
+
+
+async def cache_listing_page(namespace: str, key: tuple, versions: tuple, body: bytes):
+    # A single page larger than the whole budget is not worth keeping
+    if len(body) > LISTING_CACHE_BYTES:
+        return
+
+    await run_cache_io(_store_page, namespace, key, versions, body)
+
+
+def get_listing_cache_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+            "max_bytes": LISTING_CACHE_BYTES,
+        }
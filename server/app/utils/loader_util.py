@@ -0,0 +1,23 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/relationships.html#using-contains-eager-to-load-a-custom-filtered-collection-result
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/relationships.html#preventing-unwanted-lazy-loads-using-raiseload
+
+
+from sqlalchemy.orm import contains_eager, raiseload
+
+
+def join_eager(query, *relationships):
+    """
+    Inner join a select() of one entity to each many-to-one relationship and fill it from the
+    same row (contains_eager), so the whole page is a single query. Every other relationship,
+    on the entity and on the joined rows, raises instead of lazy loading.
+    """
+
+    for relationship in relationships:
+        query = query.join(relationship)
+
+    return query.options(
+        *[contains_eager(relationship).raiseload("*") for relationship in relationships],
+        raiseload("*"),
+    )
+
@@ -0,0 +1,39 @@
+# References:
+# https://fastapi.tiangolo.com/advanced/custom-response/#use-orjsonresponse
+# https://fastapi.tiangolo.com/advanced/response-directly/
+# https://github.com/ijl/orjson#serialize
+
+
+import orjson
+from fastapi import Response, status
+from fastapi.responses import ORJSONResponse as BaseORJSONResponse
+from pydantic import BaseModel
+
+
+class ORJSONResponse(BaseORJSONResponse):
+    # Also accepts a pydantic model; orjson writes datetimes and enums itself, no jsonable_encoder pass
+    def render(self, content) -> bytes:
+        if isinstance(content, BaseModel):
+            content = content.model_dump()
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(
+    model: BaseModel | dict,
+    response: Response | None = None,
+    status_code: int = status.HTTP_200_OK,
+    headers: dict | None = None,
+):
+    """
+    Send an already validated response model (or a dict of plain values) as it is. FastAPI does
+    not run response_model validation on returned Response objects, so the data is validated once,
+    when the model is built. Headers set on the injected response (ETag, Cache-Control) are carried over.
+    """
+
+    json_response = ORJSONResponse(
+        model,
+        status_code=status_code,
+        headers=response.headers if response is not None else None,
+    )
+    json_response.headers.update(headers or {})
+    return json_response
@@ -0,0 +1,116 @@
+# References:
+# https://www.sqlite.org/fts5.html#full_text_query_syntax
+# https://www.sqlite.org/fts5.html#the_bm25_function
+# https://www.postgresql.org/docs/current/textsearch-controls.html#TEXTSEARCH-RANKING
+# https://www.sqlite.org/fts5.html#the_trigram_tokenizer
+# https://www.postgresql.org/docs/current/pgtrgm.html#PGTRGM-INDEX
+
+
+import re
+from sqlalchemy import column, func, literal_column, or_, select, table
+from app.db.search_index import ANIMAL_FTS_TABLE, USER_TRIGRAM_TABLE
+from app.models.animal import Animal
+from app.models.user import User
+
+# Trigram indexes cannot serve terms shorter than one trigram
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _search_terms(search: str):
+    # Keep word characters only so user input can never inject query syntax
+    return re.findall(r"\w+", search.lower())
+
+
+def animal_search_key(search: str | None, dialect: str):
+    # The predicate apply_animal_search runs, e.g. for cache keys: searches with the same terms
+    # share the full-text query, the substring fallback matches the exact text
+    if not search:
+        return None
+
+    terms = _search_terms(search)
+    if terms and dialect in ("sqlite", "postgresql"):
+        return ("terms", " ".join(terms))
+    return ("substring", search)
+
+
+def apply_animal_search(query, search: str, dialect: str):
+    """
+    Restrict a select() of Animal to rows matching search, using the full-text index.
+
+    Returns the filtered query and the sort keys (best match first, then id)
+    to hand to paginate_query.
+    """
+
+    terms = _search_terms(search)
+
+    if terms and dialect == "sqlite":
+        # Prefix match on every term, ranked by bm25 weighted towards the name column
+        fts_table = table(ANIMAL_FTS_TABLE, column("rowid"))
+        fts = literal_column(ANIMAL_FTS_TABLE)
+        matches = (
+            select(
+                fts_table.c.rowid.label("animal_id"),
+                func.bm25(fts, 10.0, 4.0, 4.0, 1.0).label("rank"),
+            )
+            .where(fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.animal_id == Animal.id)
+        # bm25 scores are negative, lower is better
+        return query, [(matches.c.rank, False), (Animal.id, False)]
+
+    if terms and dialect == "postgresql":
+        search_vector = literal_column(f"{Animal.__tablename__}.search_vector")
+        ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        rank = func.ts_rank(search_vector, ts_query)
+        query = query.where(search_vector.op("@@")(ts_query))
+        return query, [(rank, True), (Animal.id, False)]
+
+    # Other databases, or input without any word characters
+    query = query.where(
+        or_(
+            Animal.name.ilike(f"%{search}%"),
+            Animal.species.ilike(f"%{search}%"),
+            Animal.breed.ilike(f"%{search}%"),
+            Animal.description.ilike(f"%{search}%"),
+        )
+    )
+    return query, [(Animal.id, False)]
+
+
+def apply_user_search(query, search: str, dialect: str):
+    """
+    Restrict a select() of User to rows whose name, email or address contains search.
+
+    Input that starts like an email address ("name@..." but not "@domain") is
+    served by a prefix range on lower(email). Everything else, domains included,
+    is a substring match served by the trigram index when the term is long enough.
+    """
+
+    term = search.strip().lower()
+
+    # Email prefix fast path; "@gmail.com" is a substring search like any other
+    if "@" in term and not term.startswith("@"):
+        email = func.lower(User.email)
+        if dialect == "postgresql":
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            return query.where(email.like(f"{escaped}%", escape="\\"))
+        return query.where(email >= term, email < term + "\uffff")
+
+    if len(term) >= TRIGRAM_MIN_LENGTH and dialect == "sqlite":
+        # A quoted phrase in a trigram table matches any row containing the substring
+        trigram_table = table(USER_TRIGRAM_TABLE, column("rowid"))
+        phrase = '"' + term.replace('"', '""') + '"'
+        matches = select(trigram_table.c.rowid).where(
+            literal_column(USER_TRIGRAM_TABLE).op("MATCH")(phrase)
+        )
+        return query.where(User.id.in_(matches))
+
+    # PostgreSQL answers this with the pg_trgm GIN indexes; short terms fall back to a scan
+    return query.where(
+        or_(
+            User.name.ilike(f"%{search}%"),
+            User.email.ilike(f"%{search}%"),
+            User.address.ilike(f"%{search}%")
+        )
+    )
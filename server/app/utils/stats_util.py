@@ -0,0 +1,195 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#insert-on-conflict-upsert
+# https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#insert-on-conflict-upsert
+# https://docs.python.org/3/library/datetime.html#datetime.date.weekday
+
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import AdoptionDailyStat, Animal, Application
+from app.models.enums import ApplicationStatus
+
+
+# Rollup column for each application status
+APPLICATION_STATUS_STATS = {
+    ApplicationStatus.Submitted: "applications_submitted",
+    ApplicationStatus.Approved: "applications_approved",
+    ApplicationStatus.Rejected: "applications_rejected",
+    ApplicationStatus.Cancelled: "applications_cancelled",
+}
+
+STAT_COLUMNS = [
+    "applications_submitted",
+    "applications_approved",
+    "applications_rejected",
+    "applications_cancelled",
+    "animals_intake",
+    "animals_adopted",
+]
+
+
+def application_status_stats(new_status):
+    # Rollup changes when an application enters new_status
+    new_status = ApplicationStatus(new_status)
+    deltas = {APPLICATION_STATUS_STATS[new_status]: 1}
+
+    if new_status == ApplicationStatus.Approved:
+        deltas["animals_adopted"] = 1
+
+    return deltas
+
+
+async def record_daily_stats(db: AsyncSession, deltas: dict, day: date | None = None):
+    """
+    Add deltas to the rollup row of day (today, UTC) in the caller's transaction,
+    creating the row if needed. The caller commits.
+    """
+
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    day = day or datetime.utcnow().date()
+    table = AdoptionDailyStat.__table__
+    dialect = db.get_bind().dialect.name
+
+    # Single-statement upsert where the database supports it
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        statement = insert(table).values(day=day, **deltas)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={column: table.c[column] + statement.excluded[column] for column in deltas},
+        )
+        await db.execute(statement)
+        return
+
+    row = await db.get(AdoptionDailyStat, day)
+    if row is None:
+        row = AdoptionDailyStat(day=day, **{column: 0 for column in STAT_COLUMNS})
+        db.add(row)
+    for column, delta in deltas.items():
+        setattr(row, column, getattr(row, column) + delta)
+    await db.flush()
+
+
+def _count_by_day(db: Session, timestamp_column, *conditions, start: date, end: date):
+    day = func.date(timestamp_column)
+    rows = db.execute(
+        select(day, func.count())
+        .where(
+            timestamp_column >= datetime.combine(start, datetime.min.time()),
+            timestamp_column < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+            *conditions,
+        )
+        .group_by(day)
+    ).all()
+
+    # SQLite returns the day as text
+    return {
+        (date.fromisoformat(value) if isinstance(value, str) else value): count
+        for value, count in rows
+    }
+
+
+def backfill_daily_stats(db: Session, start: date | None = None, end: date | None = None):
+    """
+    Rebuild the rollup rows between start and end (inclusive) from the source tables.
+
+    Submissions and intake come from created_at. Decisions use updated_at of
+    applications currently in that status, which is the best history the tables keep.
+    The caller commits. Returns the number of days written.
+    Takes a sync Session; from async code use AsyncSession.run_sync.
+    """
+
+    end = end or datetime.utcnow().date()
+    if start is None:
+        first = db.execute(select(func.min(Application.created_at))).scalar()
+        first_animal = db.execute(select(func.min(Animal.created_at))).scalar()
+        candidates = [value.date() for value in (first, first_animal) if value is not None]
+        start = min(candidates) if candidates else end
+
+    per_column = {
+        "applications_submitted": _count_by_day(db, Application.created_at, start=start, end=end),
+        "animals_intake": _count_by_day(db, Animal.created_at, start=start, end=end),
+    }
+    for status_, column in APPLICATION_STATUS_STATS.items():
+        if status_ == ApplicationStatus.Submitted:
+            continue
+        per_column[column] = _count_by_day(
+            db,
+            Application.updated_at,
+            Application.application_status == status_,
+            start=start,
+            end=end,
+        )
+    per_column["animals_adopted"] = per_column["applications_approved"]
+
+    days = sorted({day for counts in per_column.values() for day in counts})
+
+    db.execute(
+        delete(AdoptionDailyStat).where(
+            AdoptionDailyStat.day >= start,
+            AdoptionDailyStat.day <= end,
+        )
+    )
+    db.add_all([
+        AdoptionDailyStat(
+            day=day,
+            **{column: per_column.get(column, {}).get(day, 0) for column in STAT_COLUMNS}
+        )
+        for day in days
+    ])
+    db.flush()
+
+    return len(days)
+
+
+async def get_daily_stats_series(db: AsyncSession, start: date, end: date, granularity: str = "day"):
+    """
+    Read the rollup rows between start and end and return one entry per day or
+    per ISO week (starting Monday), with zeros for periods without activity.
+    """
+
+    rows = (await db.execute(
+        select(AdoptionDailyStat)
+        .where(
+            AdoptionDailyStat.day >= start,
+            AdoptionDailyStat.day <= end,
+        )
+    )).scalars().all()
+
+    def bucket_of(day: date):
+        return day - timedelta(days=day.weekday()) if granularity == "week" else day
+
+    step = timedelta(days=7 if granularity == "week" else 1)
+    buckets = {}
+    bucket = bucket_of(start)
+    while bucket <= end:
+        buckets[bucket] = {column: 0 for column in STAT_COLUMNS}
+        bucket += step
+
+    for row in rows:
+        totals = buckets[bucket_of(row.day)]
+        for column in STAT_COLUMNS:
+            totals[column] += getattr(row, column)
+
+    return [
+        {"period_start": bucket, **totals}
+        for bucket, totals in buckets.items()
+    ]
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = backfill_daily_stats(db)
+        db.commit()
+        print(f"Backfilled {written} days of adoption statistics")
+    finally:
+        db.close()
@@ -0,0 +1,173 @@
+# References:
+# https://docs.python.org/3/library/hashlib.html
+# https://datatracker.ietf.org/doc/html/rfc7519#section-4.1.4
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/503
+
+
+import hashlib
+import json
+import os
+import threading
+import time
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from app.utils.auth_util import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.utils.cache_backend_util import CacheUnavailable, configure_namespace, get_cache_backend, run_cache_io
+
+
+# Verified token claims, so repeated requests with the same token skip jwt.decode
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 4096))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+
+CLAIMS_NAMESPACE = "token_claims"
+# token:<digest> for logged out tokens, user:<id> -> tokens issued before this time are rejected.
+# Never evicted; a revocation only has to outlive the tokens it applies to
+REVOCATIONS_NAMESPACE = "token_revocations"
+
+configure_namespace(CLAIMS_NAMESPACE, ttl=TOKEN_CACHE_TTL_SECONDS, max_entries=TOKEN_CACHE_SIZE)
+configure_namespace(REVOCATIONS_NAMESPACE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _digest(token: str):
+    # Keys never hold the raw token
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _count(name: str):
+    with _lock:
+        _stats[name] += 1
+
+
+def _revocations_unavailable():
+    # Revocations fail closed: a token is neither accepted nor reported as logged out
+    # while they cannot be read or written
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Token revocations are unavailable, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _revocation_keys(digest: str, user_id):
+    return [f"token:{digest}", f"user:{user_id}"]
+
+
+def _revoked(revocations, claims: dict):
+    revoked_token, revoked_before = revocations
+    if revoked_token is not None:
+        return True
+
+    return revoked_before is not None and claims.get("iat", 0) < float(revoked_before)
+
+
+def _is_revoked(digest: str, claims: dict):
+    # Raises CacheUnavailable when the revocations cannot be read
+    revocations = get_cache_backend().get_many(
+        REVOCATIONS_NAMESPACE, _revocation_keys(digest, claims.get("sub")), required=True
+    )
+    return _revoked(revocations, claims)
+
+
+def get_cached_claims(token: str):
+    # Claims of a token verified earlier, or None when it has to be decoded.
+    # The claims and the token's revocations are read in one round trip
+    digest = _digest(token)
+
+    try:
+        # Not verified: only picks whose revocation to read with the cached claims
+        user_id = jwt.get_unverified_claims(token).get("sub")
+        values, _ = get_cache_backend().read_many(
+            {CLAIMS_NAMESPACE: [digest], REVOCATIONS_NAMESPACE: _revocation_keys(digest, user_id)},
+            required=True,
+        )
+    except (JWTError, CacheUnavailable):
+        # Malformed, or the revocations cannot be read: the decode path decides and rejects it
+        values = None
+
+    raw = values[CLAIMS_NAMESPACE][0] if values else None
+    claims = json.loads(raw) if raw is not None else None
+
+    # Another worker may have revoked it after caching
+    if claims is None or _revoked(values[REVOCATIONS_NAMESPACE], claims):
+        _count("misses")
+        return None
+
+    _count("hits")
+    return claims
+
+
+def remember_claims(token: str, claims: dict):
+    """
+    Cache freshly verified claims until the TTL or the token's exp, whichever is first.
+    Returns False when the token has been revoked and must be rejected, and raises 503
+    when that cannot be checked.
+    """
+
+    digest = _digest(token)
+    try:
+        if _is_revoked(digest, claims):
+            return False
+    except CacheUnavailable:
+        raise _revocations_unavailable()
+
+    now = time.time()
+    ttl = min(TOKEN_CACHE_TTL_SECONDS, claims.get("exp", now) - now)
+    if ttl > 0:
+        get_cache_backend().set(CLAIMS_NAMESPACE, digest, json.dumps(claims).encode(), ttl)
+
+    return True
+
+
+def _revoke_token(token: str, claims: dict):
+    # Logout: reject this token until it would have expired anyway; raises 503 when that
+    # cannot be recorded, so the client never believes it logged out
+    digest = _digest(token)
+    backend = get_cache_backend()
+
+    ttl = claims.get("exp", time.time()) - time.time()
+    if ttl > 0:
+        try:
+            backend.set(REVOCATIONS_NAMESPACE, f"token:{digest}", b"1", ttl, required=True)
+        except CacheUnavailable:
+            raise _revocations_unavailable()
+
+    # Cached claims are checked against the revocation anyway
+    backend.delete(CLAIMS_NAMESPACE, digest)
+    _count("invalidations")
+
+
+def _invalidate_user_tokens(user_id):
+    # Role changes and account deletion: reject every token issued to the user so far.
+    # iat has whole seconds, so tokens issued in this same second are rejected too.
+    # Raises 503 when that cannot be recorded; call it before committing the change
+    try:
+        get_cache_backend().set(
+            REVOCATIONS_NAMESPACE, f"user:{user_id}", repr(time.time()).encode(), required=True
+        )
+    except CacheUnavailable:
+        raise _revocations_unavailable()
+    _count("invalidations")
+
+
+async def revoke_token(token: str, claims: dict):
+    await run_cache_io(_revoke_token, token, claims)
+
+
+async def invalidate_user_tokens(user_id):
+    await run_cache_io(_invalidate_user_tokens, user_id)
+
+
+def get_token_cache_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "max_size": TOKEN_CACHE_SIZE,
+            "ttl_seconds": TOKEN_CACHE_TTL_SECONDS,
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+            "invalidations": _stats["invalidations"],
+        }
@@ -0,0 +1,162 @@
+# References:
+# https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+# https://docs.python.org/3/library/asyncio-eventloop.html#asyncio.loop.run_in_executor
+# https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/503
+
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+
+
+# CPU-bound work (bcrypt) runs in separate processes so it neither holds the GIL
+# nor takes threadpool slots needed by the rest of the API
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", os.cpu_count() or 1))
+
+# Jobs allowed to be running or waiting at once; beyond this callers get 503
+WORKER_POOL_MAX_PENDING = int(os.getenv("WORKER_POOL_MAX_PENDING", WORKER_POOL_SIZE * 8))
+
+# Image rendering has its own processes and queue, so a burst of new variants never delays logins
+IMAGE_POOL_SIZE = int(os.getenv("IMAGE_POOL_SIZE", max(1, (os.cpu_count() or 1) // 2)))
+IMAGE_POOL_MAX_PENDING = int(os.getenv("IMAGE_POOL_MAX_PENDING", IMAGE_POOL_SIZE * 4))
+
+# Workers start from a clean server process (forkserver, or spawn where it is unavailable) rather
+# than forking the running event loop, its threads and open database connections
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _noop():
+    pass
+
+
+class WorkerPool:
+    # A process pool with a bound on queued jobs and its own metrics
+
+    def __init__(self, size: int, max_pending: int):
+        self.size = size
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "total_run_ms": 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.size, mp_context=_MP_CONTEXT)
+            return self._executor
+
+    async def warm_up(self):
+        # The executor starts processes on demand, one per job while none is idle, so one no-op
+        # per worker is what actually starts them. Not counted in stats
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _noop) for _ in range(self.size)))
+
+    async def run(self, func, *args):
+        """
+        Run func(*args) in the process pool and await the result.
+        func and its arguments must be picklable (a module-level function).
+        Raises 503 when the queue is full instead of letting requests pile up.
+        """
+
+        with self._lock:
+            if self._stats["in_flight"] >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._stats["submitted"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._stats["in_flight"])
+
+        started = time.perf_counter()
+        try:
+            # Lazy start for scripts and tests that never run the lifespan
+            result = await asyncio.get_running_loop().run_in_executor(self.start(), func, *args)
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                self._stats["total_run_ms"] += (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self._stats["completed"] += 1
+
+        return result
+
+    def stats(self):
+        with self._lock:
+            finished = self._stats["completed"] + self._stats["failed"]
+            return {
+                "workers": self.size,
+                "max_pending": self.max_pending,
+                "submitted": self._stats["submitted"],
+                "completed": self._stats["completed"],
+                "failed": self._stats["failed"],
+                "rejected": self._stats["rejected"],
+                "in_flight": self._stats["in_flight"],
+                "peak_in_flight": self._stats["peak_in_flight"],
+                "average_run_ms": round(self._stats["total_run_ms"] / finished, 2) if finished else 0.0,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Password hashing and verification
+password_pool = WorkerPool(WORKER_POOL_SIZE, WORKER_POOL_MAX_PENDING)
+
+# Resizing and re-encoding image variants
+image_pool = WorkerPool(IMAGE_POOL_SIZE, IMAGE_POOL_MAX_PENDING)
+
+
+async def run_in_worker_pool(func, *args):
+    # Password hashing pool, see WorkerPool.run
+    return await password_pool.run(func, *args)
+
+
+async def run_in_image_pool(func, *args):
+    # Image rendering pool, see WorkerPool.run
+    return await image_pool.run(func, *args)
+
+
+def get_worker_pool_stats():
+    return password_pool.stats()
+
+
+def get_image_pool_stats():
+    return image_pool.stats()
+
+
+async def start_worker_pools():
+    # Called on startup so the first login or variant does not wait for worker processes to start
+    await asyncio.gather(password_pool.warm_up(), image_pool.warm_up())
+
+
+def shutdown_worker_pools():
+    password_pool.shutdown()
+    image_pool.shutdown()
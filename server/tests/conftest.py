@@ -2,6 +2,7 @@
 # https://noplacelikelocalhost.medium.com/testing-crud-operations-with-sqlite-a-time-saving-guide-for-developers-7c74405d63d5
 # Dependencies & Overrides: https://fastapi.tiangolo.com/advanced/testing-dependencies/#use-the-app-dependency-overrides-attribute
 # SQLite: https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#threading-pooling-behavior
+# Async engine: https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html#using-multiple-asyncio-event-loops
 # Pytest - Fixtures: https://docs.pytest.org/en/stable/how-to/fixtures.html
 # Pytest - Fixture scopes: https://docs.pytest.org/en/stable/how-to/fixtures.html#fixture-scopes
 
@@ -9,10 +10,14 @@
 import pytest
 from datetime import datetime
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from app.main import app
-from app.db.database import Base, get_db
+from app.db.database import Base, get_async_db, get_async_session_factory
+from app.db.migration import run_migrations
+from app.db.table_version import VersionedAsyncSession
 from app.models.enums import UserType
 from app.models.user import User
 from app.utils.auth_util import hash_password
@@ -29,31 +34,43 @@ engine = create_engine(
 )
 
 # create a db session
-# this will be used instead of the real database
+# used by fixtures that set up data outside of requests
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
 )
 
-# override get_db dependency
+# async engine on the same file for the endpoints
+# NullPool because TestClient may run each request on a different event loop
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db",
+    poolclass=NullPool,
+)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=VersionedAsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# override get_async_db dependency
 # use the test database instead of the real database
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-# tell FastAPI to use override_get_db during tests
-app.dependency_overrides[get_db] = override_get_db
+# tell FastAPI to use override_get_async_db during tests
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
 
 
 # create & drops tables for testing
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
-    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
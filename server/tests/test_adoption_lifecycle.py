@@ -37,7 +37,7 @@ def create_animal(client, headers, animal_data):
         ),
         "animal_image": (
             "dog.jpg",
-            io.BytesIO(b"fake-image-content"),
+            io.BytesIO(b"\xff\xd8\xff\xe0fake-image-content"),
             "image/jpeg",
         ),
     }
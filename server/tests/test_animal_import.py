@@ -0,0 +1,109 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.python.org/3/library/zipfile.html#zipfile.ZipFile.writestr
+
+
+import io
+import json
+import zipfile
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+def _zip(files: dict):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+IMAGES = _zip({
+    "images/rex.jpg": b"\xff\xd8\xff\xe0rex-image-content",
+    "bella.png": b"\x89PNG\r\n\x1a\nbella-image-content",
+    "notes.jpg": b"not an image at all",
+})
+
+
+# TEST 1: A CSV manifest imports new rows and reports every other row
+def test_import_csv_manifest(client, test_admin):
+    headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    create_animal(
+        client,
+        headers,
+        {
+            "name": "Import Existing",
+            "species": "Dog",
+            "breed": "Husky",
+            "gender": "Male",
+            "adoption_status": "Available",
+        },
+    )
+    before = client.post("/dashboard-management/dashboard/reconcile", headers=headers).json()["data"]
+
+    manifest = (
+        "name,species,breed,age,gender,description,image\n"
+        "Import Rex,Dog,Labrador,3,Male,Friendly,rex.jpg\n"
+        "Import Bella,Cat,Siamese,,Female,,bella.png\n"
+        "Import Rex Twin,Dog,Labrador,2,Male,,rex.jpg\n"
+        "Import Existing,Dog,Husky,4,Male,,rex.jpg\n"
+        "Import Rex,Dog,Labrador,3,Male,Repeated row,rex.jpg\n"
+        "Import No Gender,Dog,Pug,1,,,rex.jpg\n"
+        "Import Missing,Dog,Pug,1,Male,,missing.jpg\n"
+        "Import Bad Image,Dog,Pug,1,Male,,notes.jpg\n"
+    )
+    res = client.post(
+        "/animal-management/animals/import",
+        headers=headers,
+        files={
+            "manifest": ("intake.csv", manifest.encode(), "text/csv"),
+            "images": ("images.zip", IMAGES, "application/zip"),
+        },
+    )
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert [entry["status"] for entry in data["rows"]] == [
+        "created", "created", "created", "duplicate", "duplicate", "invalid", "invalid", "invalid",
+    ]
+    assert (data["created"], data["duplicates"], data["invalid"]) == (3, 2, 3)
+    assert "gender" in data["rows"][5]["detail"]
+
+    rex = client.get(f"/animal-management/animals/{data['rows'][0]['id']}", headers=headers).json()["data"]
+    twin = client.get(f"/animal-management/animals/{data['rows'][2]['id']}", headers=headers).json()["data"]
+    assert rex["description"] == "Friendly"
+    assert rex["photo_url"] == twin["photo_url"]
+
+    # New rows show up in listings and on the dashboard
+    res = client.get("/animal-management/animals?search=Import Bella", headers=headers)
+    assert [animal["name"] for animal in res.json()["data"]["animals"]] == ["Import Bella"]
+    summary = client.get("/dashboard-management/dashboard/summary", headers=headers).json()["data"]
+    assert summary["total_animals"] == before["total_animals"] + 3
+
+
+# TEST 2: NDJSON manifests report lines that are not JSON objects
+def test_import_ndjson_manifest(client, test_admin):
+    headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    lines = [
+        json.dumps({"name": "Import Luna", "species": "Cat", "breed": "Bengal", "gender": "Female", "image": "bella.png"}),
+        "{not json",
+        "",
+        json.dumps(["not", "an", "object"]),
+    ]
+    res = client.post(
+        "/animal-management/animals/import",
+        headers=headers,
+        files={
+            "manifest": ("intake.ndjson", "\n".join(lines).encode(), "application/x-ndjson"),
+            "images": ("images.zip", IMAGES, "application/zip"),
+        },
+    )
+    assert res.status_code == 200
+    assert [(entry["row"], entry["status"]) for entry in res.json()["data"]["rows"]] == [
+        (1, "created"), (2, "invalid"), (3, "invalid"),
+    ]
+
+    res = client.post(
+        "/animal-management/animals/import",
+        headers=headers,
+        files={"manifest": ("intake.xlsx", b"", "application/octet-stream")},
+    )
+    assert res.status_code == 400
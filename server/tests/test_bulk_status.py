@@ -0,0 +1,165 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.sqlalchemy.org/en/20/core/events.html#sqlalchemy.events.ConnectionEvents.before_cursor_execute
+
+
+from contextlib import contextmanager
+from sqlalchemy import event
+from tests.conftest import async_engine, create_test_user
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+@contextmanager
+def count_statements():
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _animal(client, headers, name):
+    return create_animal(
+        client,
+        headers,
+        {
+            "name": name,
+            "species": "Dog",
+            "breed": "Beagle",
+            "age": 2,
+            "gender": "Male",
+            "description": "Dog for bulk status test",
+            "adoption_status": "Available",
+        },
+    )
+
+
+# TEST 1: One request approves many applications and reports every id
+def test_bulk_status_change(client, test_admin, test_adopter):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    adopter_headers = login_user(client, test_adopter["email"], test_adopter["password"], role="adopter")
+    other = create_test_user(
+        name="Bulk Status Adopter",
+        email="bulk.status@gmail.com",
+        phone="0933333333",
+        address="Cork",
+        password="Adopter@123",
+        role="Adopter",
+    )
+    other_headers = login_user(client, other["email"], other["password"], role="adopter")
+
+    animal_ids = [_animal(client, admin_headers, f"Bulk Pet {i}") for i in range(4)]
+    application_ids = [
+        client.post("/application-management/applications", headers=adopter_headers, json={"animal_id": animal_id}).json()["data"]["id"]
+        for animal_id in animal_ids
+    ]
+    # Second application for the first animal
+    competing_id = client.post(
+        "/application-management/applications", headers=other_headers, json={"animal_id": animal_ids[0]}
+    ).json()["data"]["id"]
+
+    # Already completed before the bulk change
+    rejected_id = application_ids.pop()
+    res = client.patch(
+        f"/application-management/applications/{rejected_id}/status",
+        headers=admin_headers,
+        json={"application_status": "Rejected"},
+    )
+    assert res.status_code == 204
+
+    with count_statements() as statements:
+        res = client.patch(
+            "/application-management/applications/status",
+            headers=admin_headers,
+            json={
+                "application_ids": application_ids + [competing_id, rejected_id, 999999],
+                "application_status": "Approved",
+            },
+        )
+    assert res.status_code == 200
+    data = res.json()["data"]
+    outcomes = {result["id"]: result["outcome"] for result in data["results"]}
+
+    assert data["updated"] == 3
+    assert data["auto_rejected"] == 1
+    assert res.headers["x-auto-rejected-count"] == "1"
+    assert outcomes == {
+        **{application_id: "updated" for application_id in application_ids},
+        competing_id: "auto_rejected",
+        rejected_id: "completed",
+        999999: "not_found",
+    }
+    assert statements.count("UPDATE") <= 5    # approvals, animals, cascade, dashboard counters twice
+
+    for animal_id in animal_ids[:3]:
+        res = client.get(f"/animal-management/animals/{animal_id}", headers=admin_headers)
+        assert res.json()["data"]["adoption_status"] == "Adopted"
+
+    # Counters moved with the bulk change, so reconciling finds nothing to correct
+    summary = client.get("/dashboard-management/dashboard/summary", headers=admin_headers).json()["data"]
+    reconciled = client.post("/dashboard-management/dashboard/reconcile", headers=admin_headers).json()["data"]
+    assert summary["total_approved_applications"] == reconciled["total_approved_applications"]
+    assert summary["total_pending_applications"] == reconciled["total_pending_applications"]
+
+
+# TEST 2: Only admins can change statuses in bulk
+def test_bulk_status_requires_admin(client, test_adopter):
+    adopter_headers = login_user(client, test_adopter["email"], test_adopter["password"], role="adopter")
+
+    res = client.patch(
+        "/application-management/applications/status",
+        headers=adopter_headers,
+        json={"application_ids": [1], "application_status": "Rejected"},
+    )
+    assert res.status_code == 403
+
+
+# TEST 3: Approving one application rejects the other open ones for the same animal
+def test_approval_rejects_competing_applications(client, test_admin, test_adopter):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    adopter_headers = login_user(client, test_adopter["email"], test_adopter["password"], role="adopter")
+    others = [
+        create_test_user(
+            name=f"Cascade Adopter {i}",
+            email=f"cascade.{i}@gmail.com",
+            phone=f"094444444{i}",
+            address="Limerick",
+            password="Adopter@123",
+            role="Adopter",
+        )
+        for i in range(2)
+    ]
+
+    animal_id = _animal(client, admin_headers, "Cascade Pet")
+    approved_id = client.post(
+        "/application-management/applications", headers=adopter_headers, json={"animal_id": animal_id}
+    ).json()["data"]["id"]
+    competing_ids = []
+    for other in others:
+        other_headers = login_user(client, other["email"], other["password"], role="adopter")
+        res = client.post("/application-management/applications", headers=other_headers, json={"animal_id": animal_id})
+        competing_ids.append(res.json()["data"]["id"])
+
+    # Cached before the cascade, must not be served stale after it
+    client.get(f"/application-management/applications/{competing_ids[0]}", headers=admin_headers)
+
+    res = client.patch(
+        f"/application-management/applications/{approved_id}/status",
+        headers=admin_headers,
+        json={"application_status": "Approved"},
+    )
+    assert res.status_code == 204
+    assert res.headers["x-auto-rejected-count"] == "2"
+
+    for application_id in competing_ids:
+        res = client.get(f"/application-management/applications/{application_id}", headers=admin_headers)
+        assert res.json()["data"]["status"] == "Rejected"
+        assert res.json()["data"]["updated_by"] == "Admin"
+
+    summary = client.get("/dashboard-management/dashboard/summary", headers=admin_headers).json()["data"]
+    reconciled = client.post("/dashboard-management/dashboard/reconcile", headers=admin_headers).json()["data"]
+    assert summary["total_pending_applications"] == reconciled["total_pending_applications"]
+    assert summary["total_rejected_applications"] == reconciled["total_rejected_applications"]
@@ -0,0 +1,351 @@
+# References:
+# https://redis.io/docs/latest/develop/reference/protocol-spec/
+# https://docs.python.org/3/library/socketserver.html#asynchronous-mixins
+# https://docs.pytest.org/en/stable/how-to/parametrize.html
+
+
+import asyncio
+import socketserver
+import threading
+import time
+import pytest
+from app.utils.cache_backend_util import (
+    CacheBackend,
+    CacheUnavailable,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    configure_namespace,
+    set_cache_backend,
+)
+from app.utils.listing_cache_util import get_listing_cache_stats
+from app.utils.token_cache_util import get_cached_claims, get_token_cache_stats
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    # Just the commands the cache backend sends, keyed like a single Redis database
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        parts = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            parts.append(self.rfile.read(length + 2)[:-2])
+        return parts
+
+    def _write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self._write(item)
+        elif value == "OK":
+            self.wfile.write(b"+OK\r\n")
+        elif isinstance(value, Exception):
+            self.wfile.write(b"-ERR %s\r\n" % str(value).encode())
+        else:
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def handle(self):
+        while (command := self._read_command()) is not None:
+            with self.server.lock:
+                self._write(self.server.run(command))
+
+
+class RespStandInServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.lock = threading.Lock()
+        self.data = {}      # key -> (expires_at, value)
+        self.fail = set()   # command names answered with an error, e.g. {b"SET"}
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def _get(self, key):
+        expires_at, value = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def run(self, command):
+        name, args = command[0].upper(), command[1:]
+
+        if name in self.fail:
+            return RuntimeError(f"{name.decode()} failed")
+        if name in (b"SELECT", b"AUTH"):
+            return "OK"
+        if name == b"GET":
+            return self._get(args[0])
+        if name == b"MGET":
+            return [self._get(key) for key in args]
+        if name == b"SET":
+            options = [arg.upper() for arg in args[2:]]
+            if b"NX" in options and self._get(args[0]) is not None:
+                return None
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            self.data[args[0]] = (expires_at, args[1])
+            return "OK"
+        if name == b"DEL":
+            return sum(self.data.pop(key, None) is not None for key in args)
+        if name == b"INCR":
+            count = int(self._get(args[0]) or 0) + 1
+            self.data[args[0]] = (self.data.get(args[0], (None, None))[0], str(count).encode())
+            return count
+        if name == b"PEXPIRE":
+            if self._get(args[0]) is None:
+                return 0
+            self.data[args[0]] = (time.monotonic() + int(args[1]) / 1000, self.data[args[0]][1])
+            return 1
+
+        raise AssertionError(f"Unexpected command {command}")
+
+
+@pytest.fixture()
+def resp_server():
+    server = RespStandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryCacheBackend()
+    return RedisCacheBackend(request.getfixturevalue("resp_server").url)
+
+
+# TEST 1: Both implementations behave the same
+def test_backend_contract(backend):
+    configure_namespace("test_contract", ttl=0.2)
+
+    backend.set_many("test_contract", {"a": b"1", "b": b"2"})
+    backend.set("test_contract", "c", b"3", ttl=60)
+    assert backend.get_many("test_contract", ["a", "b", "c", "missing"]) == [b"1", b"2", b"3", None]
+    assert backend.get("other_namespace", "a") is None
+
+    assert backend.add("test_contract", "a", b"new") == b"1"
+    assert backend.add("test_contract", "d", b"4") == b"4"
+    backend.delete("test_contract", "d")
+    assert backend.get("test_contract", "d") is None
+
+    assert backend.incr("test_contract", "counter") == 1
+    assert backend.incr("test_contract", "counter") == 2
+    assert backend.get_counters("test_contract", ["counter", "unused"]) == [2, 0]
+    assert backend.read_many({"test_contract": ["c", "missing"], "other_namespace": ["a"]}, {"test_contract": ["counter"]}) == (
+        {"test_contract": [b"3", None], "other_namespace": [None]},
+        {"test_contract": [2]},
+    )
+
+    # Values go, counters stay
+    backend.clear_namespace("test_contract")
+    assert backend.get_many("test_contract", ["a", "c"]) == [None, None]
+    assert backend.get_counters("test_contract", ["counter"]) == [2]
+    assert backend.add("test_contract", "a", b"fresh") == b"fresh"
+
+    # Namespace TTL applies when set() is given none
+    backend.set("test_contract", "short", b"x")
+    time.sleep(0.3)
+    assert backend.get("test_contract", "short") is None
+    assert backend.get("test_contract", "c") is None
+
+
+# TEST 2: The memory backend keeps each namespace within its limits, least recently used out first
+def test_memory_backend_limits():
+    configure_namespace("test_limits", max_entries=2)
+    configure_namespace("test_bytes", max_bytes=10)
+    backend = MemoryCacheBackend()
+
+    backend.set("test_limits", "a", b"1")
+    backend.set("test_limits", "b", b"2")
+    backend.get("test_limits", "a")
+    backend.set("test_limits", "c", b"3")
+    assert backend.get_many("test_limits", ["a", "b", "c"]) == [b"1", None, b"3"]
+
+    backend.set("test_bytes", "a", b"123456")
+    backend.set("test_bytes", "b", b"123456")
+    assert backend.get_many("test_bytes", ["a", "b"]) == [None, b"123456"]
+    assert backend.stats()["test_bytes"]["evictions"] == 1
+
+
+# TEST 3: An unreachable server makes every cache miss instead of failing requests, except required calls
+def test_unreachable_server_fails_open():
+    backend = RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.1)
+
+    backend.set("test_down", "a", b"1")
+    assert backend.get_many("test_down", ["a", "b"]) == [None, None]
+    assert backend.stats()["errors"] >= 2
+
+    with pytest.raises(CacheUnavailable):
+        backend.get_many("test_down", ["a"], required=True)
+    with pytest.raises(CacheUnavailable):
+        backend.set("test_down", "a", b"1", required=True)
+
+
+# TEST 4: Two workers on one server share cached claims, revocations and listing pages
+def test_workers_share_caches(client, test_admin, resp_server):
+    worker_a = RedisCacheBackend(resp_server.url)
+    worker_b = RedisCacheBackend(resp_server.url)
+    previous = set_cache_backend(worker_a)
+    try:
+        headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+        url = "/animal-management/animals?limit=7"
+        assert client.get(url, headers=headers).status_code == 200
+
+        set_cache_backend(worker_b)
+        tokens_before = get_token_cache_stats()
+        listings_before = get_listing_cache_stats()
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200
+        assert get_token_cache_stats()["hits"] == tokens_before["hits"] + 1
+        assert get_listing_cache_stats()["hits"] == listings_before["hits"] + 1
+
+        # ETags agree because the table versions are shared too
+        set_cache_backend(worker_a)
+        res = client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]})
+        assert res.status_code == 304
+
+        # Logged out on one worker, rejected by the other
+        assert client.post("/auth/logout", headers=headers).status_code == 204
+        set_cache_backend(worker_b)
+        assert client.get(url, headers=headers).status_code == 401
+    finally:
+        set_cache_backend(previous)
+
+
+class _RevocationWritesFail(MemoryCacheBackend):
+    def set_many(self, namespace, items, ttl=None, required=False):
+        if required:
+            raise CacheUnavailable("down")
+        super().set_many(namespace, items, ttl, required)
+
+
+# TEST 5: Revocations fail closed: tokens are rejected and logout reports 503 when they cannot be reached
+def test_revocations_fail_closed(client, test_admin):
+    headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    url = "/animal-management/animals?limit=3"
+
+    previous = set_cache_backend(RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.1))
+    try:
+        res = client.get(url, headers=headers)
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "1"
+
+        set_cache_backend(_RevocationWritesFail())
+        assert client.post("/auth/logout", headers=headers).status_code == 503
+        assert client.get(url, headers=headers).status_code == 200
+    finally:
+        set_cache_backend(previous)
+
+
+class _RecordingBackend(RedisCacheBackend):
+    # Counts round trips and notes any made from a thread running an event loop
+
+    def __init__(self, url):
+        super().__init__(url)
+        self.round_trips = 0
+        self.on_event_loop = 0
+
+    def _execute(self, commands, required=False):
+        self.round_trips += 1
+        try:
+            asyncio.get_running_loop()
+            self.on_event_loop += 1
+        except RuntimeError:
+            pass
+        return super()._execute(commands, required)
+
+
+# TEST 6: A network backend is never called on the event loop, and a cached token costs one round trip
+def test_network_backend_off_event_loop(client, test_admin, resp_server):
+    backend = _RecordingBackend(resp_server.url)
+    previous = set_cache_backend(backend)
+    try:
+        headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+        animal_id = create_animal(
+            client,
+            headers,
+            {
+                "name": "Off Loop Dog",
+                "species": "Dog",
+                "breed": "Pug",
+                "gender": "Male",
+                "adoption_status": "Available",
+            },
+        )
+        assert client.get("/animal-management/animals?limit=3", headers=headers).status_code == 200
+        assert client.get(f"/animal-management/animals/{animal_id}", headers=headers).status_code == 200
+        assert client.post("/auth/logout", headers=headers).status_code == 204
+        assert backend.on_event_loop == 0
+
+        # Claims and both revocations in one pipeline
+        token = login_user(client, test_admin["email"], test_admin["password"], role="admin")["Authorization"].split()[1]
+        assert client.get("/animal-management/animals?limit=3", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        before = backend.round_trips
+        assert get_cached_claims(token) is not None
+        assert backend.round_trips == before + 1
+    finally:
+        set_cache_backend(previous)
+
+
+# TEST 7: A version bump the server drops leaves the table's version unknown, never a stale 304
+def test_dropped_bump_no_stale_not_modified(client, test_admin, resp_server):
+    previous = set_cache_backend(RedisCacheBackend(resp_server.url))
+    try:
+        headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+        url = "/animal-management/animals?limit=50"
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200
+        assert client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]}).status_code == 304
+
+        resp_server.fail = {b"SET"}
+        try:
+            create_animal(
+                client,
+                headers,
+                {
+                    "name": "Dropped Bump Dog",
+                    "species": "Dog",
+                    "breed": "Pug",
+                    "gender": "Male",
+                    "adoption_status": "Available",
+                },
+            )
+        finally:
+            resp_server.fail = set()
+
+        res = client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]})
+        assert res.status_code == 200
+        assert "Dropped Bump Dog" in res.text
+
+        # The bump is retried once the server answers, and revalidation works again
+        current = client.get(url, headers=headers)
+        assert client.get(url, headers={**headers, "If-None-Match": current.headers["etag"]}).status_code == 304
+    finally:
+        set_cache_backend(previous)
+
+
+class _ReadOnlyBackend(CacheBackend):
+    def get_many(self, namespace, keys, required=False):
+        return [None] * len(keys)
+
+
+# TEST 8: An incomplete backend is rejected when it is created, not on its first write
+def test_incomplete_backend_rejected():
+    with pytest.raises(TypeError):
+        _ReadOnlyBackend()
@@ -0,0 +1,88 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Conditional_requests
+
+
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: Catalog reads answer 304 until an animal is written
+def test_animal_reads_revalidate(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Etag Dog",
+            "species": "Dog",
+            "breed": "Beagle",
+            "age": 4,
+            "gender": "Male",
+            "description": "Dog for conditional GET test",
+            "adoption_status": "Available",
+        },
+    )
+
+    for url in ["/animal-management/animals?limit=5", f"/animal-management/animals/{animal_id}"]:
+        res = client.get(url, headers=admin_headers)
+        assert res.status_code == 200
+        etag = res.headers["etag"]
+
+        res = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert res.status_code == 304
+
+    # Different query parameters are a different representation
+    res = client.get("/animal-management/animals?limit=6", headers={**admin_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+
+    client.put(
+        f"/animal-management/animals/{animal_id}",
+        headers=admin_headers,
+        files={"request_data": (None, '{"age": 5}', "application/json")},
+    )
+    res = client.get(f"/animal-management/animals/{animal_id}", headers={**admin_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["data"]["age"] == 5
+
+
+# TEST 2: Application ETags are per caller and follow status changes
+def test_application_read_revalidates(client, test_admin, test_adopter):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    adopter_headers = login_user(client, test_adopter["email"], test_adopter["password"], role="adopter")
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Etag Cat",
+            "species": "Cat",
+            "breed": "Siamese",
+            "age": 2,
+            "gender": "Female",
+            "description": "Cat for conditional GET test",
+            "adoption_status": "Available",
+        },
+    )
+    application_id = client.post(
+        "/application-management/applications",
+        headers=adopter_headers,
+        json={"animal_id": animal_id, "reason": "Polling"},
+    ).json()["data"]["id"]
+    url = f"/application-management/applications/{application_id}"
+
+    adopter_etag = client.get(url, headers=adopter_headers).headers["etag"]
+    admin_etag = client.get(url, headers=admin_headers).headers["etag"]
+    assert adopter_etag != admin_etag
+    assert client.get(url, headers={**adopter_headers, "If-None-Match": adopter_etag}).status_code == 304
+
+    client.patch(f"{url}/status", headers=admin_headers, json={"application_status": "Rejected"})
+    res = client.get(url, headers={**adopter_headers, "If-None-Match": adopter_etag})
+    assert res.status_code == 200
+    assert res.json()["data"]["status"] == "Rejected"
+
+
+# TEST 3: If-None-Match: * never hides a missing resource
+def test_wildcard_does_not_hide_missing(client, test_admin):
+    admin_headers = {**login_user(client, test_admin["email"], test_admin["password"], role="admin"), "If-None-Match": "*"}
+
+    assert client.get("/animal-management/animals/999999", headers=admin_headers).status_code == 404
+    assert client.get("/application-management/applications/999999", headers=admin_headers).status_code == 404
@@ -0,0 +1,130 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.pytest.org/en/stable/how-to/assert.html
+
+
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: Write paths keep the dashboard counters in step with the data
+def test_dashboard_counters_follow_writes(client, test_admin, test_adopter):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+    adopter_headers = login_user(
+        client,
+        test_adopter["email"],
+        test_adopter["password"],
+        role="adopter",
+    )
+
+    # Test fixtures insert users directly, so start from reconciled counters
+    res = client.post("/dashboard-management/dashboard/reconcile", headers=admin_headers)
+    assert res.status_code == 200
+    before = res.json()["data"]
+
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Counter Dog",
+            "species": "Dog",
+            "breed": "Poodle",
+            "age": 3,
+            "gender": "Female",
+            "description": "Dog for dashboard test",
+            "adoption_status": "Available",
+        },
+    )
+
+    app_res = client.post(
+        "/application-management/applications",
+        headers=adopter_headers,
+        json={"animal_id": animal_id, "reason": "Counting"},
+    )
+    assert app_res.status_code == 201
+
+    reject_res = client.patch(
+        f"/application-management/applications/{app_res.json()['data']['id']}/status",
+        headers=admin_headers,
+        json={"application_status": "Rejected"},
+    )
+    assert reject_res.status_code == 204
+
+    after = client.get("/dashboard-management/dashboard/summary", headers=admin_headers).json()["data"]
+
+    assert after["total_animals"] == before["total_animals"] + 1
+    assert after["total_pending_applications"] == before["total_pending_applications"]
+    assert after["total_rejected_applications"] == before["total_rejected_applications"] + 1
+
+    # A full recount agrees with the incrementally maintained counters
+    recount = client.post("/dashboard-management/dashboard/reconcile", headers=admin_headers).json()["data"]
+    assert recount == after
+
+
+# TEST 2: Daily rollups follow the application write paths and match a backfill
+def test_adoption_statistics_rollup(client, test_admin, test_adopter):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+    adopter_headers = login_user(
+        client,
+        test_adopter["email"],
+        test_adopter["password"],
+        role="adopter",
+    )
+
+    def today_stats():
+        res = client.get("/dashboard-management/dashboard/statistics", headers=admin_headers)
+        assert res.status_code == 200
+        return res.json()["data"]["series"][-1]
+
+    before = today_stats()
+
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Stats Dog",
+            "species": "Dog",
+            "breed": "Collie",
+            "age": 2,
+            "gender": "Male",
+            "description": "Dog for statistics test",
+            "adoption_status": "Available",
+        },
+    )
+    app_res = client.post(
+        "/application-management/applications",
+        headers=adopter_headers,
+        json={"animal_id": animal_id, "reason": "Trends"},
+    )
+    client.patch(
+        f"/application-management/applications/{app_res.json()['data']['id']}/status",
+        headers=admin_headers,
+        json={"application_status": "Approved"},
+    )
+
+    after = today_stats()
+    assert after["animals_intake"] == before["animals_intake"] + 1
+    assert after["applications_submitted"] == before["applications_submitted"] + 1
+    assert after["applications_approved"] == before["applications_approved"] + 1
+    assert after["animals_adopted"] == before["animals_adopted"] + 1
+
+    # Rebuilding from the source tables gives the same rollup
+    backfill_res = client.post("/dashboard-management/dashboard/statistics/backfill", headers=admin_headers)
+    assert backfill_res.status_code == 200
+    assert today_stats() == after
+
+    weekly = client.get(
+        "/dashboard-management/dashboard/statistics",
+        headers=admin_headers,
+        params={"granularity": "week"},
+    ).json()["data"]["series"]
+    assert sum(week["animals_intake"] for week in weekly) >= after["animals_intake"]
@@ -0,0 +1,86 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.pytest.org/en/stable/how-to/monkeypatch.html
+
+
+import asyncio
+from app.utils.entity_cache_util import cache_entity, entity_generation, get_cached_entity, get_entity_cache_stats, invalidate_entity
+from tests.conftest import create_test_user
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+def _hits(kind):
+    return get_entity_cache_stats()["kinds"].get(kind, {}).get("hits", 0)
+
+
+# TEST 1: Repeated detail reads are served from the cache until the animal is written
+def test_animal_detail_cached_until_write(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Cached Dog",
+            "species": "Dog",
+            "breed": "Corgi",
+            "age": 3,
+            "gender": "Male",
+            "description": "Dog for entity cache test",
+            "adoption_status": "Available",
+        },
+    )
+
+    first = client.get(f"/animal-management/animals/{animal_id}", headers=admin_headers)
+    hits = _hits("animal")
+    second = client.get(f"/animal-management/animals/{animal_id}", headers=admin_headers)
+    assert second.json()["data"] == first.json()["data"]
+    assert _hits("animal") == hits + 1
+
+    client.put(
+        f"/animal-management/animals/{animal_id}",
+        headers=admin_headers,
+        files={"request_data": (None, '{"age": 4}', "application/json")},
+    )
+    res = client.get(f"/animal-management/animals/{animal_id}", headers=admin_headers)
+    assert res.json()["data"]["age"] == 4
+
+
+# TEST 2: Profile updates are visible on the next read
+def test_user_detail_invalidated_on_update(client):
+    adopter = create_test_user(
+        name="Cache Adopter",
+        email="cache.adopter@gmail.com",
+        phone="0911111111",
+        address="Cork",
+        password="Adopter@123",
+        role="Adopter",
+    )
+    headers = login_user(client, adopter["email"], adopter["password"], role="adopter")
+
+    res = client.get(f"/user-management/adopters/{adopter['id']}", headers=headers)
+    assert res.json()["data"]["name"] == "Cache Adopter"
+
+    res = client.put(f"/user-management/adopters/{adopter['id']}", headers=headers, json={"name": "Renamed Adopter"})
+    assert res.status_code == 204
+
+    res = client.get(f"/user-management/adopters/{adopter['id']}", headers=headers)
+    assert res.json()["data"]["name"] == "Renamed Adopter"
+
+    res = client.get("/user-management/current-user", headers=headers)
+    assert res.json()["data"]["name"] == "Renamed Adopter"
+
+
+# TEST 3: Data read before an invalidation is not cached after it
+def test_stale_read_not_cached():
+    async def stale_then_fresh():
+        generation = await entity_generation("animal", -1)
+        await invalidate_entity("animal", -1)
+        await cache_entity("animal", -1, {"id": -1}, generation)
+        stale, generation = await get_cached_entity("animal", -1)
+        assert stale is None
+
+        await cache_entity("animal", -1, {"id": -1}, generation)
+        fresh, _ = await get_cached_entity("animal", -1)
+        assert fresh == {"id": -1}
+
+    asyncio.run(stale_then_fresh())
@@ -0,0 +1,105 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.python.org/3/library/csv.html#csv.DictReader
+
+
+import asyncio
+import csv
+import io
+import json
+from sqlalchemy import select
+from app.models import Animal
+from app.utils import export_util
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+def _create_export_animals(client, headers):
+    for i, gender in enumerate(["Male", "Female", "Female"]):
+        create_animal(
+            client,
+            headers,
+            {
+                "name": f"Export Pet {i}",
+                "species": "Rabbit",
+                "breed": "Lop",
+                "gender": gender,
+                "description": "Rabbit, for export test",
+                "adoption_status": "Available",
+            },
+        )
+
+
+# TEST 1: Exports apply the listing filters and stream CSV or NDJSON
+def test_export_animals_and_applications(client, test_admin, test_adopter):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    adopter_headers = login_user(client, test_adopter["email"], test_adopter["password"], role="adopter")
+    _create_export_animals(client, admin_headers)
+
+    res = client.get(
+        "/animal-management/animals/export?search=Export Pet&gender=Female&fields=name,adoption_status",
+        headers=admin_headers,
+    )
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert 'filename="animals.csv"' in res.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [row["name"] for row in rows] == ["Export Pet 1", "Export Pet 2"]
+    assert set(rows[0]) == {"id", "name", "adoption_status"}
+    assert rows[0]["adoption_status"] == "Available"
+
+    res = client.get("/animal-management/animals/export?search=Export Pet&format=ndjson", headers=admin_headers)
+    animals = [json.loads(line) for line in res.text.splitlines()]
+    assert len(animals) == 3
+    assert animals[0]["description"] == "Rabbit, for export test"
+
+    # Text that a spreadsheet would run as a formula is escaped in CSV only
+    create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "=HYPERLINK(\"http://example.com\")",
+            "species": "Rabbit",
+            "breed": "Lop",
+            "gender": "Male",
+            "description": "@SUM(1+1)",
+            "adoption_status": "Available",
+        },
+    )
+    res = client.get("/animal-management/animals/export?search=HYPERLINK&fields=name,description", headers=admin_headers)
+    row = next(csv.DictReader(io.StringIO(res.text)))
+    assert (row["name"], row["description"]) == ("'=HYPERLINK(\"http://example.com\")", "'@SUM(1+1)")
+    res = client.get("/animal-management/animals/export?search=HYPERLINK&format=ndjson", headers=admin_headers)
+    assert json.loads(res.text)["description"] == "@SUM(1+1)"
+
+    animal_id = animals[0]["id"]
+    client.post("/application-management/applications", headers=adopter_headers, json={"animal_id": animal_id})
+    res = client.get(
+        "/application-management/applications/export?format=ndjson&application_status=Submitted",
+        headers=admin_headers,
+    )
+    applications = [json.loads(line) for line in res.text.splitlines()]
+    assert applications and all(application["status"] == "Submitted" for application in applications)
+    assert any(application["animal_id"] == animal_id for application in applications)
+
+    res = client.get("/user-management/adopters/export", headers=admin_headers)
+    assert test_adopter["email"] in [row["email"] for row in csv.DictReader(io.StringIO(res.text))]
+
+    # Admin only
+    res = client.get("/animal-management/animals/export", headers=adopter_headers)
+    assert res.status_code == 403
+
+
+# TEST 2: Rows are fetched and sent one batch at a time
+def test_export_streams_in_batches(monkeypatch):
+    monkeypatch.setattr(export_util, "EXPORT_BATCH_ROWS", 2)
+
+    async def collect():
+        query = select(Animal.id.label("id")).order_by(Animal.id)
+        return [chunk async for chunk in export_util._export_rows(TestingAsyncSessionLocal, query, ["id"], "ndjson")]
+
+    chunks = asyncio.run(collect())
+    total = sum(chunk.count(b"\n") for chunk in chunks)
+    assert total >= 3
+    assert all(chunk.count(b"\n") <= 2 for chunk in chunks)
+    assert len(chunks) == (total + 1) // 2
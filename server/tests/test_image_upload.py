@@ -0,0 +1,162 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.pytest.org/en/stable/how-to/monkeypatch.html
+
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import timedelta
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+from app.models import ImageBlob
+from app.utils import image_util
+from app.utils.body_limit_util import BodySizeLimitMiddleware
+from app.utils.image_blob_util import collect_image_blobs
+from tests.conftest import TestingSessionLocal
+from tests.test_adoption_lifecycle import login_user
+
+
+def upload_animal(client, headers, name, filename, content):
+    return client.post(
+        "/animal-management/animals",
+        headers=headers,
+        files={
+            "request_data": (
+                None,
+                json.dumps({
+                    "name": name,
+                    "species": "Cat",
+                    "breed": "Tabby",
+                    "age": 1,
+                    "gender": "Female",
+                    "description": "Cat for upload test",
+                    "adoption_status": "Available",
+                }),
+                "application/json",
+            ),
+            "animal_image": (filename, io.BytesIO(content), "image/jpeg"),
+        },
+    )
+
+
+# TEST 1: The stored image is named after its hash and sniffed type, and the content is kept intact
+def test_upload_uses_sniffed_type(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    content = b"\x89PNG\r\n\x1a\n" + b"x" * (image_util.UPLOAD_CHUNK_BYTES * 2 + 5)
+
+    res = upload_animal(client, admin_headers, "Png Cat", "cat.jpg", content)
+    assert res.status_code == 201
+
+    digest = hashlib.sha256(content).hexdigest()
+    photo_url = res.json()["data"]["photo_url"]
+    assert photo_url == f"/images/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert (image_util.IMAGES_DIR / photo_url.removeprefix("/images/")).read_bytes() == content
+
+    # No temp files are left behind
+    assert not list(image_util.IMAGES_DIR.glob(".upload-*"))
+
+
+# TEST 2: Non-image content and oversized files are rejected without leaving files behind
+def test_upload_rejects_bad_content_and_size(client, test_admin, monkeypatch):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    files_before = set(image_util.IMAGES_DIR.iterdir())
+
+    res = upload_animal(client, admin_headers, "Text Cat", "cat.jpg", b"this is not an image at all")
+    assert res.status_code == 400
+
+    monkeypatch.setattr(image_util, "MAX_IMAGE_UPLOAD_BYTES", 1024)
+    res = upload_animal(client, admin_headers, "Big Cat", "cat.jpg", b"\xff\xd8\xff\xe0" + b"x" * 2048)
+    assert res.status_code == 413
+
+    assert set(image_util.IMAGES_DIR.iterdir()) == files_before
+
+
+# TEST 3: Identical uploads share one blob, and replacing a photo releases the old reference
+def test_identical_uploads_are_deduplicated(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    content = b"\xff\xd8\xff\xe0same-photo"
+    digest = hashlib.sha256(content).hexdigest()
+
+    first = upload_animal(client, admin_headers, "Twin Cat One", "one.jpg", content).json()["data"]
+    second = upload_animal(client, admin_headers, "Twin Cat Two", "two.jpg", content).json()["data"]
+    assert first["photo_url"] == second["photo_url"]
+
+    def ref_count():
+        db = TestingSessionLocal()
+        try:
+            return db.get(ImageBlob, digest).ref_count
+        finally:
+            db.close()
+
+    assert ref_count() == 2
+
+    res = client.put(
+        f"/animal-management/animals/{second['id']}",
+        headers=admin_headers,
+        files={"animal_image": ("new.jpg", io.BytesIO(b"\xff\xd8\xff\xe0other-photo"), "image/jpeg")},
+    )
+    assert res.status_code == 204
+    assert ref_count() == 1
+
+
+# TEST 4: Oversized bodies are refused from Content-Length, or while streaming when it is not sent
+def test_body_limit_before_buffering():
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=16, path_limits={"/large": 64})
+    reached = []
+
+    @app.post("/small")
+    @app.post("/large")
+    async def echo(request: Request):
+        reached.append(request.url.path)
+        return {"size": len(await request.body())}
+
+    client = TestClient(app)
+
+    res = client.post("/small", content=b"x" * 17)
+    assert res.status_code == 413
+    assert reached == []
+
+    def chunks():
+        for _ in range(4):
+            yield b"x" * 8
+
+    res = client.post("/small", content=chunks())
+    assert res.status_code == 413
+
+    assert client.post("/large", content=b"x" * 32).json() == {"size": 32}
+    assert client.post("/small", content=b"x" * 16).json() == {"size": 16}
+
+
+# TEST 5: Collection keeps an old file that an upload just deduplicated onto, before its row commits
+def test_collection_keeps_restamped_blobs():
+    def orphan(content, extension):
+        digest = hashlib.sha256(content).hexdigest()
+        path = image_util.IMAGES_DIR / image_util.blob_name(digest, extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        two_hours_ago = time.time() - 2 * 3600
+        os.utime(path, (two_hours_ago, two_hours_ago))
+        return path
+
+    reused = orphan(b"\xff\xd8\xff\xe0orphan-reused", "jpg")
+    stale = orphan(b"\xff\xd8\xff\xe0orphan-stale", "jpg")
+
+    # Stored but not yet referenced, as between save_upload_image and the upload's commit
+    stored = asyncio.run(image_util.save_upload_image(UploadFile(io.BytesIO(reused.read_bytes()), filename="orphan.jpg")))
+    assert image_util.IMAGES_DIR / stored.name == reused
+
+    db = TestingSessionLocal()
+    try:
+        collect_image_blobs(db, grace_period=timedelta(hours=1))
+        db.commit()
+    finally:
+        db.close()
+
+    assert reused.exists()
+    assert not stale.exists()
+    assert not list(reused.parent.glob(".collect-*"))
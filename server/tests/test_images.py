@@ -0,0 +1,107 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.new
+
+
+import asyncio
+import hashlib
+import io
+from PIL import Image
+from app.utils.http_cache_util import PathSendFileResponse
+from app.utils.image_variant_util import VARIANTS_DIR
+from tests.test_adoption_lifecycle import login_user
+from tests.test_image_upload import upload_animal
+
+
+def png_bytes(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+# TEST 1: Variants are resized, transcoded, cached and advertised on the animal
+def test_image_variants(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+
+    res = upload_animal(client, admin_headers, "Wide Cat", "wide.png", png_bytes(1600, 800))
+    assert res.status_code == 201
+    animal_id = res.json()["data"]["id"]
+    photo_url = res.json()["data"]["photo_url"]
+
+    animal = client.get(f"/animal-management/animals/{animal_id}", headers=admin_headers).json()["data"]
+    assert animal["photo_variants"]["small"] == f"{photo_url}?w=320&fmt=webp"
+
+    original = client.get(photo_url)
+    assert original.status_code == 200
+
+    variant = client.get(animal["photo_variants"]["small"])
+    assert variant.status_code == 200
+    assert variant.headers["content-type"] == "image/webp"
+    assert len(variant.content) < len(original.content)
+    with Image.open(io.BytesIO(variant.content)) as image:
+        assert image.size == (320, 160)
+
+    # The second request is served from the disk cache
+    cached_files = set(VARIANTS_DIR.iterdir())
+    assert client.get(animal["photo_variants"]["small"]).content == variant.content
+    assert set(VARIANTS_DIR.iterdir()) == cached_files
+
+    # Only the whitelisted widths are generated
+    assert client.get(f"{photo_url}?w=333").status_code == 400
+
+
+# TEST 2: Missing files and paths outside the images directory are refused
+def test_image_paths_are_confined(client):
+    assert client.get("/images/missing.png").status_code == 404
+    assert client.get("/images/..%2F..%2Fmain.py").status_code == 404
+
+
+# TEST 3: Content-addressed images are immutable, revalidate with 304 and honour Range
+def test_image_caching_headers(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    content = png_bytes(800, 600)
+    digest = hashlib.sha256(content).hexdigest()
+
+    photo_url = upload_animal(client, admin_headers, "Cached Cat", "cached.png", content).json()["data"]["photo_url"]
+
+    res = client.get(photo_url)
+    assert res.status_code == 200
+    assert res.headers["etag"] == f'"{digest}"'
+    assert "immutable" in res.headers["cache-control"]
+
+    res = client.get(photo_url, headers={"If-None-Match": f'"{digest}"'})
+    assert res.status_code == 304
+    assert res.content == b""
+
+    res = client.get(photo_url, headers={"Range": "bytes=0-7"})
+    assert res.status_code == 206
+    assert res.content == content[:8]
+
+    variant = client.get(f"{photo_url}?w=160&fmt=webp")
+    assert "immutable" in variant.headers["cache-control"]
+    res = client.get(f"{photo_url}?w=160&fmt=webp", headers={"If-None-Match": variant.headers["etag"]})
+    assert res.status_code == 304
+
+
+# TEST 4: Servers with the pathsend extension get the file path instead of the body
+def test_pathsend_response(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"\xff\xd8\xff\xe0pathsend")
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [],
+        "extensions": {"http.response.pathsend": {}},
+    }
+    asyncio.run(PathSendFileResponse(path)(scope, receive, send))
+
+    assert [message["type"] for message in messages] == ["http.response.start", "http.response.pathsend"]
+    assert messages[1]["path"] == str(path)
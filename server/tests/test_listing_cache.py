@@ -0,0 +1,85 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.sqlalchemy.org/en/20/core/events.html#sqlalchemy.events.ConnectionEvents.before_cursor_execute
+
+
+from sqlalchemy import event
+from app.utils.listing_cache_util import get_listing_cache_stats
+from tests.conftest import async_engine
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: A hot listing page is served without a query until an animal is written
+def test_listing_page_cached_until_write(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    url = "/animal-management/animals?limit=50&adoption_status=Available"
+
+    first = client.get(url, headers=admin_headers)
+    assert first.status_code == 200
+
+    statements = []
+    def count_statement(*args):
+        statements.append(args[2])
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        hits = get_listing_cache_stats()["hits"]
+        second = client.get(url, headers=admin_headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert get_listing_cache_stats()["hits"] == hits + 1
+    assert statements == []
+
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Listing Cache Dog",
+            "species": "Dog",
+            "breed": "Pug",
+            "age": 1,
+            "gender": "Male",
+            "description": "Dog for listing cache test",
+            "adoption_status": "Available",
+        },
+    )
+
+    res = client.get(url, headers=admin_headers)
+    assert animal_id in [animal["id"] for animal in res.json()["data"]["animals"]]
+
+
+# TEST 2: Searches with the same terms share a cached page
+def test_listing_search_normalized(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+
+    first = client.get("/animal-management/animals?search=listing%20cache", headers=admin_headers)
+    hits = get_listing_cache_stats()["hits"]
+    second = client.get("/animal-management/animals?search=%20Listing%20%20CACHE", headers=admin_headers)
+
+    assert second.json()["data"] == first.json()["data"]
+    assert get_listing_cache_stats()["hits"] == hits + 1
+
+
+# TEST 3: Searches without word characters are keyed on their exact text, not all on ""
+def test_listing_punctuation_searches_not_shared(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    animal_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Punctuation Dog",
+            "species": "Dog",
+            "breed": "Pug",
+            "gender": "Male",
+            "description": "Loud!! dog",
+            "adoption_status": "Available",
+        },
+    )
+
+    res = client.get("/animal-management/animals?search=!!", headers=admin_headers)
+    assert animal_id in [animal["id"] for animal in res.json()["data"]["animals"]]
+
+    res = client.get("/animal-management/animals?search=%3F%3F", headers=admin_headers)
+    assert animal_id not in [animal["id"] for animal in res.json()["data"]["animals"]]
@@ -0,0 +1,43 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/core/reflection.html
+# https://docs.pytest.org/en/stable/how-to/assert.html
+
+
+import threading
+from sqlalchemy import create_engine, inspect
+from tests.conftest import engine
+from app.db.database import Base
+from app.db.migration import MIGRATIONS, check_hot_filter_indexes, run_migrations
+
+
+# TEST 1: Every hot filter has a covering index, and the indexes exist in the migrated database
+def test_hot_filter_indexes_present():
+    check_hot_filter_indexes(engine)
+
+
+# TEST 2: Migrations are recorded and not applied twice
+def test_migrations_idempotent():
+    assert run_migrations(engine) == []
+    assert len({migration.version for migration in MIGRATIONS}) == len(MIGRATIONS)
+
+
+# TEST 3: Workers starting together on a fresh SQLite database migrate it once, without errors
+def test_concurrent_migrations(tmp_path):
+    database = tmp_path / "fresh.db"
+    engines = [create_engine(f"sqlite:///{database}") for _ in range(4)]
+    results = []
+    threads = [threading.Thread(target=lambda bind=bind: results.append(run_migrations(bind))) for bind in engines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4
+    assert sorted(name for applied in results for name in applied) == sorted(migration.name for migration in MIGRATIONS)
+
+    # The frozen migration schema has every column the models use
+    inspector = inspect(engines[0])
+    for table in Base.metadata.sorted_tables:
+        if inspector.has_table(table.name):
+            assert {column["name"] for column in inspector.get_columns(table.name)} == set(table.columns.keys())
+    check_hot_filter_indexes(engines[0])
@@ -0,0 +1,158 @@
+# References:
+# https://use-the-index-luke.com/no-offset
+# https://docs.pytest.org/en/stable/how-to/assert.html
+
+
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: Cursor pagination returns the same animals as page/limit pagination
+def test_cursor_pagination_matches_offset(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+
+    # Make sure there are several pages of animals
+    for i in range(5):
+        create_animal(
+            client,
+            admin_headers,
+            {
+                "name": f"Cursor Cat {i}",
+                "species": "Cat",
+                "breed": "Siamese",
+                "age": 1,
+                "gender": "Female",
+                "description": "Cat for pagination test",
+                "adoption_status": "Available",
+            },
+        )
+
+    # All ids through the classic page/limit contract
+    offset_res = client.get(
+        "/animal-management/animals",
+        headers=admin_headers,
+        params={"limit": 100},
+    )
+    assert offset_res.status_code == 200
+    expected_ids = [a["id"] for a in offset_res.json()["data"]["animals"]]
+
+    # Walk the same listing two rows at a time with next_cursor
+    cursor_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+
+        res = client.get("/animal-management/animals", headers=admin_headers, params=params)
+        assert res.status_code == 200
+
+        data = res.json()["data"]
+        if cursor:
+            # Deep pages neither count nor pretend to have a page number
+            assert (data["page"], data["total"], data["total_mode"]) == (None, None, "none")
+        cursor_ids.extend(a["id"] for a in data["animals"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert cursor_ids == expected_ids
+
+
+# TEST 2: A tampered cursor is rejected
+def test_invalid_cursor_rejected(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+
+    res = client.get(
+        "/animal-management/animals",
+        headers=admin_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+
+    assert res.status_code == 400
+
+
+# TEST 3: Cached exact totals follow writes, and total_mode=none skips counting
+def test_total_modes(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+
+    before = client.get("/animal-management/animals", headers=admin_headers).json()["data"]
+
+    create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Count Rabbit",
+            "species": "Rabbit",
+            "breed": "Lop",
+            "age": 1,
+            "gender": "Male",
+            "description": "Rabbit for count test",
+            "adoption_status": "Available",
+        },
+    )
+
+    # The cached count must be invalidated by the insert
+    after = client.get("/animal-management/animals", headers=admin_headers).json()["data"]
+    assert after["total"] == before["total"] + 1
+
+    none_res = client.get(
+        "/animal-management/animals",
+        headers=admin_headers,
+        params={"total_mode": "none"},
+    ).json()["data"]
+    assert none_res["total"] is None
+    assert none_res["total_pages"] is None
+
+    estimate_res = client.get(
+        "/animal-management/animals",
+        headers=admin_headers,
+        params={"total_mode": "estimate"},
+    ).json()["data"]
+    assert estimate_res["total"] >= after["total"]
+
+
+# TEST 4: Estimates come from the counters row when unfiltered and respect filters otherwise
+def test_estimated_totals(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+    client.post("/dashboard-management/dashboard/reconcile", headers=admin_headers)
+
+    for params in ({}, {"gender": "Nonexistent"}):
+        exact = client.get("/animal-management/animals", headers=admin_headers, params=params).json()["data"]
+        estimate = client.get(
+            "/animal-management/animals",
+            headers=admin_headers,
+            params={**params, "total_mode": "estimate"},
+        ).json()["data"]
+        assert estimate["total"] == exact["total"]
+
+    estimate = client.get(
+        "/application-management/applications",
+        headers=admin_headers,
+        params={"application_status": "Submitted", "total_mode": "estimate"},
+    ).json()["data"]
+    exact = client.get(
+        "/application-management/applications",
+        headers=admin_headers,
+        params={"application_status": "Submitted"},
+    ).json()["data"]
+    assert estimate["total"] == exact["total"]
@@ -0,0 +1,88 @@
+# References:
+# https://docs.sqlalchemy.org/en/20/core/events.html#sqlalchemy.events.ConnectionEvents.before_cursor_execute
+# https://docs.sqlalchemy.org/en/20/orm/queryguide/relationships.html#preventing-unwanted-lazy-loads-using-raiseload
+
+
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+from app.models import Application
+from app.utils.loader_util import join_eager
+from tests.conftest import TestingSessionLocal, async_engine, create_test_user
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+@contextmanager
+def count_selects():
+    statements = []
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+# TEST 1: Application reads run the same number of queries however many rows they return
+def test_application_reads_constant_queries(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    adopter = create_test_user(
+        name="Query Count Adopter",
+        email="query.count@gmail.com",
+        phone="0922222222",
+        address="Galway",
+        password="Adopter@123",
+        role="Adopter",
+    )
+    adopter_headers = login_user(client, adopter["email"], adopter["password"], role="adopter")
+
+    application_ids = []
+    for i in range(5):
+        animal_id = create_animal(
+            client,
+            admin_headers,
+            {
+                "name": f"Query Count Pet {i}",
+                "species": "Cat",
+                "breed": "Persian",
+                "age": 1,
+                "gender": "Female",
+                "description": "Cat for query count test",
+                "adoption_status": "Available",
+            },
+        )
+        res = client.post("/application-management/applications", headers=adopter_headers, json={"animal_id": animal_id})
+        application_ids.append(res.json()["data"]["id"])
+
+    for limit in (1, 5):
+        with count_selects() as statements:
+            res = client.get(f"/application-management/applications?limit={limit}&total_mode=none", headers=admin_headers)
+        assert len(res.json()["data"]["applications"]) == limit
+        assert len(statements) == 1
+
+    with count_selects() as statements:
+        res = client.get("/application-management/applications/current-adopter", headers=adopter_headers)
+    assert len(res.json()["data"]["applications"]) == 5
+    assert len(statements) == 1
+
+    with count_selects() as statements:
+        res = client.get(f"/application-management/applications/{application_ids[0]}", headers=admin_headers)
+    assert res.json()["data"]["adopter_name"] == "Query Count Adopter"
+    assert len(statements) <= 1
+
+
+# TEST 2: Relationships not loaded up front raise instead of lazy loading
+def test_unplanned_lazy_load_raises(client):
+    db = TestingSessionLocal()
+    try:
+        application = db.execute(join_eager(select(Application), Application.animal).limit(1)).scalars().first()
+        assert application.animal.name
+        with pytest.raises(InvalidRequestError):
+            application.adopter
+        with pytest.raises(InvalidRequestError):
+            application.animal.applications
+    finally:
+        db.close()
@@ -0,0 +1,48 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.pydantic.dev/latest/concepts/models/#generic-models
+
+
+from datetime import datetime
+from app.schemas.animal_schema import AnimalPage
+from app.schemas.user_schema import CurrentUserResponse
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: Typed responses keep the existing JSON shape and are documented in OpenAPI
+def test_typed_responses(client, test_admin):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Schema Dog",
+            "species": "Dog",
+            "breed": "Akita",
+            "age": 6,
+            "gender": "Female",
+            "description": "Dog for response schema test",
+            "adoption_status": "Available",
+        },
+    )
+
+    res = client.get("/animal-management/animals?limit=100", headers=admin_headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/json"
+
+    body = res.json()
+    assert body["message"] == "Get all animals successfully"
+    page = AnimalPage.model_validate(body["data"])
+    assert page.animals
+
+    animal = body["data"]["animals"][0]
+    assert animal["adoption_status"] in ("Available", "Adopted")
+    assert datetime.fromisoformat(animal["created_at"])
+
+    res = client.get("/user-management/current-user", headers=admin_headers)
+    assert CurrentUserResponse.model_validate(res.json()["data"]).role == "Admin"
+
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert "AnimalResponse" in schemas
+    assert "UserResponse" in schemas
+    assert "ApplicationDetailResponse" in schemas
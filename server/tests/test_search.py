@@ -0,0 +1,115 @@
+# References:
+# https://www.sqlite.org/fts5.html
+# https://docs.pytest.org/en/stable/how-to/assert.html
+
+
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: Animal search uses the full-text index, covers description and ranks name matches first
+def test_animal_full_text_search(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+
+    description_match_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Biscuit",
+            "species": "Dog",
+            "breed": "Corgi",
+            "age": 2,
+            "gender": "Male",
+            "description": "Loves the zephyrine garden",
+            "adoption_status": "Available",
+        },
+    )
+
+    name_match_id = create_animal(
+        client,
+        admin_headers,
+        {
+            "name": "Zephyrine",
+            "species": "Cat",
+            "breed": "Persian",
+            "age": 5,
+            "gender": "Female",
+            "description": "Calm indoor cat",
+            "adoption_status": "Available",
+        },
+    )
+
+    # Prefix search matches both name and description, name match ranked first
+    res = client.get(
+        "/animal-management/animals",
+        headers=admin_headers,
+        params={"search": "zephyr"},
+    )
+    assert res.status_code == 200
+    ids = [a["id"] for a in res.json()["data"]["animals"]]
+    assert ids == [name_match_id, description_match_id]
+
+    # Index follows updates
+    update_res = client.put(
+        f"/animal-management/animals/{description_match_id}",
+        headers=admin_headers,
+        files={"request_data": (None, '{"description": "Sleeps all day"}', "application/json")},
+    )
+    assert update_res.status_code == 204
+
+    res = client.get(
+        "/animal-management/animals",
+        headers=admin_headers,
+        params={"search": "zephyr"},
+    )
+    ids = [a["id"] for a in res.json()["data"]["animals"]]
+    assert ids == [name_match_id]
+
+
+# TEST 2: Adopter lookups by substring (trigram index) and by email prefix
+def test_adopter_search(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+
+    res = client.post(
+        "/user-management/adopters",
+        json={
+            "name": "Quillon Marsh",
+            "email": "quillon.marsh@example.com",
+            "password": "Adopter@123",
+            "phone": "0911111111",
+            "address": "Kilbarrack Road",
+        },
+    )
+    assert res.status_code == 201
+    adopter_id = res.json()["data"]["id"]
+
+    def search_ids(term):
+        res = client.get(
+            "/user-management/adopters",
+            headers=admin_headers,
+            params={"search": term},
+        )
+        assert res.status_code == 200
+        return [u["id"] for u in res.json()["data"]["users"]]
+
+    # Substring of name, address and email, case-insensitive
+    assert adopter_id in search_ids("LLON")
+    assert adopter_id in search_ids("barrack")
+    assert adopter_id in search_ids("n.mars")
+    # Email prefix fast path
+    assert search_ids("Quillon.Marsh@") == [adopter_id]
+    # A domain is a substring of the email, not a prefix
+    assert adopter_id in search_ids("@example.com")
+    assert adopter_id in search_ids("@EXAMPLE")
+    # Short terms still work through the fallback
+    assert adopter_id in search_ids("qu")
+    assert adopter_id not in search_ids("zzz")
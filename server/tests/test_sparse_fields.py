@@ -0,0 +1,50 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://jsonapi.org/format/#fetching-sparse-fieldsets
+
+
+from tests.test_adoption_lifecycle import login_user, create_animal
+
+
+# TEST 1: fields= narrows every listing to the requested keys, id always included
+def test_sparse_fieldsets(client, test_admin, test_adopter):
+    admin_headers = login_user(client, test_admin["email"], test_admin["password"], role="admin")
+    adopter_headers = login_user(client, test_adopter["email"], test_adopter["password"], role="adopter")
+    for name in ["Sparse Alpha", "Sparse Beta", "Sparse Gamma"]:
+        animal_id = create_animal(
+            client,
+            admin_headers,
+            {
+                "name": name,
+                "species": "Dog",
+                "breed": "Boxer",
+                "age": 2,
+                "gender": "Male",
+                "description": "Dog for sparse fieldset test",
+                "adoption_status": "Available",
+            },
+        )
+    client.post("/application-management/applications", headers=adopter_headers, json={"animal_id": animal_id, "reason": "Sparse"})
+
+    full = client.get("/animal-management/animals?search=sparse&limit=2", headers=admin_headers).json()["data"]
+    res = client.get("/animal-management/animals?search=sparse&limit=2&fields=name,adoption_status,photo_variants", headers=admin_headers)
+    assert res.status_code == 200
+    sparse = res.json()["data"]
+    assert sparse["total"] == full["total"] == 3
+    assert [set(animal) for animal in sparse["animals"]] == [{"id", "name", "adoption_status", "photo_variants"}] * 2
+    assert [animal["name"] for animal in sparse["animals"]] == [animal["name"] for animal in full["animals"]]
+    assert sparse["animals"][0]["photo_variants"] == full["animals"][0]["photo_variants"]
+
+    # Cursor pagination works on projected rows too
+    res = client.get(f"/animal-management/animals?search=sparse&limit=2&fields=name&cursor={sparse['next_cursor']}", headers=admin_headers)
+    assert [animal["name"] for animal in res.json()["data"]["animals"]] == ["Sparse Gamma"]
+
+    res = client.get("/application-management/applications?fields=animal_name,status,adopter_name", headers=admin_headers)
+    application = res.json()["data"]["applications"][0]
+    assert application == {"id": application["id"], "animal_name": "Sparse Gamma", "status": "Submitted", "adopter_name": "Adopter"}
+
+    res = client.get("/user-management/adopters?fields=name,email", headers=admin_headers)
+    assert all(set(user) == {"id", "name", "email"} for user in res.json()["data"]["users"])
+
+    res = client.get("/animal-management/animals?fields=name,password", headers=admin_headers)
+    assert res.status_code == 400
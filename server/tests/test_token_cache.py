@@ -0,0 +1,60 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.pytest.org/en/stable/how-to/assert.html
+
+
+from app.utils.token_cache_util import get_token_cache_stats
+from tests.conftest import create_test_user
+from tests.test_adoption_lifecycle import login_user
+
+
+# TEST 1: Repeated requests with the same token are served from the cache
+def test_token_claims_are_cached(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+
+    client.get("/user-management/current-user", headers=admin_headers)
+    before = get_token_cache_stats()
+
+    res = client.get("/user-management/current-user", headers=admin_headers)
+    assert res.status_code == 200
+
+    after = get_token_cache_stats()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+# TEST 2: Logout and account deletion invalidate tokens that are still cached
+def test_logout_and_delete_invalidate_tokens(client, test_admin):
+    adopter = create_test_user(
+        name="Token Adopter",
+        email="token.adopter@example.com",
+        phone="0911111111",
+        address="Cork",
+        password="Token@123",
+        role="Adopter",
+    )
+    first_headers = login_user(client, adopter["email"], adopter["password"], role="adopter")
+    assert client.get("/user-management/current-user", headers=first_headers).status_code == 200
+
+    res = client.post("/auth/logout", headers=first_headers)
+    assert res.status_code == 204
+    assert client.get("/user-management/current-user", headers=first_headers).status_code == 401
+
+    # A new login still works after logout
+    second_headers = login_user(client, adopter["email"], adopter["password"], role="adopter")
+    assert client.get("/user-management/current-user", headers=second_headers).status_code == 200
+
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+    res = client.delete(f"/user-management/adopters/{adopter['id']}", headers=admin_headers)
+    assert res.status_code == 204
+    assert client.get("/user-management/current-user", headers=second_headers).status_code == 401
@@ -0,0 +1,51 @@
+# References:
+# https://fastapi.tiangolo.com/tutorial/testing/#using-testclient
+# https://docs.pytest.org/en/stable/how-to/monkeypatch.html
+
+
+from app.utils import worker_pool
+from tests.test_adoption_lifecycle import login_user
+
+
+# TEST 1: Logins verify passwords in the worker pool and show up in the metrics
+def test_login_runs_in_worker_pool(client, test_admin):
+    admin_headers = login_user(
+        client,
+        test_admin["email"],
+        test_admin["password"],
+        role="admin",
+    )
+    before = client.get("/dashboard-management/dashboard/metrics", headers=admin_headers).json()["data"]["worker_pool"]
+
+    login_user(client, test_admin["email"], test_admin["password"], role="admin")
+
+    after = client.get("/dashboard-management/dashboard/metrics", headers=admin_headers).json()["data"]["worker_pool"]
+    assert after["completed"] == before["completed"] + 1
+    assert after["in_flight"] == 0
+
+
+# TEST 2: A full queue is rejected with 503 instead of waiting
+def test_full_worker_pool_rejects_login(client, test_adopter, monkeypatch):
+    monkeypatch.setattr(worker_pool.password_pool, "max_pending", 0)
+
+    res = client.post(
+        "/auth/login/adopter",
+        json={"email": test_adopter["email"], "password": test_adopter["password"]},
+    )
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+    assert worker_pool.get_worker_pool_stats()["rejected"] >= 1
+
+
+# TEST 3: Image rendering has its own queue, so a full image pool does not block logins
+def test_image_pool_is_separate(client, test_adopter, monkeypatch):
+    monkeypatch.setattr(worker_pool.image_pool, "max_pending", 0)
+
+    res = client.post(
+        "/auth/login/adopter",
+        json={"email": test_adopter["email"], "password": test_adopter["password"]},
+    )
+
+    assert res.status_code == 200
+    assert worker_pool.get_image_pool_stats()["workers"] == worker_pool.IMAGE_POOL_SIZE